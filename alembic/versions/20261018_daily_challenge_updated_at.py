@@ -0,0 +1,28 @@
+"""add updated_at to daily_challenges for last-writer-wins sync
+
+Revision ID: 20261018_daily_challenge_updated_at
+Revises: 20261018_progress_user_date
+Create Date: 2026-10-18 16:20:11.402517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261018_daily_challenge_updated_at'
+down_revision = '20261018_progress_user_date'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('daily_challenges', sa.Column(
+        'updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True
+    ))
+    # Las filas existentes parten de su última modificación conocida
+    op.execute("UPDATE daily_challenges SET updated_at = COALESCE(completed_at, created_at)")
+
+
+def downgrade() -> None:
+    op.drop_column('daily_challenges', 'updated_at')
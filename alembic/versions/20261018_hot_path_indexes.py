@@ -0,0 +1,47 @@
+"""add composite indexes for the hot query shapes
+
+Revision ID: 20261018_hot_path_indexes
+Revises: 20261018_user_challenge_stats
+Create Date: 2026-10-18 11:40:02.903118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261018_hot_path_indexes'
+down_revision = '20261018_user_challenge_stats'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_daily_challenges_user_date', 'daily_challenges', ['user_id', 'challenge_date']),
+    ('ix_daily_challenges_user_completed', 'daily_challenges', ['user_id', 'is_completed', 'completed_at']),
+    ('ix_daily_challenges_user_created', 'daily_challenges', ['user_id', 'created_at']),
+    ('ix_reto_usuario_usuario_reto', 'reto_usuario', ['id_usuario', 'id_reto']),
+    ('ix_progress_records_user_habit_date', 'progress_records', ['user_id', 'habit_id', 'date']),
+    ('ix_reto_categoria_activo_fecha', 'reto', ['categoria', 'activo', 'fecha_asignacion']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'mysql':
+        # MySQL descarta el índice implícito de una foreign key cuando otro
+        # índice la cubre; recrearlo antes de borrar los compuestos
+        inspector = sa.inspect(bind)
+        for table, column in [('daily_challenges', 'user_id'), ('reto_usuario', 'id_usuario'),
+                              ('progress_records', 'user_id')]:
+            indexed = {tuple(ix['column_names']) for ix in inspector.get_indexes(table)}
+            if (column,) not in indexed:
+                op.create_index(f'ix_{table}_{column}', table, [column], unique=False)
+
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,32 @@
+"""add UTC version_at to the entities resolved last-writer-wins by the progress sync
+
+Revision ID: 20261018_progress_sync_version
+Revises: 20261018_notification_outbox
+Create Date: 2026-10-18 21:40:52.118034
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261018_progress_sync_version'
+down_revision = '20261018_notification_outbox'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'mysql':
+        # updated_at está en la zona horaria de la sesión: pasarlo a UTC
+        version = "COALESCE(updated_at, created_at) - INTERVAL TIMESTAMPDIFF(SECOND, UTC_TIMESTAMP(), NOW()) SECOND"
+    else:
+        version = "COALESCE(updated_at, created_at)"
+    for table in ('daily_challenges', 'challenges'):
+        op.add_column(table, sa.Column('version_at', sa.DateTime(timezone=True), nullable=True))
+        op.execute(f"UPDATE {table} SET version_at = {version}")
+
+
+def downgrade() -> None:
+    for table in ('daily_challenges', 'challenges'):
+        op.drop_column(table, 'version_at')
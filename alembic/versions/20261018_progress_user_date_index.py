@@ -0,0 +1,24 @@
+"""add (user_id, date) index on progress_records for day-range filters
+
+Revision ID: 20261018_progress_user_date
+Revises: 20261018_hot_path_indexes
+Create Date: 2026-10-18 13:05:37.114902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261018_progress_user_date'
+down_revision = '20261018_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_progress_records_user_date', 'progress_records', ['user_id', 'date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_progress_records_user_date', table_name='progress_records')
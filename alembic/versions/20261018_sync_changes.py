@@ -0,0 +1,63 @@
+"""add updated_at watermarks and sync_tombstones for delta sync
+
+Revision ID: 20261018_sync_changes
+Revises: 20261018_idempotency_keys
+Create Date: 2026-10-18 19:12:37.550193
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261018_sync_changes'
+down_revision = '20261018_idempotency_keys'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    for table in ('reto_usuario', 'logros'):
+        op.add_column(table, sa.Column(
+            'updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True
+        ))
+
+    # habits y challenges ya tenían updated_at, pero solo se rellenaba al modificar la fila
+    for table in ('habits', 'challenges'):
+        op.alter_column(table, 'updated_at', existing_type=sa.DateTime(timezone=True),
+                        server_default=sa.func.now(), existing_nullable=True)
+        op.execute(f"UPDATE {table} SET updated_at = created_at WHERE updated_at IS NULL")
+
+    op.create_index('ix_habits_user_updated', 'habits', ['user_id', 'updated_at'])
+    op.create_index('ix_challenges_user_updated', 'challenges', ['user_id', 'updated_at'])
+    op.create_index('ix_daily_challenges_user_updated', 'daily_challenges', ['user_id', 'updated_at'])
+    op.create_index('ix_reto_usuario_usuario_updated', 'reto_usuario', ['id_usuario', 'updated_at'])
+    op.create_index('ix_logros_usuario_updated', 'logros', ['id_usuario', 'updated_at'])
+
+    op.create_table(
+        'sync_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('entity_type', sa.String(length=32), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sync_tombstones_user_deleted', 'sync_tombstones', ['user_id', 'deleted_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sync_tombstones_user_deleted', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
+
+    op.drop_index('ix_logros_usuario_updated', table_name='logros')
+    op.drop_index('ix_reto_usuario_usuario_updated', table_name='reto_usuario')
+    op.drop_index('ix_daily_challenges_user_updated', table_name='daily_challenges')
+    op.drop_index('ix_challenges_user_updated', table_name='challenges')
+    op.drop_index('ix_habits_user_updated', table_name='habits')
+
+    for table in ('habits', 'challenges'):
+        op.alter_column(table, 'updated_at', existing_type=sa.DateTime(timezone=True),
+                        server_default=None, existing_nullable=True)
+    for table in ('reto_usuario', 'logros'):
+        op.drop_column(table, 'updated_at')
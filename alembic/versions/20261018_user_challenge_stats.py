@@ -0,0 +1,35 @@
+"""add user_challenge_stats aggregate table
+
+Revision ID: 20261018_user_challenge_stats
+Revises: 5c0ea00fc4d9, 20251016_modify_reto_text, 20251016_change_text, modify_reto_text_columns
+Create Date: 2026-10-18 09:12:41.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261018_user_challenge_stats'
+down_revision = ('5c0ea00fc4d9', '20251016_modify_reto_text', '20251016_change_text', 'modify_reto_text_columns')
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('user_challenge_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total_challenges', sa.Integer(), nullable=False),
+    sa.Column('completed_challenges', sa.Integer(), nullable=False),
+    sa.Column('current_streak', sa.Integer(), nullable=False),
+    sa.Column('longest_streak', sa.Integer(), nullable=False),
+    sa.Column('last_completed_date', sa.Date(), nullable=True),
+    sa.Column('total_points', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['usuario.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_challenge_stats')
@@ -0,0 +1,205 @@
+"""
+Response compression middleware negotiated through Accept-Encoding
+"""
+
+import gzip
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional; sin él solo se ofrece gzip
+    brotli = None
+
+_COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml")
+_ENCODING_ETAG_SUFFIX = re.compile(r'-(?:gzip|br)"')
+
+def parse_accept_encoding(header: Optional[str]) -> dict:
+    """Map each coding in Accept-Encoding to its q-value"""
+    codings = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding] = q
+    return codings
+
+def choose_encoding(header: Optional[str], available: List[str]) -> Optional[str]:
+    """Pick the preferred available coding, ``None`` for identity"""
+    codings = parse_accept_encoding(header)
+    wildcard = codings.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = codings.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+class CompressionMiddleware:
+    """Compress complete response bodies with brotli or gzip.
+
+    Streaming responses (several body chunks), bodies below
+    ``minimum_size``, non-textual content types and responses that already
+    carry a Content-Encoding are passed through unchanged. Responses with a
+    strong ETag (the pre-serialized catalog) have their compressed body
+    cached, so identical catalog reads are compressed only once.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        cache_max_entries: int = 256
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.available = (["br"] if brotli is not None else []) + ["gzip"]
+        self.cache_max_entries = cache_max_entries
+        self._cache: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        encoding = choose_encoding(headers.get("accept-encoding"), self.available)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        # El cliente reenvía el ETag de la variante comprimida; la aplicación conoce el original
+        if_none_match = headers.get("if-none-match")
+        revalidates_variant = bool(if_none_match and _ENCODING_ETAG_SUFFIX.search(if_none_match))
+        if revalidates_variant:
+            scope = dict(scope)
+            scope["headers"] = [
+                (name, _ENCODING_ETAG_SUFFIX.sub('"', value.decode("latin-1")).encode("latin-1"))
+                if name == b"if-none-match" else (name, value)
+                for name, value in scope["headers"]
+            ]
+
+        responder = _CompressionResponder(self, scope, send, encoding, revalidates_variant)
+        await self.app(scope, receive, responder.send)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def compress_cached(self, key: Tuple, body: bytes, encoding: str) -> bytes:
+        with self._lock:
+            compressed = self._cache.get(key)
+            if compressed is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return compressed
+            self.cache_misses += 1
+        compressed = self.compress(body, encoding)
+        with self._lock:
+            self._cache[key] = compressed
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+        return compressed
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "encodings": self.available,
+                "minimum_size": self.minimum_size,
+                "cached_bodies": len(self._cache),
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses
+            }
+
+class _CompressionResponder:
+    """Buffers the response start until the first body chunk decides the path"""
+
+    def __init__(
+        self,
+        middleware: CompressionMiddleware,
+        scope: Scope,
+        send: Send,
+        encoding: str,
+        revalidates_variant: bool
+    ):
+        self.middleware = middleware
+        self.scope = scope
+        self.upstream_send = send
+        self.encoding = encoding
+        self.revalidates_variant = revalidates_variant
+        self.start: Optional[Message] = None
+        self.passthrough = False
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.upstream_send(message)
+            return
+
+        start, self.start = self.start, None
+        headers = MutableHeaders(raw=start["headers"])
+        body = message.get("body", b"")
+
+        if start["status"] == 304:
+            # Conservar el ETag de la variante comprimida que tiene el cliente
+            headers.add_vary_header("Accept-Encoding")
+            if self.revalidates_variant:
+                self._tag_variant(headers)
+            await self.upstream_send(start)
+            await self.upstream_send(message)
+            return
+
+        content_type = headers.get("content-type", "")
+        if (
+            message.get("more_body", False)
+            or "content-encoding" in headers
+            or len(body) < self.middleware.minimum_size
+            or not content_type.startswith(_COMPRESSIBLE_TYPES)
+        ):
+            self.passthrough = True
+            await self.upstream_send(start)
+            await self.upstream_send(message)
+            return
+
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            key = (self.encoding, etag, self.scope.get("path"), self.scope.get("query_string"), len(body))
+            compressed = self.middleware.compress_cached(key, body, self.encoding)
+        else:
+            compressed = self.middleware.compress(body, self.encoding)
+
+        headers["Content-Encoding"] = self.encoding
+        headers["Content-Length"] = str(len(compressed))
+        self._tag_variant(headers)
+        await self.upstream_send(start)
+        await self.upstream_send({"type": "http.response.body", "body": compressed})
+
+    def _tag_variant(self, headers: MutableHeaders):
+        headers.add_vary_header("Accept-Encoding")
+        # Un ETag fuerte identifica bytes exactos: distinto por codificación
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/") and etag.endswith('"'):
+            headers["ETag"] = f'{etag[:-1]}-{self.encoding}"'
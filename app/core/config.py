@@ -15,11 +15,57 @@ class Settings(BaseSettings):
     MYSQL_PASSWORD: str = "1234"
     MYSQL_DATABASE: str = "updaily"
     
+    # Database connection pool
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # segundos esperando una conexión libre
+    DB_POOL_RECYCLE: int = 1800  # segundos, por debajo del wait_timeout de MySQL
+    DB_POOL_PRE_PING: bool = True
+    
     # Security
     SECRET_KEY: str = "updaily-secret-key-2024-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Password hashing
+    BCRYPT_ROUNDS: int = 12  # factor de coste; los hashes con otro coste se rehacen al hacer login
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" o "process"
+    PASSWORD_HASH_WORKERS: int = 4  # hashes bcrypt simultáneos como máximo
+    
+    # Verified principal cache
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60  # 0 desactiva la caché
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000  # payloads JWT decodificados; 0 desactiva la caché
+    
+    # Catalog snapshot (retos, criterios, plantillas)
+    CATALOG_CACHE_TTL_SECONDS: int = 300  # máximo desfase entre procesos tras una escritura
+    CATALOG_CACHE_MAX_AGE_SECONDS: int = 60  # Cache-Control max-age de las respuestas del catálogo
+    
+    # Response compression (brotli se usa si el paquete está instalado)
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes; por debajo se envía sin comprimir
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_CACHE_MAX_ENTRIES: int = 256  # cuerpos comprimidos del catálogo en memoria
+    
+    # Idempotency-Key on POST requests
+    IDEMPOTENCY_TTL_SECONDS: int = 86400  # tiempo durante el que un reintento recibe la respuesta guardada
+    IDEMPOTENCY_LOCK_SECONDS: int = 60  # una petición en curso más antigua se da por abandonada
+    IDEMPOTENCY_MAX_BODY_BYTES: int = 65536  # cuerpos mayores no se guardan; el reintento recibe 409
+    
+    # Delta sync (/sync/changes)
+    SYNC_CHANGES_OVERLAP_SECONDS: int = 5  # margen para escrituras que confirmaron después de leer la marca
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30  # un token más antiguo obliga a una sincronización completa
+    
+    # Notification outbox dispatcher
+    NOTIFICATION_BATCH_SIZE: int = 200  # filas del outbox reservadas por lote
+    NOTIFICATION_CONCURRENCY: int = 20  # envíos simultáneos como máximo
+    NOTIFICATION_POLL_SECONDS: float = 2.0  # espera cuando el outbox está vacío
+    NOTIFICATION_LEASE_SECONDS: int = 60  # un lote reservado que no se confirma vuelve a estar disponible
+    NOTIFICATION_MAX_ATTEMPTS: int = 5  # después se marca como dead
+    NOTIFICATION_BACKOFF_SECONDS: float = 5.0  # espera base entre reintentos, se duplica en cada intento
+    NOTIFICATION_BACKOFF_MAX_SECONDS: float = 900.0
+    NOTIFICATION_RETENTION_DAYS: int = 7  # las notificaciones enviadas se purgan después
+    
     # CORS Configuration
     ALLOWED_ORIGINS: List[str] = [
         "http://localhost:8080",      # Kotlin local development
@@ -36,7 +82,8 @@ class Settings(BaseSettings):
         "Authorization",
         "Accept",
         "Origin",
-        "X-Requested-With"
+        "X-Requested-With",
+        "Idempotency-Key"
     ]
     
     # App settings
@@ -0,0 +1,21 @@
+"""
+Day-boundary helpers for date-scoped queries
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import Tuple
+from sqlalchemy import and_
+
+def day_bounds(day: date) -> Tuple[datetime, datetime]:
+    """Half-open ``[start, end)`` timestamp range covering a calendar day"""
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+def on_day(column, day: date):
+    """Predicate matching timestamps within the day.
+
+    Compares the bare column against the day's half-open range, instead of
+    wrapping it in ``DATE()``, so an index on the column can be used.
+    """
+    start, end = day_bounds(day)
+    return and_(column >= start, column < end)
@@ -3,26 +3,40 @@ Dependencies for dependency injection
 """
 
 from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.core.security import verify_token
+from app.core.principal_cache import principal_cache
+from app.core.security import security, verify_token
 from app.crud import user as user_crud
-from app.models.database import User
+from app.schemas.user import UserPrincipal
 
 def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user"""
-    user = user_crud.get_user(db, user_id=int(current_user["user_id"]))
-    if user is None:
+) -> UserPrincipal:
+    """Get current authenticated user.
+
+    The user is read from the principal cache; the database is only queried
+    the first time a token is seen or after the entry expires.
+    """
+    sub = current_user["user_id"]
+    user = principal_cache.get(sub, credentials.credentials)
+    if user is not None:
+        return user
+    
+    db_user = user_crud.get_user(db, user_id=int(sub))
+    if db_user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+    user = UserPrincipal.model_validate(db_user)
+    principal_cache.set(sub, credentials.credentials, user)
     return user
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+def get_current_active_user(current_user: UserPrincipal = Depends(get_current_user)) -> UserPrincipal:
     """Get current active user"""
     if not current_user.is_active:
         raise HTTPException(
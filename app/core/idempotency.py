@@ -0,0 +1,332 @@
+"""
+Idempotency-Key support for retried POST requests
+"""
+
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Optional, Tuple
+
+from jose import JWTError
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.core.security import decode_token
+from app.models.database import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+# Resultados de IdempotencyStore.begin
+NEW, REPLAY, IN_PROGRESS, MISMATCH = "new", "replay", "in_progress", "mismatch"
+
+def request_fingerprint(method: str, path: str, query_string: bytes, body: bytes) -> str:
+    """Hash identifying the request a key was first used with"""
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query_string, body):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+class IdempotencyStore:
+    """Responses of keyed POST requests stored in ``idempotency_keys``.
+
+    A key is claimed with a pending row before the request runs, so a
+    concurrent retry gets 409 instead of running the handler twice. Only
+    successful responses are kept (a body over ``max_body_bytes`` is
+    dropped but the key stays used); any other outcome releases the key so
+    the client can retry. Rows live ``ttl_seconds`` and are purged by the
+    scheduler through :meth:`cleanup`.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        ttl_seconds: int = 86400,
+        lock_seconds: int = 60,
+        max_body_bytes: int = 65536
+    ):
+        self._session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.max_body_bytes = max_body_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.conflicts = 0
+        self.stored = 0
+        self.purged = 0
+
+    @property
+    def session_factory(self) -> Callable:
+        if self._session_factory is None:
+            from app.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory
+
+    @session_factory.setter
+    def session_factory(self, factory: Optional[Callable]):
+        self._session_factory = factory
+
+    def begin(self, user_id: int, key: str, request_hash: str) -> Tuple[str, Optional[IdempotencyKey]]:
+        """Claim ``key`` for a new request or return the stored outcome.
+
+        With ``NEW`` the record is the claim: its ``created_at`` identifies it
+        in :meth:`complete` and :meth:`release`, so a request whose key was
+        reclaimed after it went stale cannot touch the new claim. With
+        ``REPLAY`` it is the stored response.
+        """
+        # Sin microsegundos: DATETIME de MySQL los redondea y el token de la reclamación dejaría de coincidir
+        now = datetime.utcnow().replace(microsecond=0)
+        stale = now - timedelta(seconds=self.lock_seconds)
+        with self.session_factory() as db:
+            record = db.execute(
+                select(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            ).scalar_one_or_none()
+
+            if record is None:
+                db.add(IdempotencyKey(
+                    user_id=user_id, key=key, request_hash=request_hash,
+                    created_at=now, expires_at=now + timedelta(seconds=self.ttl_seconds)
+                ))
+                try:
+                    db.commit()
+                except IntegrityError:
+                    # Otra petición con la misma clave la reclamó entre la lectura y la escritura
+                    db.rollback()
+                    return self._count(IN_PROGRESS), None
+                return self._count(NEW), self._claim(user_id, key, request_hash, now)
+
+            if record.expires_at > now:
+                if record.status_code is None:
+                    if record.created_at > stale:
+                        return self._count(IN_PROGRESS), None
+                    # Abandonada por una petición que no terminó: se reclama sea cual sea el cuerpo
+                elif record.request_hash != request_hash:
+                    return self._count(MISMATCH), None
+                else:
+                    db.expunge(record)
+                    return self._count(REPLAY), record
+
+            # Clave caducada o abandonada: el UPDATE condicional deja pasar a un solo reintento
+            result = db.execute(
+                update(IdempotencyKey)
+                .where(
+                    IdempotencyKey.id == record.id,
+                    or_(
+                        IdempotencyKey.expires_at <= now,
+                        and_(IdempotencyKey.status_code.is_(None), IdempotencyKey.created_at <= stale)
+                    )
+                )
+                .values(
+                    request_hash=request_hash, status_code=None, content_type=None, response_body=None,
+                    created_at=now, expires_at=now + timedelta(seconds=self.ttl_seconds)
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            if result.rowcount != 1:
+                return self._count(IN_PROGRESS), None
+        return self._count(NEW), self._claim(user_id, key, request_hash, now)
+
+    @staticmethod
+    def _claim(user_id: int, key: str, request_hash: str, claimed_at: datetime) -> IdempotencyKey:
+        return IdempotencyKey(user_id=user_id, key=key, request_hash=request_hash, created_at=claimed_at)
+
+    @staticmethod
+    def _is_claim(claim: IdempotencyKey):
+        return and_(
+            IdempotencyKey.user_id == claim.user_id,
+            IdempotencyKey.key == claim.key,
+            IdempotencyKey.created_at == claim.created_at,
+            IdempotencyKey.status_code.is_(None)
+        )
+
+    def complete(self, claim: IdempotencyKey, status_code: int, content_type: Optional[str], body: Optional[bytes]):
+        """Store the response of the request that made ``claim``.
+
+        ``body`` is ``None`` when the response was too large to keep: the
+        key stays used and a retry gets 409 instead of running again.
+        """
+        with self.session_factory() as db:
+            result = db.execute(
+                update(IdempotencyKey)
+                .where(self._is_claim(claim))
+                .values(status_code=status_code, content_type=content_type, response_body=body)
+            )
+            db.commit()
+        if result.rowcount != 1:
+            logger.warning(f"Idempotency-Key {claim.key!r} of user {claim.user_id} was reclaimed, response not stored")
+            return
+        with self._lock:
+            self.stored += 1
+
+    def release(self, claim: IdempotencyKey):
+        """Drop a pending claim so the request can be retried"""
+        with self.session_factory() as db:
+            db.execute(delete(IdempotencyKey).where(self._is_claim(claim)))
+            db.commit()
+
+    def cleanup(self) -> int:
+        """Delete expired keys, returning how many were removed"""
+        with self.session_factory() as db:
+            result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow()))
+            db.commit()
+        with self._lock:
+            self.purged += result.rowcount
+        return result.rowcount
+
+    def _count(self, outcome: str) -> str:
+        with self._lock:
+            if outcome == REPLAY:
+                self.hits += 1
+            elif outcome == NEW:
+                self.misses += 1
+            else:
+                self.conflicts += 1
+        return outcome
+
+    def metrics(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "conflicts": self.conflicts,
+                "stored": self.stored,
+                "purged": self.purged,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+idempotency_store = IdempotencyStore(
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    lock_seconds=settings.IDEMPOTENCY_LOCK_SECONDS,
+    max_body_bytes=settings.IDEMPOTENCY_MAX_BODY_BYTES
+)
+
+def _user_id(headers: Headers) -> Optional[int]:
+    """Subject of a valid bearer token; other requests are not keyed"""
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return int(decode_token(token)["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+
+class IdempotencyMiddleware:
+    """Replay the stored response of authenticated POSTs sent again with the same Idempotency-Key.
+
+    Requests without the header, without a valid bearer token or with
+    another method are passed through. A replay is answered from
+    ``idempotency_keys`` alone, without running the route.
+    """
+
+    def __init__(self, app: ASGIApp, store: Optional[IdempotencyStore] = None):
+        self.app = app
+        self.store = store or idempotency_store
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get(IDEMPOTENCY_HEADER)
+        user_id = _user_id(headers) if key else None
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+        if len(key) > MAX_KEY_LENGTH:
+            await FastJSONResponse(
+                {"detail": f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters"}, status_code=400
+            )(scope, receive, send)
+            return
+
+        # Leer el cuerpo completo para calcular la huella y reenviarlo a la aplicación
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+        request_hash = request_fingerprint(scope["method"], scope["path"], scope.get("query_string", b""), body)
+
+        outcome, record = await run_in_threadpool(self.store.begin, user_id, key, request_hash)
+        if outcome == REPLAY and record.response_body is None:
+            await FastJSONResponse(
+                {"detail": f"The request with this Idempotency-Key already succeeded with status "
+                           f"{record.status_code}, but its response was too large to replay"},
+                status_code=409,
+                headers={REPLAYED_HEADER: "true"}
+            )(scope, receive, send)
+            return
+        if outcome == REPLAY:
+            await Response(
+                record.response_body,
+                status_code=record.status_code,
+                headers={REPLAYED_HEADER: "true"},
+                media_type=record.content_type
+            )(scope, receive, send)
+            return
+        if outcome == MISMATCH:
+            await FastJSONResponse(
+                {"detail": "Idempotency-Key was already used with a different request"}, status_code=422
+            )(scope, receive, send)
+            return
+        if outcome == IN_PROGRESS:
+            await FastJSONResponse(
+                {"detail": "A request with this Idempotency-Key is still in progress"}, status_code=409
+            )(scope, receive, send)
+            return
+
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        response = {"status": None, "content_type": None, "body": [], "size": 0}
+
+        async def capture_send(message: Message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["content_type"] = Headers(raw=message["headers"]).get("content-type")
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                response["size"] += len(chunk)
+                if response["size"] <= self.store.max_body_bytes:
+                    response["body"].append(chunk)
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except Exception:
+            await run_in_threadpool(self.store.release, record)
+            raise
+
+        # Solo las respuestas correctas se repiten; el resto no cambió datos y puede reintentarse
+        if response["status"] is not None and 200 <= response["status"] < 300:
+            # Una respuesta demasiado grande no se guarda, pero la clave queda usada
+            stored_body = b"".join(response["body"]) if response["size"] <= self.store.max_body_bytes else None
+            await run_in_threadpool(
+                self.store.complete, record, response["status"], response["content_type"], stored_body
+            )
+        else:
+            await run_in_threadpool(self.store.release, record)
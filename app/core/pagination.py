@@ -0,0 +1,96 @@
+"""
+Keyset (cursor) pagination for list endpoints
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def _to_json(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+def _from_json(value: Any, python_type: type) -> Any:
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is int and not isinstance(value, int):
+        raise TypeError(value)
+    return value
+
+class Keyset:
+    """Total order of a list endpoint: sort columns ending in the primary key.
+
+    Pages after the first are read with ``WHERE (sort_key, id) > :cursor``
+    (``<`` when descending), so with an index on the order columns every
+    page costs the same as the first one instead of scanning the skipped
+    rows. The cursor is the order tuple of the last row, base64-encoded.
+    """
+
+    def __init__(self, *columns, descending: bool = False):
+        self.columns = columns
+        self.descending = descending
+
+    def order_by(self) -> list:
+        return [column.desc() if self.descending else column.asc() for column in self.columns]
+
+    def apply(self, query, skip: int = 0, limit: int = 100, after: Optional[Tuple] = None):
+        """Order and slice a Query or select(); ``after`` takes precedence over ``skip``"""
+        query = query.order_by(*self.order_by())
+        if after is None:
+            return query.offset(skip).limit(limit)
+        return query.where(self._after(after)).limit(limit)
+
+    def _after(self, values: Tuple):
+        # (a, b) < (x, y) expandido como a <= x AND (a < x OR (a = x AND b < y));
+        # el primer término acota el rango del índice en SQLite y MySQL
+        clauses = []
+        for i, (column, value) in enumerate(zip(self.columns, values)):
+            beyond = column < value if self.descending else column > value
+            equal = [previous == v for previous, v in zip(self.columns[:i], values[:i])]
+            clauses.append(and_(*equal, beyond))
+        first, value = self.columns[0], values[0]
+        if len(self.columns) == 1:
+            return clauses[0]
+        return and_(first <= value if self.descending else first >= value, or_(*clauses))
+
+    def encode(self, row) -> str:
+        values = [_to_json(getattr(row, column.key)) for column in self.columns]
+        raw = json.dumps(values, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode(self, cursor: Optional[str]) -> Optional[Tuple]:
+        """Typed order tuple of a cursor, 400 if it was not issued by this keyset"""
+        if not cursor:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            values = json.loads(raw)
+            if not isinstance(values, list) or len(values) != len(self.columns):
+                raise ValueError(cursor)
+            return tuple(
+                _from_json(value, column.type.python_type)
+                for value, column in zip(values, self.columns)
+            )
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+
+    def next_cursor(self, rows: Sequence, limit: int) -> Optional[str]:
+        """Cursor of the following page, ``None`` when this one was the last"""
+        if limit <= 0 or len(rows) < limit:
+            return None
+        return self.encode(rows[-1])
+
+def set_next_cursor(response: Response, keyset: Keyset, rows: List, limit: int):
+    next_cursor = keyset.next_cursor(rows, limit)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,99 @@
+"""
+In-process cache of verified principals (authenticated users)
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+
+class PrincipalCache:
+    """TTL + LRU cache of the user loaded for a token.
+
+    Entries are keyed by the token ``sub`` and a hash of the token itself, so
+    a new token always goes to the database once. User updates and deletes
+    drop every entry of the user; since the cache is per process, the TTL
+    bounds how long other workers may serve a stale principal.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._keys_by_sub: Dict[str, Set[Tuple[str, str]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(sub: str, token: str) -> Tuple[str, str]:
+        return str(sub), hashlib.sha256(token.encode()).hexdigest()
+
+    def _discard(self, key: Tuple[str, str]):
+        self._entries.pop(key, None)
+        keys = self._keys_by_sub.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_sub[key[0]]
+
+    def get(self, sub: str, token: str) -> Optional[Any]:
+        """Get the cached principal, or None if missing or expired"""
+        key = self._key(sub, token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._discard(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, sub: str, token: str, principal: Any):
+        """Store a principal, evicting the least recently used entries"""
+        if self.ttl_seconds <= 0:
+            return
+        key = self._key(sub, token)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, principal)
+            self._entries.move_to_end(key)
+            self._keys_by_sub.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def invalidate(self, sub):
+        """Drop every cached token of a user"""
+        with self._lock:
+            for key in list(self._keys_by_sub.get(str(sub), ())):
+                self._discard(key)
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_sub.clear()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.PRINCIPAL_CACHE_MAX_ENTRIES)
@@ -0,0 +1,42 @@
+"""
+Application-wide JSON response class backed by orjson
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+def _default(obj: Any) -> Any:
+    """Types orjson does not serialize natively, encoded as jsonable_encoder does.
+
+    ``date``, ``datetime``, ``time`` and every ``Enum`` (RetoCategoria,
+    ChallengeStatus, HabitType, ChallengeType) are handled by orjson itself.
+    """
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if isinstance(obj, timedelta):
+        return obj.total_seconds()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that renders with orjson instead of the stdlib json module.
+
+    Naive datetimes keep the ``YYYY-MM-DDTHH:MM:SS[.ffffff]`` format produced
+    by the default response, so clients see the same payloads.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
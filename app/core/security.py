@@ -2,8 +2,13 @@
 Security utilities for authentication and authorization
 """
 
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
@@ -12,7 +17,11 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.config import settings
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 
 # JWT token handling
 security = HTTPBearer()
@@ -25,6 +34,108 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a new hash if the stored one uses an outdated policy"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check (without hashing) whether a hash uses an outdated scheme or cost"""
+    return pwd_context.needs_update(hashed_password)
+
+class PasswordHasher:
+    """Runs bcrypt hashing and verification in a bounded worker pool.
+
+    Each bcrypt call costs hundreds of milliseconds of CPU; running it on the
+    event loop thread stalls every other request. At most ``workers`` calls
+    run at once, the rest wait in a queue whose depth is reported by
+    :meth:`metrics`.
+    """
+    
+    def __init__(self, workers: int, executor_type: str = "thread"):
+        self.workers = max(1, workers)
+        self.executor_type = executor_type
+        self._executor = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.wait_time_total = 0.0
+        self.run_time_total = 0.0
+    
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.executor_type == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="password-hash"
+                    )
+            return self._executor
+    
+    async def _run(self, func, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.workers)
+        
+        queued_at = time.perf_counter()
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            with self._lock:
+                self.queued -= 1
+        
+        started = time.perf_counter()
+        with self._lock:
+            self.in_flight += 1
+            self.wait_time_total += started - queued_at
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._semaphore.release()
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+                self.run_time_total += time.perf_counter() - started
+    
+    async def hash(self, password: str) -> str:
+        """Hash a password off the event loop"""
+        return await self._run(get_password_hash, password)
+    
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password off the event loop"""
+        return await self._run(verify_password, plain_password, hashed_password)
+    
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password and compute its rehash, off the event loop"""
+        return await self._run(verify_and_update_password, plain_password, hashed_password)
+    
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "executor": self.executor_type,
+                "workers": self.workers,
+                "in_flight": self.in_flight,
+                "queue_depth": self.queued,
+                "max_queue_depth": self.max_queued,
+                "completed": self.completed,
+                "wait_time_avg_ms": round(self.wait_time_total / self.completed * 1000, 3) if self.completed else 0.0,
+                "run_time_avg_ms": round(self.run_time_total / self.completed * 1000, 3) if self.completed else 0.0
+            }
+    
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_EXECUTOR)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None, is_refresh_token: bool = False):
     """Create a JWT token (access or refresh)"""
     to_encode = data.copy()
@@ -40,6 +151,74 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None, i
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+class TokenCache:
+    """Bounded LRU cache of decoded JWT payloads keyed by the raw token.
+
+    Only tokens that passed signature verification are stored, and an entry
+    is served only while its ``exp`` claim is in the future, so a cached
+    token expires exactly when the JWT would.
+    """
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, token: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[1]
+    
+    def set(self, token: str, payload: dict):
+        exp = payload.get("exp")
+        if self.max_entries <= 0 or not isinstance(exp, (int, float)):
+            return
+        with self._lock:
+            self._entries[token] = (float(exp), payload)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def metrics(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions
+            }
+
+token_cache = TokenCache(settings.TOKEN_CACHE_MAX_ENTRIES)
+
+def decode_token(token: str) -> dict:
+    """Decode and verify a JWT, reusing the payload of recently seen tokens.
+
+    Raises JWTError if the token is invalid or expired.
+    """
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        token_cache.set(token, payload)
+    return payload
+
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Verify JWT token and return user data"""
     credentials_exception = HTTPException(
@@ -49,15 +228,10 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     )
     
     try:
-        payload = jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-        return {"user_id": user_id}
+        payload = decode_token(credentials.credentials)
     except JWTError:
         raise credentials_exception
-        if user_id is None:
-            raise credentials_exception
-        return {"user_id": user_id}
-    except JWTError:
+    user_id: str = payload.get("sub")
+    if user_id is None:
         raise credentials_exception
+    return {"user_id": user_id}
@@ -3,11 +3,14 @@ CRUD operations for Challenge model
 """
 
 from sqlalchemy.orm import Session
+from app.core.pagination import Keyset
 from app.models.database import Challenge, ChallengeStatus
 from app.schemas.challenge import ChallengeCreate, ChallengeUpdate
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import json
 
+user_challenges_keyset = Keyset(Challenge.id)
+
 def get_challenge(db: Session, challenge_id: int, user_id: int) -> Optional[Challenge]:
     """Get challenge by ID for specific user"""
     return db.query(Challenge).filter(
@@ -15,11 +18,18 @@ def get_challenge(db: Session, challenge_id: int, user_id: int) -> Optional[Chal
         Challenge.user_id == user_id
     ).first()
 
-def get_user_challenges(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Challenge]:
+def get_user_challenges(
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Tuple] = None
+) -> List[Challenge]:
     """Get all challenges for a user"""
-    return db.query(Challenge).filter(
+    query = db.query(Challenge).filter(
         Challenge.user_id == user_id
-    ).offset(skip).limit(limit).all()
+    )
+    return user_challenges_keyset.apply(query, skip, limit, after).all()
 
 def create_challenge(db: Session, challenge: ChallengeCreate, user_id: int) -> Challenge:
     """Create new challenge"""
@@ -0,0 +1,190 @@
+"""
+CRUD operations for the materialized UserChallengeStats aggregate
+"""
+
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case, update
+from app.models.database import DailyChallenge, DailyChallengeTemplate, UserChallengeStats, User
+from typing import Iterable, List, Optional
+from datetime import date
+
+def _get_stats_for_update(db: Session, user_id: int) -> Optional[UserChallengeStats]:
+    """Get the stats row locked for the rest of the transaction"""
+    return db.query(UserChallengeStats).filter(
+        UserChallengeStats.user_id == user_id
+    ).with_for_update().first()
+
+def rebuild_user_challenge_stats(db: Session, user_id: int) -> UserChallengeStats:
+    """Recompute the user's aggregate from the daily_challenges history.
+
+    The caller is responsible for committing the transaction.
+    """
+    completed_flag = case((DailyChallenge.is_completed == True, 1), else_=0)
+    days = db.query(
+        DailyChallenge.challenge_date,
+        func.count(DailyChallenge.id),
+        func.sum(completed_flag)
+    ).filter(
+        DailyChallenge.user_id == user_id
+    ).group_by(DailyChallenge.challenge_date).order_by(DailyChallenge.challenge_date).all()
+
+    total_challenges = 0
+    completed_challenges = 0
+    current_streak = 0
+    longest_streak = 0
+    last_completed_date = None
+    for challenge_date, total, completed in days:
+        total_challenges += total
+        completed_challenges += int(completed or 0)
+        if completed != total:
+            continue
+        # Un día cuenta para la racha solo si todos sus retos están completados
+        if last_completed_date is not None and (challenge_date - last_completed_date).days == 1:
+            current_streak += 1
+        else:
+            current_streak = 1
+        longest_streak = max(longest_streak, current_streak)
+        last_completed_date = challenge_date
+
+    total_points = db.query(func.sum(DailyChallengeTemplate.puntos_recompensa)).join(
+        DailyChallenge, DailyChallenge.reto_id == DailyChallengeTemplate.id
+    ).filter(
+        DailyChallenge.user_id == user_id,
+        DailyChallenge.is_completed == True
+    ).scalar() or 0
+
+    stats = db.get(UserChallengeStats, user_id)
+    if stats is None:
+        stats = UserChallengeStats(user_id=user_id)
+        db.add(stats)
+    stats.total_challenges = total_challenges
+    stats.completed_challenges = completed_challenges
+    stats.current_streak = current_streak
+    stats.longest_streak = longest_streak
+    stats.last_completed_date = last_completed_date
+    stats.total_points = int(total_points)
+    db.flush()
+    return stats
+
+def rebuild_all_user_challenge_stats(db: Session) -> int:
+    """Recompute the aggregate for every user, committing per user"""
+    user_ids = [user_id for (user_id,) in db.query(User.id).order_by(User.id).all()]
+    for user_id in user_ids:
+        rebuild_user_challenge_stats(db, user_id)
+        db.commit()
+    return len(user_ids)
+
+def record_challenges_created(
+    db: Session,
+    user_ids: Iterable[int],
+    count: int = 1,
+    challenge_date: Optional[date] = None
+) -> None:
+    """Add newly created challenges to the users' totals.
+
+    Users without an aggregate row are skipped: their row is built from the
+    history the first time it is read. With ``challenge_date``, users whose
+    last completed day is on or after it are rebuilt from the history, as a
+    pending challenge may reopen a day their streaks count. Must run after
+    the new challenges have been flushed.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    db.execute(
+        update(UserChallengeStats)
+        .where(UserChallengeStats.user_id.in_(user_ids))
+        .values(total_challenges=UserChallengeStats.total_challenges + count)
+    )
+    if challenge_date is None:
+        return
+    reopened = db.query(UserChallengeStats.user_id).filter(
+        UserChallengeStats.user_id.in_(user_ids),
+        UserChallengeStats.last_completed_date >= challenge_date
+    ).all()
+    for (user_id,) in reopened:
+        rebuild_user_challenge_stats(db, user_id)
+
+def record_challenge_completed(db: Session, challenge: DailyChallenge) -> Optional[UserChallengeStats]:
+    """Apply a challenge completion to the user's aggregate.
+
+    Must run in the same transaction as the completion, after it has been
+    flushed, so the day check sees the new state. Returns the updated
+    aggregate, ``None`` if the user has none yet.
+    """
+    return record_challenges_completed(db, challenge.user_id, [challenge])
+
+def record_challenges_completed(
+    db: Session,
+    user_id: int,
+    challenges: List[DailyChallenge]
+) -> Optional[UserChallengeStats]:
+    """Apply several completions of one user to the aggregate.
+
+    Costs the same three reads whatever the number of challenges: the locked
+    stats row, the points of every reto and the days still pending. Same
+    transaction contract as :func:`record_challenge_completed`.
+    """
+    if not challenges:
+        return None
+    stats = _get_stats_for_update(db, user_id)
+    if stats is None:
+        return None
+
+    stats.completed_challenges += len(challenges)
+    points = dict(db.query(DailyChallengeTemplate.id, DailyChallengeTemplate.puntos_recompensa).filter(
+        DailyChallengeTemplate.id.in_({challenge.reto_id for challenge in challenges})
+    ).all())
+    stats.total_points += sum(points.get(challenge.reto_id) or 0 for challenge in challenges)
+
+    dates = {challenge.challenge_date for challenge in challenges}
+    pending = {challenge_date for (challenge_date,) in db.query(DailyChallenge.challenge_date).filter(
+        DailyChallenge.user_id == user_id,
+        DailyChallenge.challenge_date.in_(dates),
+        DailyChallenge.is_completed == False
+    ).distinct()}
+    completed_days = sorted(dates - pending)
+    if not completed_days:
+        return stats
+
+    last = stats.last_completed_date
+    if last is not None and completed_days[0] < last:
+        # Completar un día antiguo puede unir rachas: recalcular desde el historial
+        db.flush()
+        return rebuild_user_challenge_stats(db, user_id)
+    for challenge_date in completed_days:
+        if last == challenge_date:
+            continue
+        if last is not None and (challenge_date - last).days == 1:
+            stats.current_streak += 1
+        else:
+            stats.current_streak = 1
+        stats.longest_streak = max(stats.longest_streak, stats.current_streak)
+        last = challenge_date
+    stats.last_completed_date = last
+    return stats
+
+def get_user_challenge_stats(db: Session, user_id: int) -> dict:
+    """Get user's challenge statistics from the aggregate (single primary-key read)"""
+    stats = db.get(UserChallengeStats, user_id, populate_existing=True)
+    if stats is None:
+        stats = rebuild_user_challenge_stats(db, user_id)
+        db.commit()
+
+    # La racha sigue viva si el último día completado fue hoy o ayer
+    current_streak = stats.current_streak
+    if stats.last_completed_date is None or (date.today() - stats.last_completed_date).days > 1:
+        current_streak = 0
+
+    completion_rate = (
+        stats.completed_challenges / stats.total_challenges * 100
+    ) if stats.total_challenges > 0 else 0
+
+    return {
+        "total_challenges": stats.total_challenges,
+        "completed_challenges": stats.completed_challenges,
+        "completion_rate": round(completion_rate, 2),
+        "current_streak": current_streak,
+        "longest_streak": stats.longest_streak,
+        "total_points": stats.total_points
+    }
@@ -3,18 +3,22 @@ CRUD operations for Criterio model - Conectado con MySQL
 """
 
 from sqlalchemy.orm import Session
+from app.core.pagination import Keyset
 from app.models.database import Criterio, CriterioReto
+from app.services.catalog_cache import catalog_cache
 from app.schemas.criterio import CriterioCreate, CriterioUpdate, CriterioRetoCreate, CriterioRetoUpdate
-from typing import List, Optional
+from typing import List, Optional, Tuple
+
+criterios_keyset = Keyset(Criterio.id)
 
 # CRUD para Criterios
 def get_criterio(db: Session, criterio_id: int) -> Optional[Criterio]:
     """Get criterio by ID"""
     return db.query(Criterio).filter(Criterio.id == criterio_id).first()
 
-def get_criterios(db: Session, skip: int = 0, limit: int = 100) -> List[Criterio]:
+def get_criterios(db: Session, skip: int = 0, limit: int = 100, after: Optional[Tuple] = None) -> List[Criterio]:
     """Get all criterios"""
-    return db.query(Criterio).offset(skip).limit(limit).all()
+    return criterios_keyset.apply(db.query(Criterio), skip, limit, after).all()
 
 def get_criterios_by_reto(db: Session, reto_id: int) -> List[Criterio]:
     """Get criterios by reto ID"""
@@ -26,6 +30,7 @@ def create_criterio(db: Session, criterio: CriterioCreate) -> Criterio:
     db.add(db_criterio)
     db.commit()
     db.refresh(db_criterio)
+    catalog_cache.invalidate()
     return db_criterio
 
 def update_criterio(db: Session, criterio_id: int, criterio_update: CriterioUpdate) -> Optional[Criterio]:
@@ -40,6 +45,7 @@ def update_criterio(db: Session, criterio_id: int, criterio_update: CriterioUpda
     
     db.commit()
     db.refresh(db_criterio)
+    catalog_cache.invalidate()
     return db_criterio
 
 def delete_criterio(db: Session, criterio_id: int) -> bool:
@@ -50,6 +56,7 @@ def delete_criterio(db: Session, criterio_id: int) -> bool:
     
     db.delete(db_criterio)
     db.commit()
+    catalog_cache.invalidate()
     return True
 
 # CRUD para CriterioReto (progreso de criterios en retos de usuario)
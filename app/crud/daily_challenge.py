@@ -2,17 +2,27 @@
 CRUD operations for Daily Challenge models
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, desc
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, select
+from app.core.pagination import Keyset
 from app.models.database import DailyChallenge, DailyChallengeTemplate, Reto, User
 from app.schemas.daily_challenge import (
     DailyChallengeCreate, DailyChallengeUpdate, 
-    DailyChallengeTemplateCreate, DailyChallengeTemplateUpdate
+    DailyChallengeTemplateCreate, DailyChallengeTemplateUpdate,
+    DailyChallengeWithReto
 )
-from typing import List, Optional
+from app.crud import challenge_stats as challenge_stats_crud
+from app.services.catalog_cache import catalog_cache
+from app.services.challenge_generation import generate_daily_challenges_bulk
+from app.services.notifications import notification_service
+from typing import Dict, List, Optional, Tuple
 from datetime import date, datetime, timedelta
 import random
 
+# Más recientes primero; recorre ix_daily_challenges_user_date
+daily_challenges_keyset = Keyset(DailyChallenge.challenge_date, DailyChallenge.id, descending=True)
+
 # CRUD para DailyChallenge
 def get_daily_challenge(db: Session, challenge_id: int) -> Optional[DailyChallenge]:
     """Get daily challenge by ID"""
@@ -23,7 +33,8 @@ def get_user_daily_challenges(
     user_id: int, 
     challenge_date: Optional[date] = None,
     skip: int = 0, 
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[Tuple] = None
 ) -> List[DailyChallenge]:
     """Get user's daily challenges"""
     query = db.query(DailyChallenge).filter(DailyChallenge.user_id == user_id)
@@ -31,23 +42,69 @@ def get_user_daily_challenges(
     if challenge_date:
         query = query.filter(DailyChallenge.challenge_date == challenge_date)
     
-    return query.order_by(desc(DailyChallenge.challenge_date)).offset(skip).limit(limit).all()
+    return daily_challenges_keyset.apply(query, skip, limit, after).all()
 
 def get_today_challenges(db: Session, user_id: int) -> List[DailyChallenge]:
     """Get today's challenges for a user"""
-    today = date.today()
-    today_start = datetime.combine(today, datetime.min.time())
-    today_end = datetime.combine(today, datetime.max.time())
-    
     return (db.query(DailyChallenge)
             .filter(DailyChallenge.user_id == user_id)
-            .filter(DailyChallenge.created_at.between(today_start, today_end))
+            .filter(DailyChallenge.challenge_date == date.today())
             .all())
 
+def _with_reto_projection():
+    """Columns of DailyChallengeWithReto, joined with reto in a single SELECT"""
+    return select(
+        DailyChallenge.id,
+        DailyChallenge.user_id,
+        DailyChallenge.reto_id,
+        DailyChallenge.challenge_date,
+        DailyChallenge.is_completed,
+        DailyChallenge.progress_value,
+        DailyChallenge.completed_at,
+        DailyChallenge.created_at,
+        Reto.nombre_reto.label("reto_nombre"),
+        Reto.descripcion_reto.label("reto_descripcion"),
+        Reto.tipo.label("reto_tipo")
+    ).outerjoin(Reto, DailyChallenge.reto_id == Reto.id)
+
+def get_user_daily_challenges_with_reto(
+    db: Session, 
+    user_id: int, 
+    challenge_date: Optional[date] = None,
+    skip: int = 0, 
+    limit: int = 100,
+    after: Optional[Tuple] = None
+) -> List[DailyChallengeWithReto]:
+    """Get user's daily challenges with their reto info, without loading ORM objects"""
+    query = _with_reto_projection().where(DailyChallenge.user_id == user_id)
+    
+    if challenge_date:
+        query = query.where(DailyChallenge.challenge_date == challenge_date)
+    
+    query = daily_challenges_keyset.apply(query, skip, limit, after)
+    return [DailyChallengeWithReto(**row._mapping) for row in db.execute(query)]
+
+def get_user_daily_challenges_changed_since(
+    db: Session,
+    user_id: int,
+    since: Optional[datetime] = None
+) -> List[DailyChallengeWithReto]:
+    """Get user's daily challenges written at or after ``since`` (today's when ``since`` is None)"""
+    query = _with_reto_projection().where(DailyChallenge.user_id == user_id)
+    if since is None:
+        query = query.where(DailyChallenge.challenge_date == date.today())
+    else:
+        query = query.where(DailyChallenge.updated_at >= since)
+    return [DailyChallengeWithReto(**row._mapping) for row in db.execute(query.order_by(DailyChallenge.id))]
+
 def create_daily_challenge(db: Session, challenge: DailyChallengeCreate) -> DailyChallenge:
     """Create new daily challenge"""
     db_challenge = DailyChallenge(**challenge.dict())
     db.add(db_challenge)
+    db.flush()
+    challenge_stats_crud.record_challenges_created(
+        db, [db_challenge.user_id], challenge_date=db_challenge.challenge_date
+    )
     db.commit()
     db.refresh(db_challenge)
     return db_challenge
@@ -62,6 +119,7 @@ def update_daily_challenge(
     if not db_challenge:
         return None
     
+    was_completed = bool(db_challenge.is_completed)
     update_data = challenge_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_challenge, field, value)
@@ -70,34 +128,72 @@ def update_daily_challenge(
     if update_data.get('is_completed') and not db_challenge.completed_at:
         db_challenge.completed_at = datetime.now()
     
+    # Mantener el agregado de estadísticas en la misma transacción
+    db.flush()
+    if db_challenge.is_completed and not was_completed:
+        stats = challenge_stats_crud.record_challenge_completed(db, db_challenge)
+        notification_service.send_challenge_completion_notification(
+            db, db_challenge.user_id, db_challenge.reto.nombre_reto if db_challenge.reto else "Reto", stats
+        )
+    elif was_completed and not db_challenge.is_completed:
+        challenge_stats_crud.rebuild_user_challenge_stats(db, db_challenge.user_id)
+    
     db.commit()
     db.refresh(db_challenge)
     return db_challenge
 
 def complete_daily_challenge(db: Session, challenge_id: int, progress_value: float = 1.0) -> Optional[DailyChallenge]:
-    """Mark daily challenge as completed"""
-    challenge = update_daily_challenge(
+    """Mark daily challenge as completed (the notification is queued in the same transaction)"""
+    return update_daily_challenge(
         db, 
         challenge_id, 
         DailyChallengeUpdate(is_completed=True, progress_value=progress_value)
     )
-    
-    # Enviar notificación de completado
-    if challenge:
-        from app.services.notifications import notification_service
-        challenge_name = challenge.reto.nombre_reto if challenge.reto else "Reto"
-        notification_service.send_challenge_completion_notification(
-            challenge.user_id, challenge_name
-        )
-        
-        # Verificar si hay racha para notificar
-        stats = get_user_challenge_stats(db, challenge.user_id)
-        if stats['current_streak'] > 0:
-            notification_service.send_streak_notification(
-                challenge.user_id, stats['current_streak']
-            )
-    
-    return challenge
+
+def get_user_daily_challenges_by_ids(db: Session, user_id: int, challenge_ids: List[int]) -> List[DailyChallenge]:
+    """Get the user's challenges among the given ids, with their reto, in one IN query"""
+    return db.query(DailyChallenge).options(joinedload(DailyChallenge.reto)).filter(
+        DailyChallenge.user_id == user_id,
+        DailyChallenge.id.in_(challenge_ids)
+    ).all()
+
+def complete_daily_challenges(
+    db: Session,
+    user_id: int,
+    challenges: List[DailyChallenge],
+    progress_values: Dict[int, float]
+) -> Tuple[List[DailyChallenge], dict]:
+    """Mark several of the user's daily challenges as completed in one transaction.
+
+    ``challenges`` come from :func:`get_user_daily_challenges_by_ids`. The
+    statistics are read once and a single queued notification covers the batch.
+    """
+    now = datetime.now()
+    ids = [challenge.id for challenge in challenges]
+    names = []
+    for challenge in challenges:
+        challenge.is_completed = True
+        challenge.progress_value = progress_values[challenge.id]
+        if not challenge.completed_at:
+            challenge.completed_at = now
+        names.append(challenge.reto.nombre_reto if challenge.reto else "Reto")
+
+    try:
+        db.flush()
+        aggregate = challenge_stats_crud.record_challenges_completed(db, user_id, challenges)
+        notification_service.send_challenges_completion_notification(db, user_id, names, aggregate)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    # Las estadísticas antes de recargar: si el agregado no existe se construye y confirma
+    stats = get_user_challenge_stats(db, user_id)
+    # Recargar el lote en una consulta en lugar de un refresh por reto
+    completed = db.query(DailyChallenge).filter(
+        DailyChallenge.id.in_(ids)
+    ).order_by(DailyChallenge.id).populate_existing().all()
+    return completed, stats
 
 def delete_daily_challenge(db: Session, challenge_id: int) -> bool:
     """Delete daily challenge"""
@@ -105,7 +201,10 @@ def delete_daily_challenge(db: Session, challenge_id: int) -> bool:
     if not db_challenge:
         return False
     
+    user_id = db_challenge.user_id
     db.delete(db_challenge)
+    db.flush()
+    challenge_stats_crud.rebuild_user_challenge_stats(db, user_id)
     db.commit()
     return True
 
@@ -139,6 +238,7 @@ def create_daily_challenge_template(db: Session, template: DailyChallengeTemplat
     db.add(db_template)
     db.commit()
     db.refresh(db_template)
+    catalog_cache.invalidate()
     return db_template
 
 def update_daily_challenge_template(
@@ -157,6 +257,7 @@ def update_daily_challenge_template(
     
     db.commit()
     db.refresh(db_template)
+    catalog_cache.invalidate()
     return db_template
 
 def delete_daily_challenge_template(db: Session, template_id: int) -> bool:
@@ -167,6 +268,7 @@ def delete_daily_challenge_template(db: Session, template_id: int) -> bool:
     
     db.delete(db_template)
     db.commit()
+    catalog_cache.invalidate()
     return True
 
 # Lógica de rotación de retos diarios
@@ -214,64 +316,21 @@ def generate_daily_challenges_for_user(db: Session, user_id: int, challenge_date
 
 def generate_daily_challenges_for_all_users(db: Session, challenge_date: date) -> int:
     """Generate daily challenges for all active users"""
-    # Obtener todos los usuarios activos
-    users = db.query(User).all()
-    
-    total_challenges = 0
-    for user in users:
-        challenges = generate_daily_challenges_for_user(db, user.id, challenge_date)
-        total_challenges += len(challenges)
-    
-    return total_challenges
+    # Generación masiva: una consulta por conjunto y INSERTs multi-fila por lotes
+    report = generate_daily_challenges_bulk(db, challenge_date)
+    return report["challenges_created"]
 
 def get_user_challenge_stats(db: Session, user_id: int) -> dict:
     """Get user's challenge statistics"""
-    # Total de retos
-    total_challenges = db.query(DailyChallenge).filter(DailyChallenge.user_id == user_id).count()
-    
-    # Retos completados
-    completed_challenges = db.query(DailyChallenge).filter(
-        and_(
-            DailyChallenge.user_id == user_id,
-            DailyChallenge.is_completed == True
-        )
-    ).count()
-    
-    # Tasa de completación
-    completion_rate = (completed_challenges / total_challenges * 100) if total_challenges > 0 else 0
-    
-    # Racha actual (días consecutivos completados)
-    current_streak = 0
-    today = date.today()
-    
-    # Verificar días consecutivos hacia atrás
-    for i in range(30):  # Máximo 30 días hacia atrás
-        check_date = today - timedelta(days=i)
-        day_challenges = get_user_daily_challenges(db, user_id, check_date)
-        
-        if not day_challenges:
-            break
-            
-        all_completed = all(challenge.is_completed for challenge in day_challenges)
-        if all_completed:
-            current_streak += 1
-        else:
-            break
-    
-    # Puntos totales (suma de puntos de retos completados)
-    total_points = db.query(func.sum(DailyChallengeTemplate.puntos_recompensa)).join(
-        DailyChallenge, DailyChallenge.reto_id == DailyChallengeTemplate.id
-    ).filter(
-        and_(
-            DailyChallenge.user_id == user_id,
-            DailyChallenge.is_completed == True
-        )
-    ).scalar() or 0
-    
-    return {
-        "total_challenges": total_challenges,
-        "completed_challenges": completed_challenges,
-        "completion_rate": round(completion_rate, 2),
-        "current_streak": current_streak,
-        "total_points": total_points
-    }
+    # Lectura por clave primaria del agregado materializado user_challenge_stats
+    return challenge_stats_crud.get_user_challenge_stats(db, user_id)
+
+# Variante asíncrona de /daily-challenges/hoy (AsyncSession)
+async def get_today_challenges_with_reto_async(db: AsyncSession, user_id: int) -> List[DailyChallengeWithReto]:
+    """Get today's challenges for a user with their reto info, in a single SELECT"""
+    result = await db.execute(
+        _with_reto_projection()
+        .where(DailyChallenge.user_id == user_id)
+        .where(DailyChallenge.challenge_date == date.today())
+    )
+    return [DailyChallengeWithReto(**row._mapping) for row in result]
@@ -3,9 +3,12 @@ CRUD operations for Habit model
 """
 
 from sqlalchemy.orm import Session
+from app.core.pagination import Keyset
 from app.models.database import Habit
 from app.schemas.habit import HabitCreate, HabitUpdate
-from typing import List, Optional
+from typing import List, Optional, Tuple
+
+user_habits_keyset = Keyset(Habit.id)
 
 def get_habit(db: Session, habit_id: int, user_id: int) -> Optional[Habit]:
     """Get habit by ID for specific user"""
@@ -14,12 +17,19 @@ def get_habit(db: Session, habit_id: int, user_id: int) -> Optional[Habit]:
         Habit.user_id == user_id
     ).first()
 
-def get_user_habits(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Habit]:
+def get_user_habits(
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Tuple] = None
+) -> List[Habit]:
     """Get all habits for a user"""
-    return db.query(Habit).filter(
+    query = db.query(Habit).filter(
         Habit.user_id == user_id,
         Habit.is_active == True
-    ).offset(skip).limit(limit).all()
+    )
+    return user_habits_keyset.apply(query, skip, limit, after).all()
 
 def create_habit(db: Session, habit: HabitCreate, user_id: int) -> Habit:
     """Create new habit"""
@@ -4,17 +4,20 @@ CRUD operations for Logro model - Conectado con MySQL
 
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
+from app.core.pagination import Keyset
 from app.models.database import Logro, RetoUsuario, Reto, User
 from app.schemas.logro import LogroCreate, LogroUpdate
-from typing import List, Optional
+from typing import List, Optional, Tuple
+
+logros_keyset = Keyset(Logro.id)
 
 def get_logro(db: Session, logro_id: int) -> Optional[Logro]:
     """Get logro by ID"""
     return db.query(Logro).filter(Logro.id == logro_id).first()
 
-def get_logros(db: Session, skip: int = 0, limit: int = 100) -> List[Logro]:
+def get_logros(db: Session, skip: int = 0, limit: int = 100, after: Optional[Tuple] = None) -> List[Logro]:
     """Get all logros"""
-    return db.query(Logro).offset(skip).limit(limit).all()
+    return logros_keyset.apply(db.query(Logro), skip, limit, after).all()
 
 def get_logros_by_usuario(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Logro]:
     """Get logros by user ID"""
@@ -4,9 +4,11 @@ CRUD operations for Progress model
 
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
+from app.core.dates import day_bounds, on_day
+from app.core.pagination import Keyset
 from app.models.database import ProgressRecord, Habit, Challenge
 from app.schemas.progress import ProgressRecordCreate, ProgressRecordUpdate
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime, date
 
 def get_progress_record(db: Session, record_id: int, user_id: int) -> Optional[ProgressRecord]:
@@ -16,11 +18,19 @@ def get_progress_record(db: Session, record_id: int, user_id: int) -> Optional[P
         ProgressRecord.user_id == user_id
     ).first()
 
-def get_user_progress_records(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[ProgressRecord]:
-    """Get all progress records for a user"""
-    return db.query(ProgressRecord).filter(
-        ProgressRecord.user_id == user_id
-    ).offset(skip).limit(limit).all()
+# Más recientes primero; recorre ix_progress_records_user_date
+progress_records_keyset = Keyset(ProgressRecord.date, ProgressRecord.id, descending=True)
+
+def get_user_progress_records(
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Tuple] = None
+) -> List[ProgressRecord]:
+    """Get all progress records for a user, newest first"""
+    query = db.query(ProgressRecord).filter(ProgressRecord.user_id == user_id)
+    return progress_records_keyset.apply(query, skip, limit, after).all()
 
 def get_habit_progress(db: Session, habit_id: int, user_id: int, start_date: date = None, end_date: date = None) -> List[ProgressRecord]:
     """Get progress records for a specific habit"""
@@ -29,10 +39,11 @@ def get_habit_progress(db: Session, habit_id: int, user_id: int, start_date: dat
         ProgressRecord.user_id == user_id
     )
     
+    # Rango semiabierto: end_date incluye el día completo
     if start_date:
-        query = query.filter(ProgressRecord.date >= start_date)
+        query = query.filter(ProgressRecord.date >= day_bounds(start_date)[0])
     if end_date:
-        query = query.filter(ProgressRecord.date <= end_date)
+        query = query.filter(ProgressRecord.date < day_bounds(end_date)[1])
     
     return query.order_by(ProgressRecord.date.desc()).all()
 
@@ -87,7 +98,7 @@ def get_user_stats(db: Session, user_id: int) -> dict:
     today = date.today()
     completed_today = db.query(ProgressRecord).filter(
         ProgressRecord.user_id == user_id,
-        func.date(ProgressRecord.date) == today
+        on_day(ProgressRecord.date, today)
     ).count()
     
     # Total challenges
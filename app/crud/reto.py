@@ -3,18 +3,22 @@ CRUD operations for Reto model - Conectado con MySQL
 """
 
 from sqlalchemy.orm import Session
+from app.core.pagination import Keyset
 from app.models.database import Reto, RetoUsuario
+from app.services.catalog_cache import catalog_cache
 from app.schemas.reto import RetoCreate, RetoUpdate, RetoUsuarioCreate, RetoUsuarioUpdate
-from typing import List, Optional
+from typing import List, Optional, Tuple
+
+retos_keyset = Keyset(Reto.id)
 
 # CRUD para Retos
 def get_reto(db: Session, reto_id: int) -> Optional[Reto]:
     """Get reto by ID"""
     return db.query(Reto).filter(Reto.id == reto_id).first()
 
-def get_retos(db: Session, skip: int = 0, limit: int = 100) -> List[Reto]:
+def get_retos(db: Session, skip: int = 0, limit: int = 100, after: Optional[Tuple] = None) -> List[Reto]:
     """Get all retos"""
-    return db.query(Reto).offset(skip).limit(limit).all()
+    return retos_keyset.apply(db.query(Reto), skip, limit, after).all()
 
 def create_reto(db: Session, reto: RetoCreate) -> Reto:
     """Create new reto"""
@@ -22,6 +26,7 @@ def create_reto(db: Session, reto: RetoCreate) -> Reto:
     db.add(db_reto)
     db.commit()
     db.refresh(db_reto)
+    catalog_cache.invalidate()
     return db_reto
 
 def update_reto(db: Session, reto_id: int, reto_update: RetoUpdate) -> Optional[Reto]:
@@ -36,6 +41,7 @@ def update_reto(db: Session, reto_id: int, reto_update: RetoUpdate) -> Optional[
     
     db.commit()
     db.refresh(db_reto)
+    catalog_cache.invalidate()
     return db_reto
 
 def delete_reto(db: Session, reto_id: int) -> bool:
@@ -46,6 +52,7 @@ def delete_reto(db: Session, reto_id: int) -> bool:
     
     db.delete(db_reto)
     db.commit()
+    catalog_cache.invalidate()
     return True
 
 # CRUD para RetoUsuario (progreso de usuario en retos)
@@ -3,11 +3,21 @@ CRUD operations for User model - Conectado con MySQL
 """
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, select, update
+from app.database import get_async_sessionmaker
 from app.models.database import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash, verify_password
+from app.core.principal_cache import principal_cache
+from app.core.security import get_password_hash, password_hasher
 from typing import Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Referencias a las tareas en segundo plano para que no las recoja el GC
+_background_tasks = set()
 
 def get_user(db: Session, user_id: int) -> Optional[User]:
     """Get user by ID"""
@@ -17,9 +27,10 @@ def get_user_by_email(db: Session, correo: str) -> Optional[User]:
     """Get user by email"""
     return db.query(User).filter(User.correo == correo).first()
 
-def create_user(db: Session, user: UserCreate) -> User:
+def create_user(db: Session, user: UserCreate, hashed_password: Optional[str] = None) -> User:
     """Create new user"""
-    hashed_password = get_password_hash(user.clave)
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.clave)
     db_user = User(
         nombre=user.nombre,
         correo=user.correo,
@@ -47,17 +58,9 @@ def update_user(db: Session, user_id: int, user_update: UserUpdate) -> Optional[
     
     db.commit()
     db.refresh(db_user)
+    principal_cache.invalidate(user_id)
     return db_user
 
-def authenticate_user(db: Session, correo: str, clave: str) -> Optional[User]:
-    """Authenticate user with email and password"""
-    user = get_user_by_email(db, correo)
-    if not user:
-        return None
-    if not verify_password(clave, user.clave):
-        return None
-    return user
-
 def delete_user(db: Session, user_id: int) -> bool:
     """Delete user"""
     db_user = get_user(db, user_id)
@@ -66,4 +69,49 @@ def delete_user(db: Session, user_id: int) -> bool:
     
     db.delete(db_user)
     db.commit()
-    return True
\ No newline at end of file
+    principal_cache.invalidate(user_id)
+    return True
+
+# Variantes asíncronas (AsyncSession)
+async def get_user_by_email_async(db: AsyncSession, correo: str) -> Optional[User]:
+    """Get user by email"""
+    result = await db.execute(select(User).where(User.correo == correo))
+    return result.scalars().first()
+
+async def authenticate_user_async(db: AsyncSession, correo: str, clave: str) -> Optional[User]:
+    """Authenticate user with email and password"""
+    user = await get_user_by_email_async(db, correo)
+    if not user:
+        return None
+    # bcrypt se ejecuta en el pool de workers, fuera del event loop
+    verified, new_hash = await password_hasher.verify_and_update(clave, user.clave)
+    if not verified:
+        return None
+    # Guardar el hash con el coste actual fuera del camino de la petición
+    if new_hash:
+        task = asyncio.get_running_loop().create_task(
+            store_rehashed_password(user.id, new_hash, user.clave)
+        )
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    return user
+
+async def store_rehashed_password(user_id: int, new_hash: str, old_hash: str, session_factory=None) -> bool:
+    """Replace ``old_hash`` with ``new_hash``, computed by the login's verification.
+
+    The update only applies if the stored hash is still ``old_hash``, so a
+    password changed in the meantime is never overwritten.
+    """
+    try:
+        session_factory = session_factory or get_async_sessionmaker()
+        async with session_factory() as db:
+            result = await db.execute(
+                update(User)
+                .where(User.id == user_id, User.clave == old_hash)
+                .values(clave=new_hash)
+            )
+            await db.commit()
+            return result.rowcount == 1
+    except Exception as e:
+        logger.error(f"Error rehashing password for user {user_id}: {str(e)}")
+        return False
@@ -1,18 +1,177 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
 from contextlib import contextmanager
+from threading import Lock
+import time
 
 from app.core.config import settings
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
+class PoolMetrics:
+    """Counters collected from connection pool events"""
+    
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+    
+    def reset(self):
+        with self._lock:
+            self.connections_created = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.wait_count = 0
+            self.wait_time_total = 0.0
+            self.wait_time_max = 0.0
+    
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.wait_count += 1
+            self.wait_time_total += seconds
+            self.wait_time_max = max(self.wait_time_max, seconds)
+    
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+    
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg_wait = self.wait_time_total / self.wait_count if self.wait_count else 0.0
+            return {
+                "connections_created": self.connections_created,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_time_avg_ms": round(avg_wait * 1000, 3),
+                "wait_time_max_ms": round(self.wait_time_max * 1000, 3),
+                "wait_time_total_ms": round(self.wait_time_total * 1000, 3)
+            }
+
+pool_metrics = PoolMetrics()
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.increment("timeouts")
+            raise
+        finally:
+            pool_metrics.record_wait(time.perf_counter() - started)
+
+def _engine_options(database_url: str) -> dict:
+    """Engine keyword arguments for the configured database"""
+    if database_url.startswith("sqlite"):
+        # SQLite: sin reciclado ni pre-ping; una única conexión compartida en memoria
+        options = {"connect_args": {"check_same_thread": False}}
+        if database_url in ("sqlite://", "sqlite:///:memory:"):
+            options["poolclass"] = StaticPool
+        return options
+    
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL
+    SQLALCHEMY_DATABASE_URL,
+    **_engine_options(SQLALCHEMY_DATABASE_URL)
 )
 
+@event.listens_for(engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    pool_metrics.increment("connections_created")
+
+@event.listens_for(engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_metrics.increment("checkouts")
+
+@event.listens_for(engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    pool_metrics.increment("checkins")
+
+@event.listens_for(engine, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    pool_metrics.increment("invalidations")
+
+def _pool_occupancy(pool) -> dict:
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+        })
+    return status
+
+def get_pool_status() -> dict:
+    """Current pool occupancy plus the collected event counters.
+
+    ``async_pool`` reports the AsyncSession engine, ``None`` until the first
+    async request creates it.
+    """
+    status = _pool_occupancy(engine.pool)
+    status.update(pool_metrics.snapshot())
+    status["async_pool"] = _pool_occupancy(_async_engine.pool) if _async_engine is not None else None
+    return status
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def _async_database_url(database_url: str) -> str:
+    """Map the configured sync URL to its asyncio driver (aiomysql/aiosqlite)"""
+    for sync_prefix, async_prefix in (
+        ("mysql+pymysql://", "mysql+aiomysql://"),
+        ("mysql://", "mysql+aiomysql://"),
+        ("sqlite://", "sqlite+aiosqlite://"),
+    ):
+        if database_url.startswith(sync_prefix):
+            return async_prefix + database_url[len(sync_prefix):]
+    return database_url
+
+_async_engine = None
+_AsyncSessionLocal = None
+
+def get_async_engine():
+    """Async engine, created on first use so the async drivers stay optional"""
+    global _async_engine
+    if _async_engine is None:
+        options = _engine_options(SQLALCHEMY_DATABASE_URL)
+        # Los pools asyncio usan AsyncAdaptedQueuePool en lugar del pool instrumentado
+        if options.get("poolclass") is InstrumentedQueuePool:
+            del options["poolclass"]
+        _async_engine = create_async_engine(
+            _async_database_url(SQLALCHEMY_DATABASE_URL),
+            **options
+        )
+    return _async_engine
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    """Factory for AsyncSession bound to the async engine"""
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        _AsyncSessionLocal = async_sessionmaker(
+            bind=get_async_engine(),
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False
+        )
+    return _AsyncSessionLocal
+
 Base = declarative_base()
 
 def get_db():
@@ -23,6 +182,11 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Dependency for async database session"""
+    async with get_async_sessionmaker()() as db:
+        yield db
+
 async def init_db():
     """Initialize database and create tables"""
     try:
@@ -2,7 +2,7 @@
 Database models for UpDaily API - Conectado con MySQL
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Text, Enum, Date, Time, BINARY
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Text, Enum, Date, Time, BINARY, Index, LargeBinary, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -60,6 +60,10 @@ class Reto(Base):
     fecha_asignacion = Column(Date, default=datetime.utcnow().date)
     activo = Column(Boolean, default=True)
     
+    __table_args__ = (
+        Index("ix_reto_categoria_activo_fecha", "categoria", "activo", "fecha_asignacion"),
+    )
+    
     # Relaciones
     retos_usuario = relationship("RetoUsuario", back_populates="reto")
     criterios_reto = relationship("CriterioReto", back_populates="reto")
@@ -103,6 +107,12 @@ class RetoUsuario(Base):
     id_usuario = Column(Integer, ForeignKey("usuario.id"), nullable=False)
     id_reto = Column(Integer, ForeignKey("reto.id"), nullable=False)
     progreso_reto = Column(Float, default=0.0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("ix_reto_usuario_usuario_reto", "id_usuario", "id_reto"),
+        Index("ix_reto_usuario_usuario_updated", "id_usuario", "updated_at"),
+    )
     
     # Relaciones
     usuario = relationship("User", back_populates="retos_usuario")
@@ -117,6 +127,11 @@ class Logro(Base):
     id = Column(Integer, primary_key=True, index=True)
     id_reto_usuario = Column(Integer, ForeignKey("reto_usuario.id"), nullable=True)
     id_usuario = Column(Integer, ForeignKey("usuario.id"), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("ix_logros_usuario_updated", "id_usuario", "updated_at"),
+    )
     
     # Relaciones
     reto_usuario = relationship("RetoUsuario", back_populates="logros")
@@ -137,7 +152,11 @@ class Habit(Base):
     color = Column(String(50))
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("ix_habits_user_updated", "user_id", "updated_at"),
+    )
     
     # Relaciones
     user = relationship("User", foreign_keys=[user_id])
@@ -162,7 +181,13 @@ class Challenge(Base):
     end_date = Column(DateTime(timezone=True))
     completed_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Versión para last-writer-wins del sync offline, en UTC: hora del servidor o del evento aplicado
+    version_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_challenges_user_updated", "user_id", "updated_at"),
+    )
     
     # Relaciones
     user = relationship("User", foreign_keys=[user_id])
@@ -179,6 +204,11 @@ class ProgressRecord(Base):
     notes = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
+    __table_args__ = (
+        Index("ix_progress_records_user_habit_date", "user_id", "habit_id", "date"),
+        Index("ix_progress_records_user_date", "user_id", "date"),
+    )
+    
     # Relaciones
     user = relationship("User", foreign_keys=[user_id])
     habit = relationship("Habit", back_populates="progress_records")
@@ -195,6 +225,16 @@ class DailyChallenge(Base):
     completed_at = Column(DateTime(timezone=True), nullable=True)
     progress_value = Column(Float, default=0.0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Versión para last-writer-wins del sync offline, en UTC: hora del servidor o del evento aplicado
+    version_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_daily_challenges_user_date", "user_id", "challenge_date"),
+        Index("ix_daily_challenges_user_completed", "user_id", "is_completed", "completed_at"),
+        Index("ix_daily_challenges_user_created", "user_id", "created_at"),
+        Index("ix_daily_challenges_user_updated", "user_id", "updated_at"),
+    )
     
     # Relaciones
     user = relationship("User", foreign_keys=[user_id])
@@ -212,4 +252,91 @@ class DailyChallengeTemplate(Base):
     dificultad = Column(Integer, default=1)  # 1=fácil, 2=medio, 3=difícil
     puntos_recompensa = Column(Integer, default=10)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# Agregado materializado de estadísticas de retos diarios por usuario
+class UserChallengeStats(Base):
+    __tablename__ = "user_challenge_stats"
+    
+    user_id = Column(Integer, ForeignKey("usuario.id"), primary_key=True)
+    total_challenges = Column(Integer, default=0, nullable=False)
+    completed_challenges = Column(Integer, default=0, nullable=False)
+    current_streak = Column(Integer, default=0, nullable=False)
+    longest_streak = Column(Integer, default=0, nullable=False)
+    last_completed_date = Column(Date, nullable=True)  # último día con todos los retos completados
+    total_points = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relaciones
+    user = relationship("User", foreign_keys=[user_id])
+
+# Respuestas guardadas de peticiones POST con cabecera Idempotency-Key
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)  # sha256 de método, ruta y cuerpo
+    status_code = Column(Integer, nullable=True)  # NULL mientras la petición original está en curso
+    content_type = Column(String(100), nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    
+    __table_args__ = (
+        Index("ux_idempotency_keys_user_key", "user_id", "key", unique=True),
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+# Lápidas de las filas borradas, para que /sync/changes informe de los borrados
+class SyncTombstone(Base):
+    __tablename__ = "sync_tombstones"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    entity_type = Column(String(32), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        Index("ix_sync_tombstones_user_deleted", "user_id", "deleted_at"),
+    )
+
+# Tablas que sigue la sincronización por delta: tipo de entidad y columna del usuario
+SYNC_ENTITIES = {
+    Habit: ("habits", "user_id"),
+    Challenge: ("challenges", "user_id"),
+    DailyChallenge: ("daily_challenges", "user_id"),
+    Logro: ("logros", "id_usuario"),
+    RetoUsuario: ("retos_usuario", "id_usuario"),
+}
+
+def _record_tombstone(mapper, connection, target):
+    """Write the tombstone in the same transaction as the delete"""
+    entity_type, user_column = SYNC_ENTITIES[mapper.class_]
+    connection.execute(SyncTombstone.__table__.insert().values(
+        user_id=getattr(target, user_column), entity_type=entity_type, entity_id=target.id
+    ))
+
+for _model in SYNC_ENTITIES:
+    event.listen(_model, "after_delete", _record_tombstone)
+
+# Notificaciones pendientes de envío, escritas en la transacción del cambio que las genera
+class NotificationOutbox(Base):
+    __tablename__ = "notification_outbox"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    kind = Column(String(32), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    status = Column(String(16), default="pending", nullable=False)  # pending, sent, dead
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, nullable=False)  # también plazo de la reserva de un lote en curso
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index("ix_notification_outbox_status_next", "status", "next_attempt_at"),
+    )
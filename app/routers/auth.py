@@ -5,16 +5,19 @@ Authentication endpoints
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from datetime import timedelta
 from jose import JWTError, jwt
 
 from app.schemas.auth import UserLogin, Token, RefreshToken
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.core.config import settings
-from app.core.security import create_access_token, verify_token
+from app.core.security import create_access_token, verify_token, password_hasher
+from app.core.deps import get_current_active_user
 from app.crud import user as user_crud
-from app.schemas.user import UserCreate, User, Token
+from app.schemas.user import UserCreate, User, UserPrincipal, Token
 from app.schemas.auth import UserLogin
 
 router = APIRouter()
@@ -23,20 +26,22 @@ router = APIRouter()
 async def register(user: UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
     # Check if user already exists
-    db_user = user_crud.get_user_by_email(db, correo=user.correo)
+    # La Session síncrona va al threadpool para no bloquear el event loop
+    db_user = await run_in_threadpool(user_crud.get_user_by_email, db, user.correo)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # Create new user
-    return user_crud.create_user(db=db, user=user)
+    # Create new user (bcrypt fuera del event loop)
+    hashed_password = await password_hasher.hash(user.clave)
+    return await run_in_threadpool(user_crud.create_user, db, user, hashed_password)
 
 @router.post("/login", response_model=Token)
-async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Login user and return access and refresh tokens"""
-    user = user_crud.authenticate_user(db, user_credentials.correo, user_credentials.clave)
+    user = await user_crud.authenticate_user_async(db, user_credentials.correo, user_credentials.clave)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -65,7 +70,7 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     }
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(token: RefreshToken, db: Session = Depends(get_db)):
+def refresh_token(token: RefreshToken, db: Session = Depends(get_db)):
     """Get new access token using refresh token"""
     try:
         # Verificar el refresh token
@@ -124,9 +129,9 @@ async def refresh_token(token: RefreshToken, db: Session = Depends(get_db)):
         )
 
 @router.post("/token", response_model=Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """OAuth2 compatible token endpoint"""
-    user = user_crud.authenticate_user(db, form_data.username, form_data.password)
+    user = await user_crud.authenticate_user_async(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -142,12 +147,6 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=User)
-async def read_users_me(current_user: dict = Depends(verify_token), db: Session = Depends(get_db)):
+async def read_users_me(current_user: UserPrincipal = Depends(get_current_active_user)):
     """Get current user information"""
-    user = user_crud.get_user(db, user_id=int(current_user["user_id"]))
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    return user
+    return current_user
@@ -19,26 +19,34 @@ class CategoryStats(BaseModel):
     racha_actual: int
     porcentaje_completado: float
 
+@router.get("/all", response_model=List[CategoryStats])
+def get_all_category_stats(
+    current_user: dict = Depends(verify_token),
+    db: Session = Depends(get_db)
+):
+    """Get statistics for every category in a single call"""
+    return category_stats_service.get_all_category_stats(db, int(current_user["user_id"]))
+
 @router.get("/social", response_model=CategoryStats)
-async def get_social_stats(
+def get_social_stats(
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
 ):
     """Get statistics for social challenges"""
-    return category_stats_service.get_social_stats(db, current_user["id"])
+    return category_stats_service.get_social_stats(db, int(current_user["user_id"]))
 
 @router.get("/fisica", response_model=CategoryStats)
-async def get_physical_stats(
+def get_physical_stats(
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
 ):
     """Get statistics for physical challenges"""
-    return category_stats_service.get_physical_stats(db, current_user["id"])
+    return category_stats_service.get_physical_stats(db, int(current_user["user_id"]))
 
 @router.get("/intelectual", response_model=CategoryStats)
-async def get_intellectual_stats(
+def get_intellectual_stats(
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
 ):
     """Get statistics for intellectual challenges"""
-    return category_stats_service.get_intellectual_stats(db, current_user["id"])
\ No newline at end of file
+    return category_stats_service.get_intellectual_stats(db, int(current_user["user_id"]))
\ No newline at end of file
@@ -2,34 +2,45 @@
 Challenge management endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from typing import List, Dict
+from typing import List, Optional, Dict
 from datetime import date, datetime
 import random
 
 from app.database import get_db
+from app.core.dates import on_day
+from app.core.pagination import set_next_cursor
 from app.core.security import verify_token
 from app.crud import challenge as challenge_crud
+from app.crud import challenge_stats as challenge_stats_crud
 from app.schemas.challenge import Challenge, ChallengeCreate, ChallengeUpdate, ChallengeProgress
 from app.models.database import DailyChallenge, RetoCategoria, Reto
+from app.services.delta_sync_service import record_tombstones
 from datetime import date
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Challenge])
-async def get_challenges(
+def get_challenges(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
 ):
     """Get all challenges for current user"""
-    return challenge_crud.get_user_challenges(db, user_id=int(current_user["user_id"]), skip=skip, limit=limit)
+    rows = challenge_crud.get_user_challenges(
+        db, user_id=int(current_user["user_id"]), skip=skip, limit=limit,
+        after=challenge_crud.user_challenges_keyset.decode(cursor)
+    )
+    set_next_cursor(response, challenge_crud.user_challenges_keyset, rows, limit)
+    return rows
 
 @router.post("/", response_model=Challenge, status_code=status.HTTP_201_CREATED)
-async def create_challenge(
+def create_challenge(
     challenge: ChallengeCreate,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -38,7 +49,7 @@ async def create_challenge(
     return challenge_crud.create_challenge(db=db, challenge=challenge, user_id=int(current_user["user_id"]))
 
 @router.get("/{challenge_id}", response_model=Challenge)
-async def get_challenge(
+def get_challenge(
     challenge_id: int,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -53,7 +64,7 @@ async def get_challenge(
     return challenge
 
 @router.put("/{challenge_id}", response_model=Challenge)
-async def update_challenge(
+def update_challenge(
     challenge_id: int,
     challenge_update: ChallengeUpdate,
     current_user: dict = Depends(verify_token),
@@ -69,7 +80,7 @@ async def update_challenge(
     return challenge
 
 @router.post("/{challenge_id}/progress", response_model=Challenge)
-async def update_challenge_progress(
+def update_challenge_progress(
     challenge_id: int,
     progress: ChallengeProgress,
     current_user: dict = Depends(verify_token),
@@ -85,7 +96,7 @@ async def update_challenge_progress(
     return challenge
 
 @router.delete("/{challenge_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_challenge(
+def delete_challenge(
     challenge_id: int,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -99,7 +110,7 @@ async def delete_challenge(
         )
 
 @router.post("/generate-daily", status_code=status.HTTP_201_CREATED)
-async def generate_daily_challenges(
+def generate_daily_challenges(
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
 ):
@@ -108,12 +119,17 @@ async def generate_daily_challenges(
         user_id = int(current_user["user_id"])
         today = date.today()
 
-        # Eliminar solo los retos creados hoy
-        db.query(DailyChallenge).filter(
+        # Eliminar solo los retos creados hoy, dejando sus lápidas para /sync/changes
+        replaced_ids = [challenge_id for (challenge_id,) in db.query(DailyChallenge.id).filter(
             DailyChallenge.user_id == user_id,
             DailyChallenge.challenge_date == today,
-            func.date(DailyChallenge.created_at) == today
-        ).delete(synchronize_session=False)
+            on_day(DailyChallenge.created_at, today)
+        )]
+        if replaced_ids:
+            db.query(DailyChallenge).filter(
+                DailyChallenge.id.in_(replaced_ids)
+            ).delete(synchronize_session=False)
+            record_tombstones(db, user_id, "daily_challenges", replaced_ids)
 
         # Obtener 2 retos aleatorios de cada categoría
         new_challenges = []
@@ -152,6 +168,8 @@ async def generate_daily_challenges(
                 "descripcion_reto": reto.descripcion_reto
             })
 
+        db.flush()
+        challenge_stats_crud.rebuild_user_challenge_stats(db, user_id)
         db.commit()
 
         return {
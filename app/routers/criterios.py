@@ -2,36 +2,44 @@
 Criterio management endpoints - Conectado con MySQL
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.database import get_db
 from app.core.security import verify_token
 from app.crud import criterio as criterio_crud
+from app.services.catalog_cache import catalog_cache, catalog_response
 from app.schemas.criterio import Criterio, CriterioCreate, CriterioUpdate, CriterioReto, CriterioRetoCreate, CriterioRetoUpdate
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Criterio])
-async def get_criterios(
+def get_criterios(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """Get all criterios"""
-    return criterio_crud.get_criterios(db, skip=skip, limit=limit)
+    snapshot = catalog_cache.get(db)
+    start = snapshot.criterio_offset(skip, criterio_crud.criterios_keyset.decode(cursor))
+    next_cursor = criterio_crud.criterios_keyset.next_cursor(snapshot.criterios[start:start + limit], limit)
+    return catalog_response(request, snapshot, lambda: snapshot.criterios_body(skip=start, limit=limit), next_cursor)
 
 @router.get("/reto/{reto_id}", response_model=List[Criterio])
-async def get_criterios_by_reto(
+def get_criterios_by_reto(
+    request: Request,
     reto_id: int,
     db: Session = Depends(get_db)
 ):
     """Get criterios by reto ID"""
-    return criterio_crud.get_criterios_by_reto(db, reto_id=reto_id)
+    snapshot = catalog_cache.get(db)
+    return catalog_response(request, snapshot, lambda: snapshot.criterios_by_reto_body(reto_id))
 
 @router.post("/", response_model=Criterio, status_code=status.HTTP_201_CREATED)
-async def create_criterio(
+def create_criterio(
     criterio: CriterioCreate,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -40,11 +48,16 @@ async def create_criterio(
     return criterio_crud.create_criterio(db=db, criterio=criterio)
 
 @router.get("/{criterio_id}", response_model=Criterio)
-async def get_criterio(
+def get_criterio(
     criterio_id: int,
     db: Session = Depends(get_db)
 ):
     """Get a specific criterio"""
+    body = catalog_cache.get(db).criterio_json_by_id.get(criterio_id)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+    
+    # Puede haberse creado en otro proceso después del último snapshot
     criterio = criterio_crud.get_criterio(db, criterio_id=criterio_id)
     if criterio is None:
         raise HTTPException(
@@ -54,7 +67,7 @@ async def get_criterio(
     return criterio
 
 @router.put("/{criterio_id}", response_model=Criterio)
-async def update_criterio(
+def update_criterio(
     criterio_id: int,
     criterio_update: CriterioUpdate,
     current_user: dict = Depends(verify_token),
@@ -70,7 +83,7 @@ async def update_criterio(
     return criterio
 
 @router.delete("/{criterio_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_criterio(
+def delete_criterio(
     criterio_id: int,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -85,7 +98,7 @@ async def delete_criterio(
 
 # Endpoints para CriterioReto (progreso de criterios)
 @router.get("/usuario/{reto_usuario_id}", response_model=List[CriterioReto])
-async def get_criterios_reto_usuario(
+def get_criterios_reto_usuario(
     reto_usuario_id: int,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -94,7 +107,7 @@ async def get_criterios_reto_usuario(
     return criterio_crud.get_criterios_reto_by_usuario(db, reto_usuario_id=reto_usuario_id)
 
 @router.post("/usuario/completar", response_model=CriterioReto, status_code=status.HTTP_201_CREATED)
-async def completar_criterio(
+def completar_criterio(
     criterio_reto: CriterioRetoCreate,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -103,7 +116,7 @@ async def completar_criterio(
     return criterio_crud.create_criterio_reto(db=db, criterio_reto=criterio_reto)
 
 @router.put("/usuario/{criterio_reto_id}/marcar-completado", response_model=CriterioReto)
-async def marcar_criterio_completado(
+def marcar_criterio_completado(
     criterio_reto_id: int,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -118,7 +131,7 @@ async def marcar_criterio_completado(
     return criterio_reto
 
 @router.put("/usuario/{criterio_reto_id}", response_model=CriterioReto)
-async def update_criterio_reto(
+def update_criterio_reto(
     criterio_reto_id: int,
     criterio_reto_update: CriterioRetoUpdate,
     current_user: dict = Depends(verify_token),
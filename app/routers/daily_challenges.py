@@ -2,28 +2,34 @@
 Daily Challenge management endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import date
 
-from app.database import get_db
+from app.database import get_db, get_async_db
+from app.core.pagination import set_next_cursor
 from app.core.security import verify_token
 from app.crud import daily_challenge as daily_challenge_crud
+from app.services.catalog_cache import catalog_cache, catalog_response
 from app.schemas.daily_challenge import (
     DailyChallenge, DailyChallengeCreate, DailyChallengeUpdate,
     DailyChallengeTemplate, DailyChallengeTemplateCreate, DailyChallengeTemplateUpdate,
-    DailyChallengeWithReto, DailyChallengeStats
+    DailyChallengeWithReto, DailyChallengeStats,
+    DailyChallengeBulkComplete, DailyChallengeBulkCompleteResult
 )
 
 router = APIRouter()
 
 # Endpoints para DailyChallenge
 @router.get("/mis-retos", response_model=List[DailyChallengeWithReto])
-async def get_my_daily_challenges(
+def get_my_daily_challenges(
+    response: Response,
     challenge_date: Optional[date] = Query(None, description="Fecha específica (por defecto: hoy)"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor X-Next-Cursor de la página anterior"),
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
 ):
@@ -31,49 +37,58 @@ async def get_my_daily_challenges(
     if challenge_date is None:
         challenge_date = date.today()
     
-    challenges = daily_challenge_crud.get_user_daily_challenges(
+    keyset = daily_challenge_crud.daily_challenges_keyset
+    challenges = daily_challenge_crud.get_user_daily_challenges_with_reto(
         db, user_id=int(current_user["user_id"]), 
-        challenge_date=challenge_date, skip=skip, limit=limit
+        challenge_date=challenge_date, skip=skip, limit=limit, after=keyset.decode(cursor)
     )
-    
-    # Enriquecer con información del reto
-    enriched_challenges = []
-    for challenge in challenges:
-        challenge_dict = challenge.__dict__.copy()
-        if challenge.reto:
-            challenge_dict.update({
-                "reto_nombre": challenge.reto.nombre_reto,
-                "reto_descripcion": challenge.reto.descripcion_reto,
-                "reto_tipo": challenge.reto.tipo
-            })
-        enriched_challenges.append(DailyChallengeWithReto(**challenge_dict))
-    
-    return enriched_challenges
+    set_next_cursor(response, keyset, challenges, limit)
+    return challenges
 
 @router.get("/hoy", response_model=List[DailyChallengeWithReto])
 async def get_today_challenges(
     current_user: dict = Depends(verify_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get today's challenges for the user"""
-    challenges = daily_challenge_crud.get_today_challenges(db, int(current_user["user_id"]))
+    return await daily_challenge_crud.get_today_challenges_with_reto_async(db, int(current_user["user_id"]))
+
+@router.post("/completar", response_model=DailyChallengeBulkCompleteResult)
+def complete_challenges(
+    payload: DailyChallengeBulkComplete,
+    current_user: dict = Depends(verify_token),
+    db: Session = Depends(get_db)
+):
+    """Mark several daily challenges as completed in one request"""
+    user_id = int(current_user["user_id"])
+    progress_values = {completion.id: completion.progress_value for completion in payload.completions}
+    if len(progress_values) != len(payload.completions):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Duplicate challenge ids"
+        )
     
-    # Enriquecer con información del reto
-    enriched_challenges = []
-    for challenge in challenges:
-        challenge_dict = challenge.__dict__.copy()
-        if challenge.reto:
-            challenge_dict.update({
-                "reto_nombre": challenge.reto.nombre_reto,
-                "reto_descripcion": challenge.reto.descripcion_reto,
-                "reto_tipo": challenge.reto.tipo
-            })
-        enriched_challenges.append(DailyChallengeWithReto(**challenge_dict))
+    # Verificar que todos los retos pertenecen al usuario con una sola consulta
+    challenges = daily_challenge_crud.get_user_daily_challenges_by_ids(db, user_id, list(progress_values))
+    missing = sorted(set(progress_values) - {challenge.id for challenge in challenges})
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Challenges not found: {missing}"
+        )
     
-    return enriched_challenges
+    already_completed = sorted(challenge.id for challenge in challenges if challenge.is_completed)
+    if already_completed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Challenges already completed: {already_completed}"
+        )
+    
+    completed, stats = daily_challenge_crud.complete_daily_challenges(db, user_id, challenges, progress_values)
+    return {"challenges": completed, "stats": stats}
 
 @router.post("/completar/{challenge_id}", response_model=DailyChallenge)
-async def complete_challenge(
+def complete_challenge(
     challenge_id: int,
     progress_value: float = Query(1.0, ge=0.0, le=1.0, description="Valor de progreso (0.0-1.0)"),
     current_user: dict = Depends(verify_token),
@@ -107,7 +122,7 @@ async def complete_challenge(
     return completed_challenge
 
 @router.put("/{challenge_id}", response_model=DailyChallenge)
-async def update_challenge(
+def update_challenge(
     challenge_id: int,
     challenge_update: DailyChallengeUpdate,
     current_user: dict = Depends(verify_token),
@@ -135,7 +150,7 @@ async def update_challenge(
     return updated_challenge
 
 @router.get("/estadisticas", response_model=DailyChallengeStats)
-async def get_challenge_stats(
+def get_challenge_stats(
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
 ):
@@ -145,7 +160,8 @@ async def get_challenge_stats(
 
 # Endpoints para DailyChallengeTemplate (admin)
 @router.get("/plantillas", response_model=List[DailyChallengeTemplate])
-async def get_challenge_templates(
+def get_challenge_templates(
+    request: Request,
     categoria: Optional[str] = Query(None, description="Filtrar por categoría"),
     dificultad: Optional[int] = Query(None, ge=1, le=3, description="Filtrar por dificultad (1-3)"),
     skip: int = Query(0, ge=0),
@@ -153,13 +169,13 @@ async def get_challenge_templates(
     db: Session = Depends(get_db)
 ):
     """Get daily challenge templates"""
-    templates = daily_challenge_crud.get_daily_challenge_templates(
-        db, skip=skip, limit=limit, categoria=categoria, dificultad=dificultad
-    )
-    return templates
+    snapshot = catalog_cache.get(db)
+    return catalog_response(request, snapshot, lambda: snapshot.templates_body(
+        skip=skip, limit=limit, categoria=categoria, dificultad=dificultad
+    ))
 
 @router.post("/plantillas", response_model=DailyChallengeTemplate, status_code=status.HTTP_201_CREATED)
-async def create_challenge_template(
+def create_challenge_template(
     template: DailyChallengeTemplateCreate,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -169,7 +185,7 @@ async def create_challenge_template(
     return daily_challenge_crud.create_daily_challenge_template(db, template)
 
 @router.put("/plantillas/{template_id}", response_model=DailyChallengeTemplate)
-async def update_challenge_template(
+def update_challenge_template(
     template_id: int,
     template_update: DailyChallengeTemplateUpdate,
     current_user: dict = Depends(verify_token),
@@ -189,7 +205,7 @@ async def update_challenge_template(
     return template
 
 @router.delete("/plantillas/{template_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_challenge_template(
+def delete_challenge_template(
     template_id: int,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -204,7 +220,7 @@ async def delete_challenge_template(
 
 # Endpoint para generar retos manualmente (admin)
 @router.post("/generar-retos", status_code=status.HTTP_201_CREATED)
-async def generate_daily_challenges(
+def generate_daily_challenges(
     challenge_date: Optional[date] = Query(None, description="Fecha para generar retos (por defecto: hoy)"),
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
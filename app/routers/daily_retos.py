@@ -13,7 +13,7 @@ from app.core.security import verify_token
 router = APIRouter()
 
 @router.get("/daily", response_model=List[Reto])
-async def get_todays_challenges(
+def get_todays_challenges(
     db: Session = Depends(get_db),
     current_user: dict = Depends(verify_token)
 ):
@@ -21,7 +21,7 @@ async def get_todays_challenges(
     return get_daily_challenges(db)
 
 @router.post("/rotate")
-async def force_challenge_rotation(
+def force_challenge_rotation(
     db: Session = Depends(get_db),
     current_user: dict = Depends(verify_token)
 ):
@@ -2,11 +2,12 @@
 Habit management endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.database import get_db
+from app.core.pagination import set_next_cursor
 from app.core.security import verify_token
 from app.crud import habit as habit_crud
 from app.schemas.habit import Habit, HabitCreate, HabitUpdate
@@ -14,17 +15,24 @@ from app.schemas.habit import Habit, HabitCreate, HabitUpdate
 router = APIRouter()
 
 @router.get("/", response_model=List[Habit])
-async def get_habits(
+def get_habits(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
 ):
     """Get all habits for current user"""
-    return habit_crud.get_user_habits(db, user_id=int(current_user["user_id"]), skip=skip, limit=limit)
+    rows = habit_crud.get_user_habits(
+        db, user_id=int(current_user["user_id"]), skip=skip, limit=limit,
+        after=habit_crud.user_habits_keyset.decode(cursor)
+    )
+    set_next_cursor(response, habit_crud.user_habits_keyset, rows, limit)
+    return rows
 
 @router.post("/", response_model=Habit, status_code=status.HTTP_201_CREATED)
-async def create_habit(
+def create_habit(
     habit: HabitCreate,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -33,7 +41,7 @@ async def create_habit(
     return habit_crud.create_habit(db=db, habit=habit, user_id=int(current_user["user_id"]))
 
 @router.get("/{habit_id}", response_model=Habit)
-async def get_habit(
+def get_habit(
     habit_id: int,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -48,7 +56,7 @@ async def get_habit(
     return habit
 
 @router.put("/{habit_id}", response_model=Habit)
-async def update_habit(
+def update_habit(
     habit_id: int,
     habit_update: HabitUpdate,
     current_user: dict = Depends(verify_token),
@@ -64,7 +72,7 @@ async def update_habit(
     return habit
 
 @router.delete("/{habit_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_habit(
+def delete_habit(
     habit_id: int,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
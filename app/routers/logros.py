@@ -2,11 +2,12 @@
 Logro management endpoints - Conectado con MySQL
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.database import get_db
+from app.core.pagination import set_next_cursor
 from app.core.security import verify_token
 from app.crud import logro as logro_crud
 from app.schemas.logro import Logro, LogroCreate, LogroUpdate, LogroWithDetails
@@ -14,16 +15,20 @@ from app.schemas.logro import Logro, LogroCreate, LogroUpdate, LogroWithDetails
 router = APIRouter()
 
 @router.get("/", response_model=List[Logro])
-async def get_logros(
+def get_logros(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """Get all logros"""
-    return logro_crud.get_logros(db, skip=skip, limit=limit)
+    logros = logro_crud.get_logros(db, skip=skip, limit=limit, after=logro_crud.logros_keyset.decode(cursor))
+    set_next_cursor(response, logro_crud.logros_keyset, logros, limit)
+    return logros
 
 @router.get("/usuario/mis-logros", response_model=List[LogroWithDetails])
-async def get_mis_logros(
+def get_mis_logros(
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
 ):
@@ -32,7 +37,7 @@ async def get_mis_logros(
     return logros_data
 
 @router.get("/usuario", response_model=List[Logro])
-async def get_logros_usuario(
+def get_logros_usuario(
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
 ):
@@ -40,7 +45,7 @@ async def get_logros_usuario(
     return logro_crud.get_logros_by_usuario(db, user_id=int(current_user["user_id"]))
 
 @router.get("/reto-usuario/{reto_usuario_id}", response_model=List[Logro])
-async def get_logros_by_reto_usuario(
+def get_logros_by_reto_usuario(
     reto_usuario_id: int,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -49,7 +54,7 @@ async def get_logros_by_reto_usuario(
     return logro_crud.get_logros_by_reto_usuario(db, reto_usuario_id=reto_usuario_id)
 
 @router.post("/", response_model=Logro, status_code=status.HTTP_201_CREATED)
-async def create_logro(
+def create_logro(
     logro: LogroCreate,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -58,7 +63,7 @@ async def create_logro(
     return logro_crud.create_logro(db=db, logro=logro)
 
 @router.post("/completar-reto/{reto_usuario_id}", response_model=Logro, status_code=status.HTTP_201_CREATED)
-async def crear_logro_por_completar_reto(
+def crear_logro_por_completar_reto(
     reto_usuario_id: int,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -73,7 +78,7 @@ async def crear_logro_por_completar_reto(
     return logro
 
 @router.get("/{logro_id}", response_model=Logro)
-async def get_logro(
+def get_logro(
     logro_id: int,
     db: Session = Depends(get_db)
 ):
@@ -87,7 +92,7 @@ async def get_logro(
     return logro
 
 @router.put("/{logro_id}", response_model=Logro)
-async def update_logro(
+def update_logro(
     logro_id: int,
     logro_update: LogroUpdate,
     current_user: dict = Depends(verify_token),
@@ -103,7 +108,7 @@ async def update_logro(
     return logro
 
 @router.delete("/{logro_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_logro(
+def delete_logro(
     logro_id: int,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
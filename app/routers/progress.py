@@ -2,18 +2,22 @@
 Progress tracking endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict
 from datetime import date, datetime
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, select
 import random
 
-from app.database import get_db
+from app.database import get_db, get_async_db
+from app.core.dates import on_day
+from app.core.pagination import set_next_cursor
 from app.core.security import verify_token
 from app.crud import progress as progress_crud
+from app.crud import challenge_stats as challenge_stats_crud
 from app.schemas.progress import ProgressRecord, ProgressRecordCreate, ProgressRecordUpdate, ProgressStats
-from app.services import progress_service
+from app.services import progress_service, progress_stats_service
 from app.schemas.reto import RetoUsuario
 from app.schemas.challenge_progress import ChallengeProgressUpdate
 from app.models.database import DailyChallenge, RetoCategoria
@@ -29,17 +33,24 @@ class ChallengeStats(BaseModel):
 router = APIRouter()
 
 @router.get("/", response_model=List[ProgressRecord])
-async def get_progress_records(
+def get_progress_records(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
 ):
     """Get all progress records for current user"""
-    return progress_crud.get_user_progress_records(db, user_id=int(current_user["user_id"]), skip=skip, limit=limit)
+    rows = progress_crud.get_user_progress_records(
+        db, user_id=int(current_user["user_id"]), skip=skip, limit=limit,
+        after=progress_crud.progress_records_keyset.decode(cursor)
+    )
+    set_next_cursor(response, progress_crud.progress_records_keyset, rows, limit)
+    return rows
 
 @router.post("/", response_model=ProgressRecord, status_code=status.HTTP_201_CREATED)
-async def create_progress_record(
+def create_progress_record(
     progress: ProgressRecordCreate,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -54,21 +65,26 @@ async def create_progress_record(
 })
 async def get_daily_progress(
     current_user: dict = Depends(verify_token),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get daily progress statistics and completion by category"""
     try:
         user_id = int(current_user["user_id"])
         today = date.today()
 
-        # Obtener retos del día actual
-        daily_challenges = db.query(DailyChallenge).join(
-            DailyChallenge.reto
-        ).filter(
-            DailyChallenge.user_id == user_id,
-            DailyChallenge.challenge_date == today,
-            DailyChallenge.created_at >= today
-        ).all()
+        # Obtener retos del día actual (con su reto cargado en la misma consulta)
+        result = await db.execute(
+            select(DailyChallenge).join(
+                DailyChallenge.reto
+            ).options(
+                contains_eager(DailyChallenge.reto)
+            ).where(
+                DailyChallenge.user_id == user_id,
+                DailyChallenge.challenge_date == today,
+                on_day(DailyChallenge.created_at, today)
+            )
+        )
+        daily_challenges = result.scalars().all()
 
         if not daily_challenges:
             raise HTTPException(
@@ -124,116 +140,17 @@ async def get_daily_progress(
     404: {"description": "No se encontraron datos para el usuario"},
     500: {"description": "Error interno del servidor"}
 })
-async def get_progress_stats(
+def get_progress_stats(
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
 ):
     """Get user progress statistics"""
     try:
         user_id = int(current_user["user_id"])
-        today = date.today()
         
-        # Verificar si el usuario existe y tiene retos
-        user_exists = db.query(DailyChallenge).filter(
-            DailyChallenge.user_id == user_id
-        ).first()
-        
-        if not user_exists:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="No se encontraron retos para este usuario"
-            )
-        
-        try:
-            # Total retos del usuario
-            total_challenges = db.query(DailyChallenge).filter(
-                DailyChallenge.user_id == user_id
-            ).count()
-            
-            # Retos completados totales
-            completed_challenges = db.query(DailyChallenge).filter(
-                DailyChallenge.user_id == user_id,
-                DailyChallenge.is_completed == True
-            ).count()
-            
-            # Tasa de completación (retos completados / retos totales * 100)
-            total_habits = total_challenges
-            completion_percentage = (completed_challenges / total_challenges * 100) if total_challenges > 0 else 0.0
-            
-            # Retos completados hoy
-            completed_today = db.query(DailyChallenge).filter(
-                DailyChallenge.user_id == user_id,
-                DailyChallenge.is_completed == True,
-                DailyChallenge.completed_at >= today
-            ).count()
-            
-            # Obtener todos los retos completados ordenados por fecha
-            completed_challenges_list = db.query(DailyChallenge).filter(
-                DailyChallenge.user_id == user_id,
-                DailyChallenge.is_completed == True
-            ).order_by(DailyChallenge.completed_at).all()
-            
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error al consultar la base de datos: {str(e)}"
-            )
-            
-        try:
-            # Calcular current_streak y longest_streak
-            current_streak = 0
-            longest_streak = 0
-            temp_streak = 0
-            last_date = None
-            
-            for challenge in completed_challenges_list:
-                if not challenge.completed_at:
-                    continue
-                    
-                current_date = challenge.completed_at.date()
-                
-                if last_date is None:
-                    temp_streak = 1
-                elif (current_date - last_date).days == 1:
-                    temp_streak += 1
-                elif (current_date - last_date).days > 1:
-                    if temp_streak > longest_streak:
-                        longest_streak = temp_streak
-                    temp_streak = 1
-                    
-                last_date = current_date
-            
-            # Actualizar longest_streak una última vez
-            if temp_streak > longest_streak:
-                longest_streak = temp_streak
-            
-            # Si el último reto completado fue ayer o hoy, mantener la racha actual
-            if last_date and (today - last_date).days <= 1:
-                current_streak = temp_streak
-            else:
-                current_streak = 0
-                
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error al calcular las rachas: {str(e)}"
-            )
-            
         try:
-            # Calcular tiempo promedio de completación (en horas)
-            total_time = 0
-            completed_count = 0
-            
-            for challenge in completed_challenges_list:
-                if challenge.completed_at and challenge.created_at:
-                    if challenge.completed_at < challenge.created_at:
-                        raise ValueError("Fecha de completado anterior a fecha de creación")
-                    time_diff = challenge.completed_at - challenge.created_at
-                    total_time += time_diff.total_seconds() / 3600  # convertir a horas
-                    completed_count += 1
-            
-            completion_rate = total_time / completed_count if completed_count > 0 else 0.0
-            
+            # Totales y rachas calculados en SQL, sin materializar filas ORM
+            stats = progress_stats_service.get_progress_stats(db, user_id)
         except ValueError as ve:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -242,18 +159,16 @@ async def get_progress_stats(
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error al calcular el tiempo promedio: {str(e)}"
+                detail=f"Error al consultar la base de datos: {str(e)}"
             )
         
-        return {
-            "total_habits": total_habits,
-            "completed_today": completed_today,
-            "current_streak": current_streak,
-            "longest_streak": longest_streak,
-            "completion_rate": round(completion_rate, 2),  # Redondear a 2 decimales
-            "total_challenges": total_challenges,
-            "completed_challenges": completed_challenges
-        }
+        if stats is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No se encontraron retos para este usuario"
+            )
+        
+        return stats
         
     except HTTPException:
         raise
@@ -264,32 +179,32 @@ async def get_progress_stats(
         )
 
 @router.get("/challenges/stats", response_model=ChallengeStats)
-async def get_challenge_stats(
+def get_challenge_stats(
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
 ):
     """Get user's challenge completion statistics"""
-    return progress_service.get_user_challenge_stats(db, current_user["id"])
+    return progress_service.get_user_challenge_stats(db, int(current_user["user_id"]))
 
 @router.post("/challenges/{reto_id}/complete", response_model=RetoUsuario)
-async def complete_challenge(
+def complete_challenge(
     reto_id: int,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
 ):
     """Mark a challenge as complete"""
-    return progress_service.mark_challenge_complete(db, current_user["id"], reto_id)
+    return progress_service.mark_challenge_complete(db, int(current_user["user_id"]), reto_id)
 
 @router.get("/challenges/active")
-async def get_active_challenges(
+def get_active_challenges(
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
 ):
     """Get user's currently active challenges with progress"""
-    return progress_service.get_user_active_challenges(db, current_user["id"])
+    return progress_service.get_user_active_challenges(db, int(current_user["user_id"]))
 
 @router.get("/habit/{habit_id}", response_model=List[ProgressRecord])
-async def get_habit_progress(
+def get_habit_progress(
     habit_id: int,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
@@ -300,7 +215,7 @@ async def get_habit_progress(
     return progress_crud.get_habit_progress(db, habit_id=habit_id, user_id=int(current_user["user_id"]), start_date=start_date, end_date=end_date)
 
 @router.get("/challenge/{challenge_id}", response_model=List[ProgressRecord])
-async def get_challenge_progress(
+def get_challenge_progress(
     challenge_id: int,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -309,7 +224,7 @@ async def get_challenge_progress(
     return progress_crud.get_challenge_progress(db, challenge_id=challenge_id, user_id=int(current_user["user_id"]))
 
 @router.post("/challenge/{challenge_id}")
-async def update_challenge_progress(
+def update_challenge_progress(
     challenge_id: int,
     progress: ChallengeProgressUpdate,
     current_user: dict = Depends(verify_token),
@@ -343,6 +258,8 @@ async def update_challenge_progress(
         if progress.is_completed or progress.value >= 100.0:
             daily_challenge.is_completed = True
             daily_challenge.completed_at = datetime.utcnow()
+            db.flush()
+            challenge_stats_crud.record_challenge_completed(db, daily_challenge)
         
         db.commit()
         db.refresh(daily_challenge)
@@ -367,7 +284,7 @@ async def update_challenge_progress(
         )
 
 @router.get("/{record_id}", response_model=ProgressRecord)
-async def get_progress_record(
+def get_progress_record(
     record_id: int,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -382,7 +299,7 @@ async def get_progress_record(
     return record
 
 @router.put("/{record_id}", response_model=ProgressRecord)
-async def update_progress_record(
+def update_progress_record(
     record_id: int,
     progress_update: ProgressRecordUpdate,
     current_user: dict = Depends(verify_token),
@@ -398,7 +315,7 @@ async def update_progress_record(
     return record
 
 @router.delete("/{record_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_progress_record(
+def delete_progress_record(
     record_id: int,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
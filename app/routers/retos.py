@@ -2,28 +2,36 @@
 Reto management endpoints - Conectado con MySQL
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.database import get_db
+from app.core.deps import get_current_active_user
 from app.core.security import verify_token
-from app.crud import reto as reto_crud, user as user_crud
+from app.crud import reto as reto_crud
+from app.services.catalog_cache import catalog_cache, catalog_response
+from app.schemas.user import UserPrincipal
 from app.schemas.reto import Reto, RetoCreate, RetoUpdate, RetoUsuario, RetoUsuarioCreate, RetoUsuarioUpdate
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Reto])
-async def get_retos(
+def get_retos(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """Get all available retos"""
-    return reto_crud.get_retos(db, skip=skip, limit=limit)
+    snapshot = catalog_cache.get(db)
+    start = snapshot.reto_offset(skip, reto_crud.retos_keyset.decode(cursor))
+    next_cursor = reto_crud.retos_keyset.next_cursor(snapshot.retos[start:start + limit], limit)
+    return catalog_response(request, snapshot, lambda: snapshot.retos_body(skip=start, limit=limit), next_cursor)
 
 @router.post("/", response_model=Reto, status_code=status.HTTP_201_CREATED)
-async def create_reto(
+def create_reto(
     reto: RetoCreate,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -32,11 +40,16 @@ async def create_reto(
     return reto_crud.create_reto(db=db, reto=reto)
 
 @router.get("/{reto_id}", response_model=Reto)
-async def get_reto(
+def get_reto(
     reto_id: int,
     db: Session = Depends(get_db)
 ):
     """Get a specific reto"""
+    body = catalog_cache.get(db).reto_json_by_id.get(reto_id)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+    
+    # Puede haberse creado en otro proceso después del último snapshot
     reto = reto_crud.get_reto(db, reto_id=reto_id)
     if reto is None:
         raise HTTPException(
@@ -46,7 +59,7 @@ async def get_reto(
     return reto
 
 @router.put("/{reto_id}", response_model=Reto)
-async def update_reto(
+def update_reto(
     reto_id: int,
     reto_update: RetoUpdate,
     current_user: dict = Depends(verify_token),
@@ -62,7 +75,7 @@ async def update_reto(
     return reto
 
 @router.delete("/{reto_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_reto(
+def delete_reto(
     reto_id: int,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -77,7 +90,7 @@ async def delete_reto(
 
 # Endpoints para RetoUsuario (progreso del usuario)
 @router.get("/usuario/mis-retos", response_model=List[RetoUsuario])
-async def get_mis_retos(
+def get_mis_retos(
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
 ):
@@ -85,27 +98,19 @@ async def get_mis_retos(
     return reto_crud.get_retos_usuario(db, user_id=int(current_user["user_id"]))
 
 @router.post("/usuario/inscribirse", response_model=RetoUsuario, status_code=status.HTTP_201_CREATED)
-async def inscribirse_reto(
+def inscribirse_reto(
     reto_usuario: RetoUsuarioCreate,
-    current_user: dict = Depends(verify_token),
+    current_user: UserPrincipal = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Inscribirse a un reto"""
-    # Verificar que el usuario existe
-    user = user_crud.get_user(db, int(current_user["user_id"]))
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
-    # Asignar el ID del usuario actual
-    reto_usuario.id_usuario = int(current_user["user_id"])
+    # Asignar el ID del usuario actual (verificado por la dependencia)
+    reto_usuario.id_usuario = current_user.id
     
     return reto_crud.create_reto_usuario(db=db, reto_usuario=reto_usuario)
 
 @router.put("/usuario/progreso/{reto_usuario_id}", response_model=RetoUsuario)
-async def update_progreso_reto(
+def update_progreso_reto(
     reto_usuario_id: int,
     progreso_update: RetoUsuarioUpdate,
     current_user: dict = Depends(verify_token),
@@ -121,7 +126,7 @@ async def update_progreso_reto(
     return reto_usuario
 
 @router.delete("/usuario/abandonar/{reto_usuario_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def abandonar_reto(
+def abandonar_reto(
     reto_usuario_id: int,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -0,0 +1,32 @@
+"""
+Offline sync endpoints for the mobile client
+"""
+
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.core.security import verify_token
+from app.schemas.sync import ProgressSyncRequest, ProgressSyncResult, SyncChanges
+from app.services import delta_sync_service, progress_sync_service
+
+router = APIRouter()
+
+@router.post("/progress", response_model=ProgressSyncResult)
+def sync_progress(
+    payload: ProgressSyncRequest,
+    current_user: dict = Depends(verify_token),
+    db: Session = Depends(get_db)
+):
+    """Apply the client's queued progress events in order, in one transaction"""
+    return progress_sync_service.apply_progress_events(db, int(current_user["user_id"]), payload.events)
+
+@router.get("/changes", response_model=SyncChanges, response_model_exclude_defaults=True)
+def get_changes(
+    since: Optional[str] = Query(None, description="next_token de la sincronización anterior"),
+    current_user: dict = Depends(verify_token),
+    db: Session = Depends(get_db)
+):
+    """Get the user's habits, challenges, daily challenges, logros and retos changed since the token"""
+    return delta_sync_service.get_changes(db, int(current_user["user_id"]), since)
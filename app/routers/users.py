@@ -7,25 +7,20 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.database import get_db
+from app.core.deps import get_current_active_user
 from app.core.security import verify_token
 from app.crud import user as user_crud
-from app.schemas.user import User, UserUpdate
+from app.schemas.user import User, UserPrincipal, UserUpdate
 
 router = APIRouter()
 
 @router.get("/me", response_model=User)
-async def read_users_me(current_user: dict = Depends(verify_token), db: Session = Depends(get_db)):
+async def read_users_me(current_user: UserPrincipal = Depends(get_current_active_user)):
     """Get current user information"""
-    user = user_crud.get_user(db, user_id=int(current_user["user_id"]))
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    return user
+    return current_user
 
 @router.put("/me", response_model=User)
-async def update_user_me(
+def update_user_me(
     user_update: UserUpdate,
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
@@ -40,7 +35,7 @@ async def update_user_me(
     return user
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_user_me(
+def delete_user_me(
     current_user: dict = Depends(verify_token),
     db: Session = Depends(get_db)
 ):
@@ -2,7 +2,7 @@
 Pydantic schemas for Daily Challenge models
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import date, datetime
 
@@ -74,3 +74,14 @@ class DailyChallengeStats(BaseModel):
     current_streak: int
     longest_streak: int
     total_points: int
+
+class DailyChallengeCompletion(BaseModel):
+    id: int
+    progress_value: float = Field(1.0, ge=0.0, le=1.0)
+
+class DailyChallengeBulkComplete(BaseModel):
+    completions: List[DailyChallengeCompletion] = Field(..., min_length=1, max_length=50)
+
+class DailyChallengeBulkCompleteResult(BaseModel):
+    challenges: List[DailyChallenge]
+    stats: DailyChallengeStats
@@ -0,0 +1,72 @@
+"""
+Pydantic schemas for the offline progress sync
+"""
+
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Union
+from typing_extensions import Annotated
+from datetime import datetime
+
+from app.schemas.challenge import Challenge
+from app.schemas.criterio import CriterioReto
+from app.schemas.daily_challenge import DailyChallenge, DailyChallengeStats, DailyChallengeWithReto
+from app.schemas.habit import Habit
+from app.schemas.logro import Logro
+from app.schemas.reto import RetoUsuario
+
+class ProgressEventBase(BaseModel):
+    entity_id: int
+    client_timestamp: datetime
+
+class DailyChallengeProgressEvent(ProgressEventBase):
+    """Same change as POST /progress/challenge/{id}"""
+    type: Literal["daily_challenge_progress"]
+    value: float = Field(..., ge=0.0, le=100.0)
+    is_completed: Optional[bool] = None
+
+class CriterioCompletedEvent(ProgressEventBase):
+    """Same change as PUT /criterios/usuario/{id}/marcar-completado"""
+    type: Literal["criterio_completed"]
+
+class ChallengeProgressEvent(ProgressEventBase):
+    """Same change as POST /challenges/{id}/progress"""
+    type: Literal["challenge_progress"]
+    progress_value: float
+
+ProgressEvent = Annotated[
+    Union[DailyChallengeProgressEvent, CriterioCompletedEvent, ChallengeProgressEvent],
+    Field(discriminator="type")
+]
+
+class ProgressSyncRequest(BaseModel):
+    events: List[ProgressEvent] = Field(..., min_length=1, max_length=500)
+
+class ProgressEventResult(BaseModel):
+    index: int
+    status: Literal["applied", "stale", "rejected", "not_found"]
+    detail: Optional[str] = None
+
+class ProgressSyncResult(BaseModel):
+    results: List[ProgressEventResult]
+    daily_challenges: List[DailyChallenge] = []
+    challenges: List[Challenge] = []
+    criterios_reto: List[CriterioReto] = []
+    stats: Optional[DailyChallengeStats] = None
+
+class SyncDeleted(BaseModel):
+    """Ids removed since the token, per entity type"""
+    habits: List[int] = []
+    challenges: List[int] = []
+    daily_challenges: List[int] = []
+    logros: List[int] = []
+    retos_usuario: List[int] = []
+
+class SyncChanges(BaseModel):
+    """Rows created or updated since the token; pass ``next_token`` as ``since`` on the next resume"""
+    next_token: str
+    habits: List[Habit] = []
+    challenges: List[Challenge] = []
+    daily_challenges: List[DailyChallengeWithReto] = []
+    logros: List[Logro] = []
+    retos_usuario: List[RetoUsuario] = []
+    deleted: SyncDeleted = SyncDeleted()
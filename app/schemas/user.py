@@ -32,6 +32,10 @@ class UserInDB(UserBase):
 class User(UserInDB):
     pass
 
+class UserPrincipal(User):
+    """Authenticated user as cached by the auth dependencies"""
+    is_active: bool = True
+
 class UserLogin(BaseModel):
     correo: EmailStr
     clave: str
@@ -0,0 +1,214 @@
+"""
+Process-local versioned snapshot of the read-mostly catalog
+(retos, criterios and daily challenge templates)
+"""
+
+import bisect
+import hashlib
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.models.database import Criterio, DailyChallengeTemplate, Reto
+from app.schemas.criterio import Criterio as CriterioSchema
+from app.schemas.daily_challenge import DailyChallengeTemplate as DailyChallengeTemplateSchema
+from app.schemas.reto import Reto as RetoSchema
+
+logger = logging.getLogger(__name__)
+
+def _json_array(items: List[bytes], skip: int = 0, limit: Optional[int] = None) -> bytes:
+    skip = max(skip, 0)
+    if limit is not None:
+        items = items[skip:skip + max(limit, 0)]
+    return b"[" + b",".join(items) + b"]"
+
+def _offset_after(ids: List[int], after: Optional[Tuple]) -> Optional[int]:
+    """Position following the keyset cursor ``(id,)`` in an ascending id list"""
+    return bisect.bisect_right(ids, after[0]) if after else None
+
+class CatalogSnapshot:
+    """Immutable view of the catalog with its entities pre-serialized to JSON.
+
+    List endpoints slice the per-item JSON fragments and join them, so a
+    response needs neither a query nor Pydantic work.
+    """
+
+    def __init__(self, version: int, retos, activos, criterios, templates):
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+        self.retos: List[RetoSchema] = retos
+        self.retos_by_id: Dict[int, RetoSchema] = {r.id: r for r in retos}
+        self.reto_ids: List[int] = list(self.retos_by_id)
+        self.retos_by_categoria: Dict[str, List[RetoSchema]] = {}
+        for reto in retos:
+            self.retos_by_categoria.setdefault(reto.categoria.value, []).append(reto)
+        self.active_reto_ids = frozenset(reto_id for reto_id, activo in activos.items() if activo)
+        self.reto_json: List[bytes] = [r.model_dump_json().encode() for r in retos]
+        self.reto_json_by_id: Dict[int, bytes] = dict(zip(self.retos_by_id, self.reto_json))
+
+        self.criterios: List[CriterioSchema] = criterios
+        self.criterio_ids: List[int] = [c.id for c in criterios]
+        self.criterio_json: List[bytes] = [c.model_dump_json().encode() for c in criterios]
+        self.criterio_json_by_id: Dict[int, bytes] = {c.id: j for c, j in zip(criterios, self.criterio_json)}
+        self.criterio_json_by_reto: Dict[int, List[bytes]] = {}
+        for criterio, body in zip(criterios, self.criterio_json):
+            self.criterio_json_by_reto.setdefault(criterio.id_reto, []).append(body)
+
+        self.templates: List[DailyChallengeTemplateSchema] = templates
+        self.template_json: List[bytes] = [t.model_dump_json().encode() for t in templates]
+
+        # Versión de contenido: igual en todos los procesos con los mismos datos
+        digest = hashlib.sha256()
+        for fragments in (self.reto_json, self.criterio_json, self.template_json):
+            for body in fragments:
+                digest.update(body)
+            digest.update(b"\0")
+        self.content_version = digest.hexdigest()[:32]
+        self.etag = f'"{self.content_version}"'
+
+    def reto_offset(self, skip: int = 0, after: Optional[Tuple] = None) -> int:
+        """Start of a /retos page; a cursor is resolved by bisection instead of skipping"""
+        offset = _offset_after(self.reto_ids, after)
+        return max(skip, 0) if offset is None else offset
+
+    def criterio_offset(self, skip: int = 0, after: Optional[Tuple] = None) -> int:
+        offset = _offset_after(self.criterio_ids, after)
+        return max(skip, 0) if offset is None else offset
+
+    def retos_body(self, skip: int = 0, limit: int = 100) -> bytes:
+        return _json_array(self.reto_json, skip, limit)
+
+    def criterios_body(self, skip: int = 0, limit: int = 100) -> bytes:
+        return _json_array(self.criterio_json, skip, limit)
+
+    def criterios_by_reto_body(self, reto_id: int) -> bytes:
+        return _json_array(self.criterio_json_by_reto.get(reto_id, []))
+
+    def templates_body(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        categoria: Optional[str] = None,
+        dificultad: Optional[int] = None,
+        is_active: bool = True
+    ) -> bytes:
+        items = [
+            body for template, body in zip(self.templates, self.template_json)
+            if template.is_active == is_active
+            and (not categoria or template.categoria == categoria)
+            and (not dificultad or template.dificultad == dificultad)
+        ]
+        return _json_array(items, skip, limit)
+
+class CatalogCache:
+    """Holds the current CatalogSnapshot and rebuilds it when stale.
+
+    Catalog writes call :meth:`invalidate`, which bumps the version; the next
+    read builds a new snapshot and swaps the reference atomically, so readers
+    never see a half-built catalog. The TTL bounds how long a worker process
+    serves data changed by another process.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.rebuilds = 0
+
+    def invalidate(self):
+        """Mark the catalog as changed"""
+        with self._lock:
+            self.version += 1
+
+    def _is_fresh(self, snapshot: Optional[CatalogSnapshot]) -> bool:
+        return (
+            snapshot is not None
+            and snapshot.version == self.version
+            and time.monotonic() - snapshot.loaded_at < self.ttl_seconds
+        )
+
+    def load(self, db: Session) -> CatalogSnapshot:
+        """Build a snapshot from the database and make it current"""
+        version = self.version
+        retos = list(db.scalars(select(Reto).order_by(Reto.id)))
+        snapshot = CatalogSnapshot(
+            version=version,
+            retos=[RetoSchema.model_validate(r) for r in retos],
+            activos={r.id: bool(r.activo) for r in retos},
+            criterios=[
+                CriterioSchema.model_validate(c)
+                for c in db.scalars(select(Criterio).order_by(Criterio.id))
+            ],
+            templates=[
+                DailyChallengeTemplateSchema.model_validate(t)
+                for t in db.scalars(select(DailyChallengeTemplate).order_by(DailyChallengeTemplate.id))
+            ]
+        )
+        with self._lock:
+            # Un snapshot construido antes de una invalidación sigue marcado como obsoleto
+            if self._snapshot is None or snapshot.version >= self._snapshot.version:
+                self._snapshot = snapshot
+            self.rebuilds += 1
+        logger.info(
+            f"Catalog snapshot v{version} loaded: {len(snapshot.retos)} retos, "
+            f"{len(snapshot.criterios)} criterios, {len(snapshot.templates)} templates"
+        )
+        return snapshot
+
+    def get(self, db: Session) -> CatalogSnapshot:
+        """Get the current snapshot, rebuilding it first if it is stale"""
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+        # Una sola reconstrucción a la vez; el resto reutiliza su resultado
+        with self._build_lock:
+            snapshot = self._snapshot
+            if self._is_fresh(snapshot):
+                return snapshot
+            return self.load(db)
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+            self.version += 1
+
+catalog_cache = CatalogCache(settings.CATALOG_CACHE_TTL_SECONDS)
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of If-None-Match against the ETag (RFC 9110 13.1.2)"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(
+        (candidate[2:] if candidate.startswith("W/") else candidate) == etag for candidate in candidates
+    )
+
+def catalog_response(
+    request: Request,
+    snapshot: CatalogSnapshot,
+    build_body: Callable[[], bytes],
+    next_cursor: Optional[str] = None
+) -> Response:
+    """JSON response for a catalog read, or 304 if the client's copy is current.
+
+    The body is only built when it has to be sent.
+    """
+    headers = {
+        "ETag": snapshot.etag,
+        "Cache-Control": f"public, max-age={settings.CATALOG_CACHE_MAX_AGE_SECONDS}"
+    }
+    if next_cursor is not None:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    if _etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=build_body(), media_type="application/json", headers=headers)
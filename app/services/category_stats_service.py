@@ -1,14 +1,14 @@
 """
 Service for handling category-specific challenge statistics
 """
-from datetime import datetime
+from datetime import date, datetime
+from typing import Dict, List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import and_, case, func, select
 from app.models.database import Reto, RetoUsuario, RetoCategoria
 
-def get_category_stats(db: Session, user_id: int, categoria: RetoCategoria):
-    """Get statistics for a specific category"""
-    stats = {
+def _empty_stats(categoria: RetoCategoria) -> dict:
+    return {
         "categoria": categoria.value,
         "total_completados": 0,
         "retos_actuales": [],
@@ -16,61 +16,100 @@ def get_category_stats(db: Session, user_id: int, categoria: RetoCategoria):
         "racha_actual": 0,
         "porcentaje_completado": 0.0
     }
-    
-    # Get completed challenges for this category
-    completed_challenges = (
-        db.query(RetoUsuario)
-        .join(Reto)
-        .filter(
-            RetoUsuario.id_usuario == user_id,
-            Reto.categoria == categoria,
-            RetoUsuario.progreso_reto == 100.0
+
+def _get_daily_totals(db: Session, user_id: int, categorias: List[RetoCategoria]):
+    """Assigned and completed retos per category and day, in one grouped aggregate"""
+    completed = case((RetoUsuario.progreso_reto == 100.0, 1), else_=0)
+    return db.execute(
+        select(
+            Reto.categoria,
+            Reto.fecha_asignacion,
+            func.count(RetoUsuario.id).label("total"),
+            func.sum(completed).label("completed")
         )
-        .all()
-    )
-    
-    stats["total_completados"] = len(completed_challenges)
-    
-    # Get active challenges for this category
-    today = datetime.utcnow().date()
-    active_challenges = (
-        db.query(Reto)
-        .filter(
-            Reto.categoria == categoria,
+        .join(Reto, RetoUsuario.id_reto == Reto.id)
+        .where(RetoUsuario.id_usuario == user_id, Reto.categoria.in_(categorias))
+        .group_by(Reto.categoria, Reto.fecha_asignacion)
+        .order_by(Reto.categoria, Reto.fecha_asignacion)
+    ).all()
+
+def _get_current_retos(db: Session, user_id: int, categorias: List[RetoCategoria], today: date):
+    """Today's active retos with the user's progress, in one LEFT JOIN"""
+    return db.execute(
+        select(
+            Reto.id,
+            Reto.categoria,
+            Reto.nombre_reto,
+            Reto.descripcion_reto,
+            RetoUsuario.progreso_reto
+        )
+        .outerjoin(RetoUsuario, and_(
+            RetoUsuario.id_reto == Reto.id,
+            RetoUsuario.id_usuario == user_id
+        ))
+        .where(
+            Reto.categoria.in_(categorias),
             Reto.activo == True,
             Reto.fecha_asignacion == today
         )
-        .all()
-    )
-    
-    for challenge in active_challenges:
-        progress = db.query(RetoUsuario).filter(
-            RetoUsuario.id_usuario == user_id,
-            RetoUsuario.id_reto == challenge.id
-        ).first()
-        
-        stats["retos_actuales"].append({
-            "id": challenge.id,
-            "nombre": challenge.nombre_reto,
-            "descripcion": challenge.descripcion_reto,
-            "progreso": progress.progreso_reto if progress else 0.0
+        .order_by(Reto.id, RetoUsuario.id)
+    ).all()
+
+def get_all_category_stats(
+    db: Session,
+    user_id: int,
+    categorias: Optional[List[RetoCategoria]] = None
+) -> List[dict]:
+    """Get statistics for several categories with two queries in total.
+
+    A day counts towards a category streak when the user completed at least
+    one reto of that category assigned on that day; the current streak is
+    alive if the last such day was today or yesterday.
+    """
+    categorias = list(categorias or RetoCategoria)
+    today = datetime.utcnow().date()
+    stats: Dict[RetoCategoria, dict] = {categoria: _empty_stats(categoria) for categoria in categorias}
+    totals = {categoria: 0 for categoria in categorias}
+    last_day = {}
+    streak = {categoria: 0 for categoria in categorias}
+
+    for categoria, day, total, completed in _get_daily_totals(db, user_id, categorias):
+        category_stats = stats[categoria]
+        completed = int(completed or 0)
+        totals[categoria] += total
+        category_stats["total_completados"] += completed
+        if not completed or day is None:
+            continue
+        previous = last_day.get(categoria)
+        streak[categoria] = streak[categoria] + 1 if previous and (day - previous).days == 1 else 1
+        category_stats["mejor_racha"] = max(category_stats["mejor_racha"], streak[categoria])
+        last_day[categoria] = day
+
+    for categoria in categorias:
+        category_stats = stats[categoria]
+        if categoria in last_day and (today - last_day[categoria]).days <= 1:
+            category_stats["racha_actual"] = streak[categoria]
+        if totals[categoria] > 0:
+            category_stats["porcentaje_completado"] = (category_stats["total_completados"] / totals[categoria]) * 100
+
+    seen = set()
+    for reto_id, categoria, nombre, descripcion, progreso in _get_current_retos(db, user_id, categorias, today):
+        # Si el usuario tiene varias inscripciones al mismo reto, usar la primera
+        if reto_id in seen:
+            continue
+        seen.add(reto_id)
+        stats[categoria]["retos_actuales"].append({
+            "id": reto_id,
+            "nombre": nombre,
+            "descripcion": descripcion,
+            "progreso": progreso if progreso is not None else 0.0
         })
-    
-    # Calculate completion percentage
-    total_assigned = (
-        db.query(RetoUsuario)
-        .join(Reto)
-        .filter(
-            RetoUsuario.id_usuario == user_id,
-            Reto.categoria == categoria
-        )
-        .count()
-    )
-    
-    if total_assigned > 0:
-        stats["porcentaje_completado"] = (stats["total_completados"] / total_assigned) * 100
-    
-    return stats
+
+    return [stats[categoria] for categoria in categorias]
+
+def get_category_stats(db: Session, user_id: int, categoria: RetoCategoria):
+    """Get statistics for a specific category"""
+    return get_all_category_stats(db, user_id, [categoria])[0]
 
 def get_social_stats(db: Session, user_id: int):
     """Get statistics for social challenges"""
@@ -82,4 +121,4 @@ def get_physical_stats(db: Session, user_id: int):
 
 def get_intellectual_stats(db: Session, user_id: int):
     """Get statistics for intellectual challenges"""
-    return get_category_stats(db, user_id, RetoCategoria.INTELECTUAL)
\ No newline at end of file
+    return get_category_stats(db, user_id, RetoCategoria.INTELECTUAL)
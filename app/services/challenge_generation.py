@@ -0,0 +1,170 @@
+"""
+Service for bulk generation of daily challenges
+"""
+
+import logging
+import random
+import time
+from datetime import date
+from typing import Dict, List, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.crud import challenge_stats as challenge_stats_crud
+from app.services.catalog_cache import catalog_cache
+from app.services.notifications import notification_service
+from app.models.database import DailyChallenge, DailyChallengeTemplate, Reto, User
+
+logger = logging.getLogger(__name__)
+
+# Número máximo de retos asignados a cada usuario por día
+CHALLENGES_PER_USER = 5
+
+# Usuarios procesados por transacción
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def _get_active_templates(db: Session) -> List[DailyChallengeTemplate]:
+    """Load the active template set once per run"""
+    return list(db.scalars(
+        select(DailyChallengeTemplate)
+        .where(
+            DailyChallengeTemplate.is_active == True,
+            DailyChallengeTemplate.categoria.isnot(None)
+        )
+        .order_by(DailyChallengeTemplate.id)
+    ))
+
+
+def _get_pending_user_ids(db: Session, challenge_date: date) -> List[int]:
+    """Get, in a single query, the users without challenges for the date"""
+    already_generated = (
+        select(DailyChallenge.id)
+        .where(
+            DailyChallenge.user_id == User.id,
+            DailyChallenge.challenge_date == challenge_date
+        )
+        .exists()
+    )
+    return list(db.scalars(
+        select(User.id).where(~already_generated).order_by(User.id)
+    ))
+
+
+def _get_or_create_template_retos(
+    db: Session,
+    templates: List[DailyChallengeTemplate],
+    challenge_date: date
+) -> Tuple[List[int], int]:
+    """Get the reto ids instantiated from the templates for the date.
+
+    Each template is materialized once per day as a ``reto`` row shared by
+    every user, so re-running the job reuses the rows created previously.
+    """
+    def _load_existing() -> Dict[str, int]:
+        rows = db.execute(
+            select(Reto.nombre_reto, Reto.id).where(
+                Reto.fecha_asignacion == challenge_date,
+                Reto.nombre_reto.in_([t.nombre for t in templates])
+            )
+        ).all()
+        return {nombre: reto_id for nombre, reto_id in rows}
+
+    existing = _load_existing()
+    missing = [t for t in templates if t.nombre not in existing]
+    if missing:
+        db.execute(insert(Reto), [
+            {
+                "nombre_reto": template.nombre,
+                "descripcion_reto": template.descripcion,
+                "tipo": template.tipo,
+                "categoria": template.categoria,
+                "fecha_asignacion": challenge_date,
+                "activo": True
+            }
+            for template in missing
+        ])
+        db.commit()
+        catalog_cache.invalidate()
+        existing = _load_existing()
+
+    reto_ids = list(dict.fromkeys(
+        existing[t.nombre] for t in templates if t.nombre in existing
+    ))
+    return reto_ids, len(missing)
+
+
+def generate_daily_challenges_bulk(
+    db: Session,
+    challenge_date: date,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> dict:
+    """Generate daily challenges for every user without challenges on the date.
+
+    Rows are written with multi-row INSERTs, one transaction per chunk of
+    users. Users that already have challenges for the date are skipped, so
+    running it again for the same date is a no-op.
+    """
+    started = time.perf_counter()
+    report = {
+        "date": challenge_date,
+        "users_processed": 0,
+        "challenges_created": 0,
+        "retos_created": 0,
+        "elapsed_seconds": 0.0,
+        "rows_per_second": 0.0
+    }
+
+    templates = _get_active_templates(db)
+    if not templates:
+        logger.info("No active daily challenge templates, nothing to generate")
+        return report
+
+    pending_user_ids = _get_pending_user_ids(db, challenge_date)
+    if not pending_user_ids:
+        logger.info(f"All users already have challenges for {challenge_date}")
+        return report
+
+    reto_ids, report["retos_created"] = _get_or_create_template_retos(
+        db, templates, challenge_date
+    )
+
+    num_challenges = min(CHALLENGES_PER_USER, len(reto_ids))
+    for start in range(0, len(pending_user_ids), chunk_size):
+        chunk = pending_user_ids[start:start + chunk_size]
+        rows = [
+            {
+                "user_id": user_id,
+                "reto_id": reto_id,
+                "challenge_date": challenge_date,
+                "is_completed": False,
+                "progress_value": 0.0
+            }
+            for user_id in chunk
+            for reto_id in random.sample(reto_ids, num_challenges)
+        ]
+        try:
+            db.execute(insert(DailyChallenge), rows)
+            # Estos usuarios no tenían retos en la fecha: ningún día completado se reabre
+            challenge_stats_crud.record_challenges_created(db, chunk, num_challenges)
+            notification_service.send_daily_challenges_notifications(db, chunk, num_challenges)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        report["users_processed"] += len(chunk)
+        report["challenges_created"] += len(rows)
+
+    elapsed = time.perf_counter() - started
+    total_rows = report["challenges_created"] + report["retos_created"]
+    report["elapsed_seconds"] = round(elapsed, 3)
+    report["rows_per_second"] = round(total_rows / elapsed, 2) if elapsed > 0 else 0.0
+
+    logger.info(
+        f"Generated {report['challenges_created']} daily challenges for "
+        f"{report['users_processed']} users on {challenge_date} "
+        f"in {report['elapsed_seconds']}s ({report['rows_per_second']} rows/s)"
+    )
+    return report
@@ -0,0 +1,99 @@
+"""
+Service for the delta sync: the user's rows written or deleted since a watermark
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.crud import daily_challenge as daily_challenge_crud
+from app.models.database import Challenge, Habit, Logro, RetoUsuario, SyncTombstone
+
+def encode_sync_token(watermark: datetime) -> str:
+    raw = json.dumps([watermark.isoformat()], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_sync_token(token: Optional[str]) -> Optional[datetime]:
+    """Watermark of a sync token, 400 if it was not issued by /sync/changes"""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != 1:
+            raise ValueError(token)
+        return datetime.fromisoformat(values[0])
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync token"
+        )
+
+def record_tombstones(db: Session, user_id: int, entity_type: str, entity_ids: Iterable[int]):
+    """Tombstones for rows removed with a bulk DELETE, which skips the ORM delete hook"""
+    rows = [{"user_id": user_id, "entity_type": entity_type, "entity_id": entity_id} for entity_id in entity_ids]
+    if rows:
+        db.execute(insert(SyncTombstone), rows)
+
+def purge_tombstones(db: Session) -> int:
+    """Delete tombstones older than any token still accepted"""
+    cutoff = db.scalar(select(func.now())) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    result = db.execute(delete(SyncTombstone).where(SyncTombstone.deleted_at < cutoff))
+    db.commit()
+    return result.rowcount
+
+def get_changes(db: Session, user_id: int, token: Optional[str] = None) -> dict:
+    """Rows of the user's synced tables created, updated or deleted since ``token``.
+
+    Without a token the current state is returned, as the list endpoints
+    would. The next token is the database clock read before the queries;
+    the following sync looks ``SYNC_CHANGES_OVERLAP_SECONDS`` further back
+    so a write stamped before that read but committed after it is not
+    missed. Rows in the overlap may be sent twice, which the client's
+    upsert absorbs. Every query walks a ``(user, updated_at)`` index, so an
+    idle account costs five empty index range scans.
+    """
+    watermark = decode_sync_token(token)
+    now = db.scalar(select(func.now()))
+    if watermark is not None and watermark < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+        # Las lápidas de ese periodo ya se purgaron: los borrados no se pueden reconstruir
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Sync token expired, a full sync is required"
+        )
+
+    changes = {"next_token": encode_sync_token(now), "deleted": {}}
+    if watermark is None:
+        changes["habits"] = db.query(Habit).filter(Habit.user_id == user_id, Habit.is_active == True).all()
+        changes["challenges"] = db.query(Challenge).filter(Challenge.user_id == user_id).all()
+        changes["daily_challenges"] = daily_challenge_crud.get_user_daily_challenges_changed_since(db, user_id)
+        changes["logros"] = db.query(Logro).filter(Logro.id_usuario == user_id).all()
+        changes["retos_usuario"] = db.query(RetoUsuario).filter(RetoUsuario.id_usuario == user_id).all()
+        return changes
+
+    since = watermark - timedelta(seconds=settings.SYNC_CHANGES_OVERLAP_SECONDS)
+    habits = db.query(Habit).filter(Habit.user_id == user_id, Habit.updated_at >= since).all()
+    # Un hábito desactivado desaparece del listado: para el cliente es un borrado
+    changes["habits"] = [habit for habit in habits if habit.is_active]
+    changes["deleted"]["habits"] = [habit.id for habit in habits if not habit.is_active]
+    changes["challenges"] = db.query(Challenge).filter(
+        Challenge.user_id == user_id, Challenge.updated_at >= since
+    ).all()
+    changes["daily_challenges"] = daily_challenge_crud.get_user_daily_challenges_changed_since(db, user_id, since)
+    changes["logros"] = db.query(Logro).filter(Logro.id_usuario == user_id, Logro.updated_at >= since).all()
+    changes["retos_usuario"] = db.query(RetoUsuario).filter(
+        RetoUsuario.id_usuario == user_id, RetoUsuario.updated_at >= since
+    ).all()
+
+    tombstones = db.execute(
+        select(SyncTombstone.entity_type, SyncTombstone.entity_id).where(
+            SyncTombstone.user_id == user_id,
+            SyncTombstone.deleted_at >= since
+        )
+    )
+    for entity_type, entity_id in tombstones:
+        changes["deleted"].setdefault(entity_type, []).append(entity_id)
+    return changes
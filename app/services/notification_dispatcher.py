@@ -0,0 +1,278 @@
+"""
+Background dispatcher that drains the notification outbox
+"""
+
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from sqlalchemy import delete, func, select, update
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.models.database import NotificationOutbox
+from app.services.notifications import render_messages
+
+logger = logging.getLogger(__name__)
+
+class Notification:
+    """One message to deliver, covering one or more coalesced outbox rows (``text`` ``None``: nothing to send)"""
+
+    def __init__(self, user_id: int, kind: str, text: Optional[str], outbox_ids: List[int], attempts: int):
+        self.user_id = user_id
+        self.kind = kind
+        self.text = text
+        self.outbox_ids = outbox_ids
+        self.attempts = attempts
+
+class NotificationSender(ABC):
+    """Delivery channel of the dispatcher (push, email, ...).
+
+    ``send`` raises to signal a failed delivery; the dispatcher retries it.
+    """
+
+    @abstractmethod
+    async def send(self, notification: Notification) -> None:
+        """Deliver one message"""
+
+class LogNotificationSender(NotificationSender):
+    """Local stand-in that writes every notification to the log"""
+
+    async def send(self, notification: Notification) -> None:
+        logger.info(f"Notification for user {notification.user_id} ({notification.kind}): {notification.text}")
+
+class NotificationDispatcher:
+    """Drain ``notification_outbox`` in batches on the event loop.
+
+    Each batch reserves up to ``batch_size`` due rows by pushing their
+    ``next_attempt_at`` ``lease_seconds`` ahead (with ``SKIP LOCKED``, so
+    several workers can drain the same table), coalesces each user's rows
+    and delivers the messages through ``sender`` with at most
+    ``concurrency`` in flight. Failed messages are retried with
+    exponential backoff until ``max_attempts``, then marked ``dead``. A
+    worker that dies mid-batch only delays its rows until the lease ends.
+    """
+
+    def __init__(
+        self,
+        sender: Optional[NotificationSender] = None,
+        session_factory: Optional[Callable] = None,
+        batch_size: int = 200,
+        concurrency: int = 20,
+        poll_seconds: float = 2.0,
+        lease_seconds: int = 60,
+        max_attempts: int = 5,
+        backoff_seconds: float = 5.0,
+        backoff_max_seconds: float = 900.0
+    ):
+        self.sender = sender or LogNotificationSender()
+        self._session_factory = session_factory
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.rows_claimed = 0
+        self.rows_sent = 0
+        self.rows_dead = 0
+        self.messages_sent = 0
+        self.send_failures = 0
+        self.busy_seconds = 0.0
+
+    @property
+    def session_factory(self) -> Callable:
+        if self._session_factory is None:
+            from app.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory
+
+    @session_factory.setter
+    def session_factory(self, factory: Optional[Callable]):
+        self._session_factory = factory
+
+    def start(self):
+        """Start draining in the running event loop"""
+        if self._task is None or self._task.done():
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            logger.info("Notification dispatcher started")
+
+    async def shutdown(self):
+        """Finish the batch in progress and stop"""
+        if self._task is not None and not self._task.done():
+            self._stopping.set()
+            await self._task
+            logger.info("Notification dispatcher stopped")
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                claimed = await self.dispatch_once()
+            except Exception as e:
+                logger.error(f"Error dispatching notifications: {str(e)}")
+                claimed = 0
+            if claimed < self.batch_size:
+                # Outbox vacío (o casi): esperar antes de volver a consultar
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def dispatch_once(self) -> int:
+        """Deliver one batch, returning the number of outbox rows it reserved"""
+        rows = await run_in_threadpool(self._claim)
+        if not rows:
+            return 0
+        started = time.perf_counter()
+
+        by_user = defaultdict(list)
+        attempts = {}
+        for outbox_id, user_id, kind, payload, row_attempts in rows:
+            by_user[user_id].append((kind, json.loads(payload), outbox_id))
+            attempts[outbox_id] = row_attempts + 1
+        notifications = [
+            Notification(user_id, kind, text, ids, max(attempts[i] for i in ids))
+            for user_id, queued in by_user.items()
+            for kind, text, ids in render_messages(queued)
+        ]
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def deliver(notification: Notification) -> Optional[str]:
+            if notification.text is None:
+                # Nada que enviar (racha sin hito): la fila se da por entregada
+                return None
+            async with semaphore:
+                try:
+                    await self.sender.send(notification)
+                    return None
+                except Exception as e:
+                    return str(e) or type(e).__name__
+
+        errors = await asyncio.gather(*(deliver(notification) for notification in notifications))
+        await run_in_threadpool(self._finish, notifications, errors)
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.batches += 1
+            self.rows_claimed += len(rows)
+            self.busy_seconds += elapsed
+        return len(rows)
+
+    def _claim(self) -> list:
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(
+                    NotificationOutbox.id, NotificationOutbox.user_id, NotificationOutbox.kind,
+                    NotificationOutbox.payload, NotificationOutbox.attempts
+                ).where(
+                    NotificationOutbox.status == "pending",
+                    NotificationOutbox.next_attempt_at <= now
+                ).order_by(NotificationOutbox.next_attempt_at, NotificationOutbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if rows:
+                db.execute(
+                    update(NotificationOutbox)
+                    .where(NotificationOutbox.id.in_([row[0] for row in rows]))
+                    .values(
+                        attempts=NotificationOutbox.attempts + 1,
+                        next_attempt_at=now + timedelta(seconds=self.lease_seconds)
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+        return rows
+
+    def _finish(self, notifications: List[Notification], errors: List[Optional[str]]):
+        now = datetime.utcnow()
+        sent_ids = [i for notification, error in zip(notifications, errors) if error is None
+                    for i in notification.outbox_ids]
+        failed = [(notification, error) for notification, error in zip(notifications, errors) if error is not None]
+        dead = 0
+        with self.session_factory() as db:
+            if sent_ids:
+                db.execute(
+                    update(NotificationOutbox)
+                    .where(NotificationOutbox.id.in_(sent_ids))
+                    .values(status="sent", sent_at=now, last_error=None)
+                    .execution_options(synchronize_session=False)
+                )
+            for notification, error in failed:
+                values = {"last_error": error[:1000]}
+                if notification.attempts >= self.max_attempts:
+                    values["status"] = "dead"
+                    dead += len(notification.outbox_ids)
+                    logger.error(f"Giving up notification {notification.outbox_ids} for user "
+                                 f"{notification.user_id} after {notification.attempts} attempts: {error}")
+                else:
+                    values["next_attempt_at"] = now + timedelta(seconds=self.backoff(notification.attempts))
+                db.execute(
+                    update(NotificationOutbox)
+                    .where(NotificationOutbox.id.in_(notification.outbox_ids))
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+        with self._lock:
+            self.rows_sent += len(sent_ids)
+            self.rows_dead += dead
+            delivered = [notification for notification in notifications if notification.text is not None]
+            self.messages_sent += len(delivered) - len(failed)
+            self.send_failures += len(failed)
+
+    def backoff(self, attempts: int) -> float:
+        """Seconds before retry ``attempts + 1``: doubling, capped, with jitter so retries spread out"""
+        delay = min(self.backoff_max_seconds, self.backoff_seconds * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def purge_sent(self, retention_days: int) -> int:
+        """Delete delivered and dead notifications older than ``retention_days``"""
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        with self.session_factory() as db:
+            result = db.execute(delete(NotificationOutbox).where(
+                NotificationOutbox.status != "pending",
+                func.coalesce(NotificationOutbox.sent_at, NotificationOutbox.next_attempt_at) < cutoff
+            ))
+            db.commit()
+        return result.rowcount
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "running": self._task is not None and not self._task.done(),
+                "batches": self.batches,
+                "rows_claimed": self.rows_claimed,
+                "rows_sent": self.rows_sent,
+                "rows_dead": self.rows_dead,
+                "messages_sent": self.messages_sent,
+                # Filas que viajaron dentro del mensaje de otra
+                "rows_coalesced": self.rows_sent - self.messages_sent,
+                "send_failures": self.send_failures,
+                "rows_per_second": round(self.rows_claimed / self.busy_seconds, 2) if self.busy_seconds else 0.0
+            }
+
+notification_dispatcher = NotificationDispatcher(
+    batch_size=settings.NOTIFICATION_BATCH_SIZE,
+    concurrency=settings.NOTIFICATION_CONCURRENCY,
+    poll_seconds=settings.NOTIFICATION_POLL_SECONDS,
+    lease_seconds=settings.NOTIFICATION_LEASE_SECONDS,
+    max_attempts=settings.NOTIFICATION_MAX_ATTEMPTS,
+    backoff_seconds=settings.NOTIFICATION_BACKOFF_SECONDS,
+    backoff_max_seconds=settings.NOTIFICATION_BACKOFF_MAX_SECONDS
+)
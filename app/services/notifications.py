@@ -2,98 +2,153 @@
 Notification service for daily challenges
 """
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from app.database import SessionLocal
-from app.models.database import User, DailyChallenge
-from app.crud import daily_challenge as daily_challenge_crud
-from datetime import date, datetime
+from app.models.database import NotificationOutbox, UserChallengeStats
+from datetime import datetime
+from typing import List, Optional
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Tipos de notificación guardados en notification_outbox
+DAILY_CHALLENGES = "daily_challenges"
+CHALLENGES_COMPLETED = "challenges_completed"
+STREAK = "streak"
+REMINDER = "reminder"
+WEEKLY_SUMMARY = "weekly_summary"
+
+STREAK_MILESTONES = (3, 7, 14, 30, 50, 100)
+
+def _outbox_row(user_id: int, kind: str, payload: dict) -> dict:
+    return {
+        "user_id": user_id,
+        "kind": kind,
+        "payload": json.dumps(payload, ensure_ascii=False),
+        "next_attempt_at": datetime.utcnow()
+    }
+
 class NotificationService:
-    def __init__(self):
-        self.db = SessionLocal()
-    
-    def send_daily_challenges_notification(self, user_id: int):
-        """Send notification about new daily challenges"""
-        try:
-            # Obtener retos de hoy para el usuario
-            today_challenges = daily_challenge_crud.get_today_challenges(self.db, user_id)
-            
-            if not today_challenges:
-                logger.info(f"No challenges found for user {user_id} today")
-                return
-            
-            # Aquí implementarías el envío real de notificaciones
-            # Por ejemplo: push notifications, email, SMS, etc.
-            logger.info(f"Sending daily challenges notification to user {user_id}")
-            logger.info(f"User has {len(today_challenges)} challenges for today")
-            
-            # Ejemplo de notificación
-            notification_message = f"¡Tienes {len(today_challenges)} nuevos retos para hoy! ¡Vamos a completarlos!"
-            logger.info(f"Notification: {notification_message}")
-            
-        except Exception as e:
-            logger.error(f"Error sending notification to user {user_id}: {str(e)}")
-    
-    def send_challenge_completion_notification(self, user_id: int, challenge_name: str):
-        """Send notification when user completes a challenge"""
-        try:
-            # Obtener estadísticas del usuario
-            stats = daily_challenge_crud.get_user_challenge_stats(self.db, user_id)
-            
-            # Mensaje de felicitación
-            if stats['current_streak'] > 1:
-                message = f"¡Excelente! Completaste '{challenge_name}'. ¡Llevas {stats['current_streak']} días seguidos!"
-            else:
-                message = f"¡Bien hecho! Completaste '{challenge_name}'. ¡Sigue así!"
-            
-            logger.info(f"Completion notification for user {user_id}: {message}")
-            
-        except Exception as e:
-            logger.error(f"Error sending completion notification: {str(e)}")
-    
-    def send_streak_notification(self, user_id: int, streak_days: int):
-        """Send notification for streak milestones"""
-        try:
-            if streak_days in [3, 7, 14, 30, 50, 100]:  # Milestones importantes
-                message = f"🎉 ¡Increíble! Llevas {streak_days} días seguidos completando retos. ¡Eres imparable!"
-                logger.info(f"Streak notification for user {user_id}: {message}")
-            
-        except Exception as e:
-            logger.error(f"Error sending streak notification: {str(e)}")
-    
-    def send_reminder_notification(self, user_id: int):
-        """Send reminder for incomplete challenges"""
-        try:
-            # Obtener retos incompletos de hoy
-            today_challenges = daily_challenge_crud.get_today_challenges(self.db, user_id)
-            incomplete_challenges = [c for c in today_challenges if not c.is_completed]
-            
-            if incomplete_challenges:
-                message = f"¡No olvides completar tus {len(incomplete_challenges)} retos de hoy!"
-                logger.info(f"Reminder notification for user {user_id}: {message}")
-            
-        except Exception as e:
-            logger.error(f"Error sending reminder notification: {str(e)}")
-    
-    def send_weekly_summary(self, user_id: int):
-        """Send weekly summary of user's progress"""
-        try:
-            # Obtener estadísticas de la semana
-            stats = daily_challenge_crud.get_user_challenge_stats(self.db, user_id)
-            
-            message = f"📊 Resumen semanal: Completaste {stats['completed_challenges']} de {stats['total_challenges']} retos ({stats['completion_rate']}%)"
-            logger.info(f"Weekly summary for user {user_id}: {message}")
-            
-        except Exception as e:
-            logger.error(f"Error sending weekly summary: {str(e)}")
-    
-    def close(self):
-        """Close database connection"""
-        if self.db:
-            self.db.close()
+    """Queue notifications in ``notification_outbox``.
+
+    Every method adds rows to the caller's session without committing, so
+    a notification exists exactly when the change that triggered it is
+    committed. Delivery happens later in the
+    :class:`~app.services.notification_dispatcher.NotificationDispatcher`.
+    """
+
+    def enqueue(self, db: Session, user_id: int, kind: str, payload: dict):
+        db.execute(insert(NotificationOutbox), [_outbox_row(user_id, kind, payload)])
+
+    def send_daily_challenges_notifications(self, db: Session, user_ids: List[int], challenge_count: int):
+        """Queue the new daily challenges notification for several users with one INSERT"""
+        rows = [_outbox_row(user_id, DAILY_CHALLENGES, {"count": challenge_count}) for user_id in user_ids]
+        if rows:
+            db.execute(insert(NotificationOutbox), rows)
+
+    def send_challenge_completion_notification(
+        self,
+        db: Session,
+        user_id: int,
+        challenge_name: str,
+        stats: Optional[UserChallengeStats] = None
+    ):
+        """Queue the notification for a completed challenge"""
+        self.send_challenges_completion_notification(db, user_id, [challenge_name], stats)
+
+    def send_challenges_completion_notification(
+        self,
+        db: Session,
+        user_id: int,
+        challenge_names: List[str],
+        stats: Optional[UserChallengeStats] = None
+    ):
+        """Queue the notification for completed challenges and, with ``stats``, the user's streak.
+
+        ``stats`` is the aggregate returned by ``record_challenges_completed``
+        in the same transaction, so no statistics are recomputed here. The
+        streak travels in the same row, so a batch can never deliver it apart
+        from its completion.
+        """
+        payload = {"challenges": challenge_names}
+        if stats is not None and stats.current_streak > 1:
+            payload["streak"] = stats.current_streak
+        self.enqueue(db, user_id, CHALLENGES_COMPLETED, payload)
+
+    def send_streak_notification(self, db: Session, user_id: int, streak_days: int):
+        """Queue the notification for streak milestones"""
+        if streak_days in STREAK_MILESTONES:
+            self.enqueue(db, user_id, STREAK, {"days": streak_days})
+
+    def send_reminder_notification(self, db: Session, user_id: int, pending_count: int):
+        """Queue a reminder for incomplete challenges"""
+        if pending_count:
+            self.enqueue(db, user_id, REMINDER, {"count": pending_count})
+
+    def send_weekly_summary(self, db: Session, user_id: int, stats: dict):
+        """Queue the weekly summary of user's progress"""
+        self.enqueue(db, user_id, WEEKLY_SUMMARY, {
+            "completed": stats['completed_challenges'],
+            "total": stats['total_challenges'],
+            "rate": stats['completion_rate']
+        })
+
+def render_messages(kind_payloads: List[tuple]) -> List[tuple]:
+    """Coalesce one user's queued notifications into the messages to deliver.
+
+    Completions and streaks become a single message; a streak without a
+    completion is only announced at a milestone. Repeated notifications of
+    another kind collapse into the latest one. Takes ``(kind, payload,
+    outbox_id)`` tuples in queue order and returns ``(kind, text,
+    outbox_ids)``; ``text`` is ``None`` for rows to settle without sending.
+    """
+    completed, streak, completion_ids = [], 0, []
+    latest = {}
+    for kind, payload, outbox_id in kind_payloads:
+        if kind == CHALLENGES_COMPLETED:
+            completed.extend(payload["challenges"])
+            streak = max(streak, payload.get("streak", 0))
+            completion_ids.append(outbox_id)
+        elif kind == STREAK:
+            streak = max(streak, payload["days"])
+            completion_ids.append(outbox_id)
+        else:
+            ids = latest.get(kind, (None, []))[1]
+            latest[kind] = (payload, ids + [outbox_id])
+
+    messages = []
+    if completed:
+        if len(completed) == 1:
+            text = f"¡Bien hecho! Completaste '{completed[0]}'."
+        else:
+            text = f"¡Bien hecho! Completaste {len(completed)} retos."
+        if streak > 1:
+            text += f" ¡Llevas {streak} días seguidos!"
+        if streak in STREAK_MILESTONES:
+            text += " 🎉 ¡Eres imparable!"
+        messages.append((CHALLENGES_COMPLETED, text, completion_ids))
+    elif streak in STREAK_MILESTONES:
+        messages.append((
+            STREAK, f"🎉 ¡Increíble! Llevas {streak} días seguidos completando retos. ¡Eres imparable!",
+            completion_ids
+        ))
+    elif completion_ids:
+        messages.append((STREAK, None, completion_ids))
+
+    for kind, (payload, ids) in latest.items():
+        if kind == DAILY_CHALLENGES:
+            text = f"¡Tienes {payload['count']} nuevos retos para hoy! ¡Vamos a completarlos!"
+        elif kind == REMINDER:
+            text = f"¡No olvides completar tus {payload['count']} retos de hoy!"
+        elif kind == WEEKLY_SUMMARY:
+            text = (f"📊 Resumen semanal: Completaste {payload['completed']} de "
+                    f"{payload['total']} retos ({payload['rate']}%)")
+        else:
+            logger.warning(f"Unknown notification kind {kind}")
+            text = json.dumps(payload, ensure_ascii=False)
+        messages.append((kind, text, ids))
+    return messages
 
 # Instancia global del servicio de notificaciones
 notification_service = NotificationService()
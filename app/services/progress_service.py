@@ -3,7 +3,7 @@ Service for handling user challenge progress and completion
 """
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import and_, case, func, select
 from app.models.database import Reto, RetoUsuario, User, Logro, RetoCategoria
 
 def get_user_challenge_stats(db: Session, user_id: int):
@@ -18,30 +18,27 @@ def get_user_challenge_stats(db: Session, user_id: int):
         "completion_rate": 0.0
     }
     
-    # Get all completed challenges for the user
-    completed_challenges = (
-        db.query(RetoUsuario)
-        .join(Reto)
-        .filter(
-            RetoUsuario.id_usuario == user_id,
-            RetoUsuario.progreso_reto == 100.0
+    # Assigned and completed challenges per category in a single aggregate
+    completed = case((RetoUsuario.progreso_reto == 100.0, 1), else_=0)
+    rows = db.execute(
+        select(
+            Reto.categoria,
+            func.count(RetoUsuario.id).label("assigned"),
+            func.sum(completed).label("completed")
         )
-        .all()
-    )
-    
-    # Count total completed challenges
-    stats["total_completed"] = len(completed_challenges)
+        .join(Reto, RetoUsuario.id_reto == Reto.id)
+        .where(RetoUsuario.id_usuario == user_id)
+        .group_by(Reto.categoria)
+    ).all()
     
-    # Count by category
-    for challenge in completed_challenges:
-        categoria = challenge.reto.categoria.value
-        stats["by_category"][categoria] += 1
+    total_assigned = 0
+    for categoria, assigned, completed_count in rows:
+        completed_count = int(completed_count or 0)
+        stats["by_category"][categoria.value] += completed_count
+        stats["total_completed"] += completed_count
+        total_assigned += assigned
     
     # Calculate completion rate
-    total_assigned = db.query(RetoUsuario).filter(
-        RetoUsuario.id_usuario == user_id
-    ).count()
-    
     if total_assigned > 0:
         stats["completion_rate"] = (stats["total_completed"] / total_assigned) * 100
     
@@ -79,26 +76,30 @@ def get_user_active_challenges(db: Session, user_id: int):
     """Get user's currently active challenges"""
     today = datetime.utcnow().date()
     
-    active_challenges = (
-        db.query(Reto)
-        .filter(
+    # Each active reto with the user's progress, if any, in a single LEFT JOIN
+    rows = db.execute(
+        select(Reto, RetoUsuario.progreso_reto)
+        .outerjoin(RetoUsuario, and_(
+            RetoUsuario.id_reto == Reto.id,
+            RetoUsuario.id_usuario == user_id
+        ))
+        .where(
             Reto.activo == True,
             Reto.fecha_asignacion == today
         )
-        .all()
-    )
+        .order_by(Reto.id, RetoUsuario.id)
+    ).all()
     
     result = []
-    for challenge in active_challenges:
-        # Check if user has already started/completed this challenge
-        progress = db.query(RetoUsuario).filter(
-            RetoUsuario.id_usuario == user_id,
-            RetoUsuario.id_reto == challenge.id
-        ).first()
-        
+    seen = set()
+    for challenge, progreso in rows:
+        # Si el usuario tiene varias inscripciones al mismo reto, usar la primera
+        if challenge.id in seen:
+            continue
+        seen.add(challenge.id)
         result.append({
             "reto": challenge,
-            "progreso": progress.progreso_reto if progress else 0.0
+            "progreso": progreso if progreso is not None else 0.0
         })
     
     return result
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""
+Service for computing user progress statistics with SQL aggregates
+"""
+from datetime import date
+from typing import List, Optional, Tuple
+from sqlalchemy import Date, Float, Integer, case, cast, func, literal_column, select
+from sqlalchemy.orm import Session
+from app.models.database import DailyChallenge
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+def _seconds_between(db: Session, start, end):
+    """SQL expression for the seconds elapsed between two datetimes"""
+    if _dialect(db) == "mysql":
+        return func.timestampdiff(literal_column("MICROSECOND"), start, end) / 1000000.0
+    return (func.julianday(end) - func.julianday(start)) * 86400.0
+
+def _day_number(db: Session, day):
+    """SQL expression mapping a date to a consecutive integer day number"""
+    if _dialect(db) == "mysql":
+        return func.to_days(day)
+    return cast(func.julianday(day), Integer)
+
+def _get_totals(db: Session, user_id: int, today: date):
+    """Totals, completed today and completion time in one grouped aggregate"""
+    completed = DailyChallenge.is_completed == True
+    timed = completed & DailyChallenge.completed_at.isnot(None) & DailyChallenge.created_at.isnot(None)
+    seconds = _seconds_between(db, DailyChallenge.created_at, DailyChallenge.completed_at)
+
+    return db.execute(
+        select(
+            func.count(DailyChallenge.id).label("total"),
+            func.sum(case((completed, 1), else_=0)).label("completed"),
+            func.sum(case((completed & (DailyChallenge.completed_at >= today), 1), else_=0)).label("completed_today"),
+            func.sum(case((timed, 1), else_=0)).label("timed"),
+            func.sum(case((timed, seconds), else_=0.0), type_=Float).label("total_seconds"),
+            func.sum(case(
+                (timed & (DailyChallenge.completed_at < DailyChallenge.created_at), 1), else_=0
+            )).label("inconsistent")
+        ).where(DailyChallenge.user_id == user_id)
+    ).one()
+
+def _get_streak_runs(db: Session, user_id: int) -> List[Tuple[date, int]]:
+    """Runs of consecutive completion dates as (last_day, length), oldest first.
+
+    Uses the gaps-and-islands technique over the distinct completion dates,
+    so only one row per streak leaves the database.
+    """
+    days = (
+        select(func.date(DailyChallenge.completed_at, type_=Date).label("day"))
+        .where(
+            DailyChallenge.user_id == user_id,
+            DailyChallenge.is_completed == True,
+            DailyChallenge.completed_at.isnot(None)
+        )
+        .distinct()
+        .cte("completion_days")
+    )
+    numbered = select(
+        days.c.day,
+        (_day_number(db, days.c.day) - func.row_number().over(order_by=days.c.day)).label("grp")
+    ).cte("numbered_days")
+
+    rows = db.execute(
+        select(func.max(numbered.c.day).label("last_day"), func.count().label("length"))
+        .group_by(numbered.c.grp)
+        .order_by(func.max(numbered.c.day))
+    ).all()
+    return [(row.last_day, row.length) for row in rows]
+
+def get_progress_stats(db: Session, user_id: int) -> Optional[dict]:
+    """Get user progress statistics, or None if the user has no challenges.
+
+    Raises ValueError when a challenge was completed before it was created.
+    """
+    today = date.today()
+    totals = _get_totals(db, user_id, today)
+    if not totals.total:
+        return None
+
+    if totals.inconsistent:
+        raise ValueError("Fecha de completado anterior a fecha de creación")
+
+    runs = _get_streak_runs(db, user_id)
+    longest_streak = max((length for _, length in runs), default=0)
+    current_streak = 0
+    if runs:
+        last_day, length = runs[-1]
+        # Si el último reto completado fue ayer o hoy, mantener la racha actual
+        if (today - last_day).days <= 1:
+            current_streak = length
+
+    timed = int(totals.timed or 0)
+    total_hours = float(totals.total_seconds or 0.0) / 3600
+    completion_rate = total_hours / timed if timed > 0 else 0.0
+
+    return {
+        "total_habits": totals.total,
+        "completed_today": int(totals.completed_today or 0),
+        "current_streak": current_streak,
+        "longest_streak": longest_streak,
+        "completion_rate": round(completion_rate, 2),
+        "total_challenges": totals.total,
+        "completed_challenges": int(totals.completed or 0)
+    }
@@ -0,0 +1,143 @@
+"""
+Service for applying the mobile client's offline progress queue in one batch
+"""
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session, joinedload
+from app.crud import challenge_stats as challenge_stats_crud
+from app.models.database import Challenge, ChallengeStatus, CriterioReto, DailyChallenge, RetoUsuario
+from app.schemas.sync import ProgressEvent
+from app.services.notifications import notification_service
+
+DAILY_CHALLENGE = "daily_challenge_progress"
+CRITERIO = "criterio_completed"
+CHALLENGE = "challenge_progress"
+
+def _utc(timestamp: datetime) -> datetime:
+    """Naive UTC, the convention of the timestamps stored by the server"""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+def _load_owned(db: Session, user_id: int, events: List[ProgressEvent]) -> Dict[str, dict]:
+    """The user's entities referenced by the batch: one IN query per event type"""
+    ids = {DAILY_CHALLENGE: set(), CRITERIO: set(), CHALLENGE: set()}
+    for event in events:
+        ids[event.type].add(event.entity_id)
+
+    owned = {event_type: {} for event_type in ids}
+    if ids[DAILY_CHALLENGE]:
+        owned[DAILY_CHALLENGE] = {c.id: c for c in db.query(DailyChallenge).options(
+            joinedload(DailyChallenge.reto)
+        ).filter(
+            DailyChallenge.user_id == user_id,
+            DailyChallenge.id.in_(ids[DAILY_CHALLENGE])
+        )}
+    if ids[CHALLENGE]:
+        owned[CHALLENGE] = {c.id: c for c in db.query(Challenge).filter(
+            Challenge.user_id == user_id,
+            Challenge.id.in_(ids[CHALLENGE])
+        )}
+    if ids[CRITERIO]:
+        # Un criterio_reto pertenece al usuario a través de su reto_usuario
+        owned[CRITERIO] = {c.id: c for c in db.query(CriterioReto).join(
+            RetoUsuario, CriterioReto.id_reto_usuario == RetoUsuario.id
+        ).filter(
+            RetoUsuario.id_usuario == user_id,
+            CriterioReto.id.in_(ids[CRITERIO])
+        )}
+    return owned
+
+def _last_write(event_type: str, entity) -> Optional[datetime]:
+    if event_type in (DAILY_CHALLENGE, CHALLENGE):
+        return entity.version_at
+    # Completar un criterio es idempotente: no hay escrituras que puedan perderse
+    return None
+
+def _apply(event, entity, timestamp: datetime) -> Tuple[str, Optional[str]]:
+    if event.type == DAILY_CHALLENGE:
+        if entity.is_completed:
+            return "rejected", "No se puede modificar un reto que ya está completado"
+        entity.progress_value = event.value
+        if event.is_completed or event.value >= 100.0:
+            entity.is_completed = True
+            entity.completed_at = timestamp
+    elif event.type == CRITERIO:
+        entity.completado = b'\x01'
+    else:
+        entity.current_value = event.progress_value
+        if entity.target_value and event.progress_value >= entity.target_value:
+            entity.status = ChallengeStatus.COMPLETED
+    return "applied", None
+
+def apply_progress_events(db: Session, user_id: int, events: List[ProgressEvent]) -> dict:
+    """Apply an ordered batch of progress events in a single transaction.
+
+    Conflicts are resolved last-writer-wins per entity on ``version_at``,
+    kept in naive UTC like the client timestamps: an event older than the
+    entity's last write (a server-side write or the event time of an earlier
+    applied event) is skipped as ``stale``. Client timestamps in the future are
+    clamped to now so a skewed clock cannot pin an entity. Events for
+    entities the user does not own are reported as ``not_found`` without
+    failing the rest of the batch, so one deleted entity cannot block the
+    client's queue. Returns a result per event and the resulting state of
+    every touched entity.
+    """
+    now = datetime.utcnow()
+    owned = _load_owned(db, user_id, events)
+    versions: Dict[Tuple[str, int], Optional[datetime]] = {}
+    results = []
+    completed = {}
+
+    for index, event in enumerate(events):
+        entity = owned[event.type].get(event.entity_id)
+        if entity is None:
+            results.append({"index": index, "status": "not_found"})
+            continue
+
+        key = (event.type, event.entity_id)
+        if key not in versions:
+            last_write = _last_write(event.type, entity)
+            versions[key] = _utc(last_write) if last_write else None
+        timestamp = min(_utc(event.client_timestamp), now)
+        if versions[key] is not None and timestamp < versions[key]:
+            results.append({"index": index, "status": "stale"})
+            continue
+
+        status, detail = _apply(event, entity, timestamp)
+        results.append({"index": index, "status": status, "detail": detail})
+        if status == "applied":
+            versions[key] = timestamp
+            if event.type != CRITERIO:
+                # La versión es la hora del evento, no la de llegada del lote
+                entity.version_at = timestamp
+            if event.type == DAILY_CHALLENGE and entity.is_completed:
+                completed[entity.id] = entity
+
+    names = [c.reto.nombre_reto if c.reto else "Reto" for c in completed.values()]
+    touched = {event_type: list(entities) for event_type, entities in owned.items()}
+    try:
+        db.flush()
+        aggregate = challenge_stats_crud.record_challenges_completed(db, user_id, list(completed.values()))
+        if completed:
+            notification_service.send_challenges_completion_notification(db, user_id, names, aggregate)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    # Las estadísticas antes de recargar: si el agregado no existe se construye y confirma
+    stats = challenge_stats_crud.get_user_challenge_stats(db, user_id) if completed else None
+
+    # Estado resultante: una consulta por tipo de entidad
+    state = {"results": results, "daily_challenges": [], "challenges": [], "criterios_reto": [], "stats": stats}
+    for event_type, model, field in [
+        (DAILY_CHALLENGE, DailyChallenge, "daily_challenges"),
+        (CHALLENGE, Challenge, "challenges"),
+        (CRITERIO, CriterioReto, "criterios_reto"),
+    ]:
+        if touched[event_type]:
+            state[field] = db.query(model).filter(
+                model.id.in_(touched[event_type])
+            ).order_by(model.id).populate_existing().all()
+    return state
@@ -3,57 +3,75 @@ Service for handling daily challenge rotation
 """
 
 from datetime import datetime
+from typing import Dict, List
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import select, update
 from app.models.database import Reto, RetoCategoria
+from app.services.catalog_cache import catalog_cache
 import random
 
+def _category_id_arrays(db: Session, activo: bool) -> Dict[RetoCategoria, List[int]]:
+    """Ids of the active (or inactive) retos grouped by category, from one narrow query"""
+    ids = {categoria: [] for categoria in RetoCategoria}
+    rows = db.execute(
+        select(Reto.categoria, Reto.id).where(Reto.activo == activo)
+    )
+    for categoria, reto_id in rows:
+        ids[categoria].append(reto_id)
+    return ids
+
+def _pick_one_per_category(ids: Dict[RetoCategoria, List[int]]) -> List[int]:
+    return [random.choice(category_ids) for category_ids in ids.values() if category_ids]
+
 def get_daily_challenges(db: Session):
     """Get one random challenge for each category for today"""
     today = datetime.utcnow().date()
-    
-    daily_challenges = []
-    for categoria in RetoCategoria:
-        # Get all active challenges for this category
-        available_challenges = db.query(Reto).filter(
-            Reto.categoria == categoria,
-            Reto.activo == True
-        ).all()
-        
-        if available_challenges:
-            # Select a random challenge
-            daily_challenge = random.choice(available_challenges)
-            
-            # Update fecha_asignacion
-            daily_challenge.fecha_asignacion = today
-            daily_challenges.append(daily_challenge)
-    
-    db.commit()
-    return daily_challenges
+
+    try:
+        picked = _pick_one_per_category(_category_id_arrays(db, activo=True))
+        if picked:
+            db.execute(
+                update(Reto)
+                .where(Reto.id.in_(picked))
+                .values(fecha_asignacion=today)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+        catalog_cache.invalidate()
+    except Exception:
+        db.rollback()
+        raise
+
+    if not picked:
+        return []
+    retos = {reto.id: reto for reto in db.scalars(select(Reto).where(Reto.id.in_(picked)))}
+    return [retos[reto_id] for reto_id in picked]
 
 def rotate_challenges(db: Session):
     """Rotate active challenges"""
     today = datetime.utcnow().date()
-    
-    # Get yesterday's challenges and deactivate them
-    yesterday_challenges = db.query(Reto).filter(
-        Reto.fecha_asignacion < today,
-        Reto.activo == True
-    ).all()
-    
-    for challenge in yesterday_challenges:
-        challenge.activo = False
-    
-    # Activate new random challenges
-    for categoria in RetoCategoria:
-        inactive_challenges = db.query(Reto).filter(
-            Reto.categoria == categoria,
-            Reto.activo == False
-        ).all()
-        
-        if inactive_challenges:
-            new_active = random.choice(inactive_challenges)
-            new_active.activo = True
-            new_active.fecha_asignacion = today
-    
-    db.commit()
\ No newline at end of file
+
+    try:
+        # Deactivate yesterday's challenges
+        db.execute(
+            update(Reto)
+            .where(Reto.fecha_asignacion < today, Reto.activo == True)
+            .values(activo=False)
+            .execution_options(synchronize_session=False)
+        )
+
+        # Activate one random inactive challenge per category
+        picked = _pick_one_per_category(_category_id_arrays(db, activo=False))
+        if picked:
+            db.execute(
+                update(Reto)
+                .where(Reto.id.in_(picked))
+                .values(activo=True, fecha_asignacion=today)
+                .execution_options(synchronize_session=False)
+            )
+
+        db.commit()
+        catalog_cache.invalidate()
+    except Exception:
+        db.rollback()
+        raise
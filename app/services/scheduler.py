@@ -4,9 +4,13 @@ Scheduler service for daily challenge automation
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from app.core.config import settings
+from app.core.idempotency import idempotency_store
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.crud import daily_challenge as daily_challenge_crud
+from app.services import delta_sync_service
+from app.services.challenge_generation import generate_daily_challenges_bulk
+from app.services.notification_dispatcher import notification_dispatcher
 from datetime import date
 import logging
 
@@ -37,6 +41,33 @@ class DailyChallengeScheduler:
             replace_existing=True
         )
         
+        # Purgar las claves de idempotencia caducadas cada hora
+        self.scheduler.add_job(
+            self.cleanup_idempotency_keys,
+            CronTrigger(minute=15),
+            id='cleanup_idempotency_keys',
+            name='Cleanup Idempotency Keys',
+            replace_existing=True
+        )
+        
+        # Purgar las lápidas de sincronización caducadas todos los días a las 3:30 AM
+        self.scheduler.add_job(
+            self.purge_sync_tombstones,
+            CronTrigger(hour=3, minute=30),
+            id='purge_sync_tombstones',
+            name='Purge Sync Tombstones',
+            replace_existing=True
+        )
+        
+        # Purgar las notificaciones ya enviadas todos los días a las 4:00 AM
+        self.scheduler.add_job(
+            self.purge_sent_notifications,
+            CronTrigger(hour=4, minute=0),
+            id='purge_sent_notifications',
+            name='Purge Sent Notifications',
+            replace_existing=True
+        )
+        
         logger.info("Daily challenge scheduler jobs configured")
     
     async def generate_daily_challenges(self):
@@ -49,19 +80,13 @@ class DailyChallengeScheduler:
             
             # Generar retos para hoy
             today = date.today()
-            total_challenges = daily_challenge_crud.generate_daily_challenges_for_all_users(
-                db, today
-            )
-            
-            logger.info(f"Generated {total_challenges} daily challenges for {today}")
-            
-            # Enviar notificaciones a usuarios
-            from app.services.notifications import notification_service
-            from app.models.database import User
+            report = generate_daily_challenges_bulk(db, today)
             
-            users = db.query(User).all()
-            for user in users:
-                notification_service.send_daily_challenges_notification(user.id)
+            # Las notificaciones quedan en el outbox en la misma transacción que los retos
+            logger.info(
+                f"Generated {report['challenges_created']} daily challenges for {today} "
+                f"({report['rows_per_second']} rows/s)"
+            )
             
         except Exception as e:
             logger.error(f"Error generating daily challenges: {str(e)}")
@@ -91,6 +116,34 @@ class DailyChallengeScheduler:
             if 'db' in locals():
                 db.close()
     
+    async def cleanup_idempotency_keys(self):
+        """Delete stored Idempotency-Key responses past their TTL"""
+        try:
+            removed = idempotency_store.cleanup()
+            logger.info(f"Removed {removed} expired idempotency keys")
+        except Exception as e:
+            logger.error(f"Error cleaning up idempotency keys: {str(e)}")
+    
+    async def purge_sync_tombstones(self):
+        """Delete delta sync tombstones past the retention window"""
+        try:
+            db = next(get_db())
+            removed = delta_sync_service.purge_tombstones(db)
+            logger.info(f"Removed {removed} expired sync tombstones")
+        except Exception as e:
+            logger.error(f"Error purging sync tombstones: {str(e)}")
+        finally:
+            if 'db' in locals():
+                db.close()
+    
+    async def purge_sent_notifications(self):
+        """Delete delivered and abandoned notifications past their retention"""
+        try:
+            removed = notification_dispatcher.purge_sent(settings.NOTIFICATION_RETENTION_DAYS)
+            logger.info(f"Removed {removed} sent notifications")
+        except Exception as e:
+            logger.error(f"Error purging sent notifications: {str(e)}")
+    
     def start(self):
         """Start the scheduler"""
         if not self.scheduler.running:
@@ -0,0 +1,119 @@
+"""
+Benchmark de carga: sesión síncrona dentro del event loop vs AsyncSession
+
+Lanza N coroutines concurrentes que consultan los retos de hoy de un usuario,
+igual que GET /daily-challenges/hoy. Con la sesión síncrona cada consulta
+bloquea el event loop; con AsyncSession las consultas se solapan.
+
+SQLite local no tiene latencia de red, así que se simula un round-trip de
+--latency-ms por consulta: bloqueante en la variante síncrona (como una
+lectura de socket de pymysql) y con await en la asíncrona (como aiomysql).
+
+Uso:
+    python benchmarks/async_db_load.py [--requests 400] [--concurrency 50] [--latency-ms 5]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.crud import daily_challenge as daily_challenge_crud
+from app.models.database import Base, DailyChallenge, Reto, RetoCategoria, User
+
+def seed(database_path: str, rows: int) -> None:
+    """Crear una base SQLite con muchos retos diarios repartidos entre usuarios"""
+    engine = create_engine(f"sqlite:///{database_path}")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        db.execute(insert(User), [{"nombre": f"u{i}", "correo": f"u{i}@updaily.com"} for i in range(1000)])
+        db.execute(insert(Reto), [{"nombre_reto": "Reto", "categoria": RetoCategoria.SOCIAL}])
+        db.execute(insert(DailyChallenge), [
+            {"user_id": (i % 1000) + 1, "reto_id": 1, "challenge_date": date.today()}
+            for i in range(rows)
+        ])
+        db.commit()
+    engine.dispose()
+
+async def run_load(call, total: int, concurrency: int) -> dict:
+    """Ejecutar `total` llamadas con `concurrency` coroutines y medir latencias"""
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await call(i)
+        # Todas las peticiones llegan a la vez: latencia medida desde la ráfaga
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "req_s": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+async def main(total: int, concurrency: int, rows: int, latency_ms: float) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        database_path = os.path.join(tmp, "bench.db")
+        seed(database_path, rows)
+
+        sync_engine = create_engine(
+            f"sqlite:///{database_path}", pool_size=concurrency, connect_args={"check_same_thread": False}
+        )
+        SyncSession = sessionmaker(bind=sync_engine)
+        latency = latency_ms / 1000
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def network_round_trip(*args):
+            time.sleep(latency)
+
+        async def sync_call(i):
+            # Patrón anterior: async def + Session síncrona
+            with SyncSession() as db:
+                daily_challenge_crud.get_user_daily_challenges_with_reto(db, (i % 1000) + 1, date.today())
+
+        async_engine = create_async_engine(
+            f"sqlite+aiosqlite:///{database_path}", poolclass=AsyncAdaptedQueuePool, pool_size=concurrency
+        )
+        AsyncSession = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+        async def async_call(i):
+            async with AsyncSession() as db:
+                await asyncio.sleep(latency)
+                await daily_challenge_crud.get_today_challenges_with_reto_async(db, (i % 1000) + 1)
+
+        results = {
+            "sync Session": await run_load(sync_call, total, concurrency),
+            "AsyncSession": await run_load(async_call, total, concurrency),
+        }
+        sync_engine.dispose()
+        await async_engine.dispose()
+
+    print(f"{total} peticiones, concurrencia {concurrency}, {rows} filas, round-trip {latency_ms} ms")
+    print(f"{'variante':<14}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<14}{r['req_s']:>10.1f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.rows, args.latency_ms))
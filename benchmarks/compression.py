@@ -0,0 +1,77 @@
+"""
+Benchmark de compresión: coste de CPU frente a bytes ahorrados
+
+Genera cuerpos JSON representativos (/retos con todo el catálogo,
+/daily-challenges/mis-retos?limit=100 y /logros/usuario/mis-logros) y mide,
+para cada nivel de gzip y calidad de brotli, el tamaño resultante y el tiempo
+de CPU por respuesta. La última fila mide el camino cacheado del catálogo.
+
+Uso:
+    python benchmarks/compression.py [--retos 500] [--repeat 200]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.compression import CompressionMiddleware, brotli
+
+def payloads(retos: int) -> dict:
+    now = datetime(2026, 10, 18, 9, 30).isoformat()
+    return {
+        "/retos": json.dumps([
+            {"nombre_reto": f"Reto {i}", "descripcion_reto": "Sal a caminar 20 minutos sin el móvil",
+             "tipo": 1, "categoria": ["SOCIAL", "FISICA", "INTELECTUAL"][i % 3], "id": i}
+            for i in range(retos)
+        ]).encode(),
+        "/mis-retos?limit=100": json.dumps([
+            {"user_id": 7, "reto_id": i, "challenge_date": date(2026, 10, 18).isoformat(),
+             "is_completed": i % 2 == 0, "progress_value": 0.5, "id": i, "completed_at": None,
+             "created_at": now, "reto_nombre": f"Reto {i}",
+             "reto_descripcion": "Llama a un amigo con el que no hablas hace tiempo", "reto_tipo": 1}
+            for i in range(100)
+        ]).encode(),
+        "/mis-logros": json.dumps([
+            {"id_reto_usuario": i, "id_usuario": 7, "id": i, "reto_nombre": f"Reto {i}",
+             "fecha": now}
+            for i in range(200)
+        ]).encode(),
+    }
+
+def measure(compress, body: bytes, repeat: int):
+    started = time.process_time()
+    for _ in range(repeat):
+        compressed = compress(body)
+    return len(compressed), (time.process_time() - started) / repeat * 1e6
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--retos", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    variants = [(f"gzip-{level}", lambda b, l=level: gzip.compress(b, compresslevel=l, mtime=0)) for level in (1, 6, 9)]
+    if brotli is not None:
+        variants += [(f"br-{q}", lambda b, q=q: brotli.compress(b, quality=q)) for q in (1, 4, 6, 11)]
+
+    middleware = CompressionMiddleware(app=None)
+    for path, body in payloads(args.retos).items():
+        print(f"{path}: {len(body)} bytes sin comprimir")
+        for name, compress in variants:
+            size, cpu_us = measure(compress, body, args.repeat if not name.endswith("-11") else 10)
+            print(f"  {name:<8} {size:8d} bytes  ahorro {100 - size / len(body) * 100:5.1f}%  "
+                  f"{cpu_us:9.1f} µs CPU/respuesta")
+        key = ("gzip", '"v1"', path, b"", len(body))
+        middleware.compress_cached(key, body, "gzip")
+        size, cpu_us = measure(lambda b: middleware.compress_cached(key, b, "gzip"), body, args.repeat)
+        print(f"  {'cacheado':<8} {size:8d} bytes  ahorro {100 - size / len(body) * 100:5.1f}%  "
+              f"{cpu_us:9.1f} µs CPU/respuesta")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark de login: bcrypt en el event loop vs pool de workers acotado
+
+Simula una ráfaga de logins (verificación bcrypt) mientras una sonda mide el
+retraso del event loop, que es lo que sufre cualquier otra petición servida
+por el mismo worker de uvicorn.
+
+Uso:
+    python benchmarks/login_throughput.py [--logins 24] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.security import PasswordHasher, get_password_hash, verify_password
+
+PASSWORD = "contraseña-de-prueba"
+
+async def probe_event_loop(stop: asyncio.Event, lags: list) -> None:
+    """Medir cuánto se retrasa un sleep de 10 ms mientras corre la ráfaga"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append((time.perf_counter() - started - 0.01) * 1000)
+
+async def run(login, logins: int) -> dict:
+    stop = asyncio.Event()
+    lags = []
+    probe = asyncio.create_task(probe_event_loop(stop, lags))
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe
+    lags.sort()
+    return {
+        "logins_s": logins / elapsed,
+        "lag_p95_ms": lags[int(len(lags) * 0.95) - 1] if lags else 0.0,
+        "lag_max_ms": lags[-1] if lags else 0.0,
+    }
+
+async def main(logins: int, workers: int) -> None:
+    hashed = get_password_hash(PASSWORD)
+    hasher = PasswordHasher(workers=workers)
+
+    async def inline_login():
+        # Patrón anterior: verify_password directamente en la coroutine
+        assert verify_password(PASSWORD, hashed)
+
+    async def pooled_login():
+        assert await hasher.verify(PASSWORD, hashed)
+
+    results = {
+        "en el loop": await run(inline_login, logins),
+        f"pool x{workers}": await run(pooled_login, logins),
+    }
+    hasher.shutdown()
+
+    print(f"{logins} logins concurrentes, {os.cpu_count()} CPU")
+    print(f"{'variante':<14}{'logins/s':>10}{'lag p95 ms':>12}{'lag max ms':>12}")
+    for name, r in results.items():
+        print(f"{name:<14}{r['logins_s']:>10.1f}{r['lag_p95_ms']:>12.1f}{r['lag_max_ms']:>12.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=24)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.workers))
@@ -0,0 +1,92 @@
+"""
+Benchmark del outbox de notificaciones: envío en serie vs lotes concurrentes
+
+Encola --users usuarios con --per-user notificaciones cada uno (retos
+completados y racha, que se agrupan en un mensaje por usuario) y las
+entrega con un emisor que simula --latency-ms de latencia por mensaje.
+Compara el antiguo envío uno a uno con el dispatcher para varias
+concurrencias.
+
+Uso:
+    python benchmarks/notifications.py [--users 500] [--per-user 3] [--latency-ms 20]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, delete, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.database import Base, NotificationOutbox
+from app.services.notification_dispatcher import NotificationDispatcher, NotificationSender
+from app.services.notifications import CHALLENGES_COMPLETED, STREAK
+
+class SlowSender(NotificationSender):
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.sent = 0
+
+    async def send(self, notification):
+        await asyncio.sleep(self.latency)
+        self.sent += 1
+
+def seed(SessionLocal, users: int, per_user: int) -> int:
+    now = datetime.utcnow()
+    rows = []
+    for user_id in range(1, users + 1):
+        for i in range(per_user - 1):
+            rows.append({"user_id": user_id, "kind": CHALLENGES_COMPLETED,
+                         "payload": json.dumps({"challenges": [f"Reto {i}"]}), "next_attempt_at": now})
+        rows.append({"user_id": user_id, "kind": STREAK, "payload": json.dumps({"days": 7}), "next_attempt_at": now})
+    with SessionLocal() as db:
+        db.execute(delete(NotificationOutbox))
+        db.execute(insert(NotificationOutbox), rows)
+        db.commit()
+    return len(rows)
+
+async def drain(dispatcher: NotificationDispatcher) -> None:
+    while await dispatcher.dispatch_once():
+        pass
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--per-user", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+    latency = args.latency_ms / 1000
+
+    total = seed(SessionLocal, args.users, args.per_user)
+    # Antes: una llamada síncrona por notificación, sin agrupar
+    serial = total * latency
+    print(f"{total} notificaciones, {args.users} usuarios, {args.latency_ms} ms por envío")
+    print(f"{'modo':>22} {'segundos':>9} {'mensajes':>9} {'filas/s':>9}")
+    print(f"{'en serie (estimado)':>22} {serial:9.2f} {total:9d} {total / serial:9.0f}")
+
+    for concurrency in (1, 10, 50):
+        seed(SessionLocal, args.users, args.per_user)
+        sender = SlowSender(latency)
+        dispatcher = NotificationDispatcher(
+            sender=sender, session_factory=SessionLocal,
+            batch_size=args.batch_size, concurrency=concurrency
+        )
+        started = time.perf_counter()
+        asyncio.run(drain(dispatcher))
+        elapsed = time.perf_counter() - started
+        print(f"{f'dispatcher x{concurrency}':>22} {elapsed:9.2f} {sender.sent:9d} {total / elapsed:9.0f}")
+
+if __name__ == "__main__":
+    main()
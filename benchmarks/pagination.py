@@ -0,0 +1,79 @@
+"""
+Benchmark de paginación: OFFSET vs keyset (cursor) en /progress
+
+Un usuario con --rows registros de progreso (y otros usuarios con el mismo
+volumen, para que el índice no sea exclusivo). Mide la latencia de la
+página 1 y de páginas profundas con skip/limit y con el cursor que
+devuelve X-Next-Cursor.
+
+Uso:
+    python benchmarks/pagination.py [--rows 100000] [--limit 20] [--repeat 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.crud import progress as progress_crud
+from app.models.database import Base, ProgressRecord, User
+
+def seed(db, rows: int, users: int) -> None:
+    start = datetime(2020, 1, 1)
+    db.execute(insert(User), [{"nombre": f"u{u}", "correo": f"u{u}@updaily.com"} for u in range(users)])
+    for user_id in range(1, users + 1):
+        db.execute(insert(ProgressRecord), [
+            # Varios registros por día: el id desempata dentro de la misma fecha
+            {"user_id": user_id, "date": start + timedelta(hours=i * 8), "value": 1.0}
+            for i in range(rows)
+        ])
+    db.commit()
+
+def timed(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+    with SessionLocal() as db:
+        seed(db, args.rows, args.users)
+
+    keyset = progress_crud.progress_records_keyset
+    pages = [page for page in (1, 10, 100, 1000, args.rows // args.limit) if page * args.limit <= args.rows]
+    with SessionLocal() as db:
+        print(f"{args.rows} registros, limit={args.limit}")
+        for page in pages:
+            skip = (page - 1) * args.limit
+            previous = progress_crud.get_user_progress_records(db, 1, skip=max(skip - 1, 0), limit=1)
+            after = None if skip == 0 else keyset.decode(keyset.encode(previous[0]))
+
+            offset_rows = progress_crud.get_user_progress_records(db, 1, skip=skip, limit=args.limit)
+            cursor_rows = progress_crud.get_user_progress_records(db, 1, limit=args.limit, after=after)
+            assert [r.id for r in offset_rows] == [r.id for r in cursor_rows]
+
+            offset_ms = timed(lambda: progress_crud.get_user_progress_records(
+                db, 1, skip=skip, limit=args.limit), args.repeat)
+            cursor_ms = timed(lambda: progress_crud.get_user_progress_records(
+                db, 1, limit=args.limit, after=after), args.repeat)
+            print(f"  página {page:5d}: skip/limit {offset_ms:8.2f} ms   cursor {cursor_ms:6.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark de progress_service: bucles N+1 vs consultas set-based
+
+Un usuario con --rows filas en reto_usuario (una por reto), de las que
+--active corresponden a retos activos hoy. Compara la implementación
+anterior (una consulta por reto activo y una carga perezosa de reto por
+fila completada) con la actual (un LEFT JOIN y un GROUP BY).
+
+SQLite en memoria no tiene latencia de red; --latency-ms simula el
+round-trip de cada consulta para reflejar el coste real del N+1 contra MySQL.
+
+Uso:
+    python benchmarks/progress_service_queries.py [--rows 10000] [--active 300] [--latency-ms 0.5]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.database import Base, Reto, RetoCategoria, RetoUsuario, User
+from app.services import progress_service
+
+CATEGORIAS = list(RetoCategoria)
+
+def legacy_get_user_challenge_stats(db, user_id: int):
+    """Implementación anterior: carga todas las filas completadas"""
+    stats = {"total_completed": 0, "by_category": {c.value: 0 for c in CATEGORIAS}, "completion_rate": 0.0}
+    completed = db.query(RetoUsuario).join(Reto).filter(
+        RetoUsuario.id_usuario == user_id, RetoUsuario.progreso_reto == 100.0
+    ).all()
+    stats["total_completed"] = len(completed)
+    for challenge in completed:
+        stats["by_category"][challenge.reto.categoria.value] += 1
+    total_assigned = db.query(RetoUsuario).filter(RetoUsuario.id_usuario == user_id).count()
+    if total_assigned > 0:
+        stats["completion_rate"] = (stats["total_completed"] / total_assigned) * 100
+    return stats
+
+def legacy_get_user_active_challenges(db, user_id: int):
+    """Implementación anterior: una consulta de progreso por reto activo"""
+    today = datetime.utcnow().date()
+    result = []
+    for challenge in db.query(Reto).filter(Reto.activo == True, Reto.fecha_asignacion == today).all():
+        progress = db.query(RetoUsuario).filter(
+            RetoUsuario.id_usuario == user_id, RetoUsuario.id_reto == challenge.id
+        ).first()
+        result.append({"reto": challenge, "progreso": progress.progreso_reto if progress else 0.0})
+    return result
+
+def seed(db, rows: int, active: int) -> None:
+    today = datetime.utcnow().date()
+    db.execute(insert(User), [{"nombre": "u", "correo": "u@updaily.com"}])
+    db.execute(insert(Reto), [
+        {"nombre_reto": f"Reto {i}", "categoria": CATEGORIAS[i % 3],
+         "fecha_asignacion": today, "activo": i < active}
+        for i in range(rows)
+    ])
+    db.execute(insert(RetoUsuario), [
+        {"id_usuario": 1, "id_reto": i + 1, "progreso_reto": 100.0 if i % 2 else 50.0}
+        for i in range(rows)
+    ])
+    db.commit()
+
+def measure(SessionLocal, queries: list, func) -> tuple:
+    with SessionLocal() as db:
+        queries.clear()
+        started = time.perf_counter()
+        result = func(db, 1)
+        return time.perf_counter() - started, len(queries), result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--active", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+    with SessionLocal() as db:
+        seed(db, args.rows, args.active)
+
+    queries = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def simulate_round_trip(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+        time.sleep(args.latency_ms / 1000)
+
+    print(f"{args.rows} filas en reto_usuario, {args.active} retos activos, "
+          f"{args.latency_ms} ms de latencia por consulta")
+    cases = [
+        ("active", legacy_get_user_active_challenges, progress_service.get_user_active_challenges),
+        ("stats", legacy_get_user_challenge_stats, progress_service.get_user_challenge_stats),
+    ]
+    for name, legacy, current in cases:
+        legacy_time, legacy_queries, legacy_result = measure(SessionLocal, queries, legacy)
+        current_time, current_queries, current_result = measure(SessionLocal, queries, current)
+        if name == "active":
+            legacy_result = [(r["reto"].id, r["progreso"]) for r in legacy_result]
+            current_result = [(r["reto"].id, r["progreso"]) for r in current_result]
+        assert legacy_result == current_result
+        print(f"  {name:<7} anterior {legacy_time * 1000:9.1f} ms ({legacy_queries} consultas)  "
+              f"actual {current_time * 1000:9.1f} ms ({current_queries} consultas)  "
+              f"{legacy_time / current_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
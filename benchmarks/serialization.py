@@ -0,0 +1,93 @@
+"""
+Benchmark de serialización: JSONResponse (json estándar) vs FastJSONResponse (orjson)
+
+Reproduce el camino de respuesta de FastAPI para listas de
+DailyChallengeWithReto, LogroWithDetails y ProgressRecord: validación y
+serialización con el response_model (serialize_response) seguida del render
+de la clase de respuesta. Mide también el render aislado, que es lo único que
+cambia entre ambas clases.
+
+Uso:
+    python benchmarks/serialization.py [--items 100] [--repeat 500]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core.responses import FastJSONResponse
+from app.schemas.daily_challenge import DailyChallengeWithReto
+from app.schemas.logro import LogroWithDetails
+from app.schemas.progress import ProgressRecord
+
+def payloads(items: int) -> dict:
+    now = datetime(2026, 10, 18, 9, 30, 15, 120000)
+    return {
+        "DailyChallengeWithReto": (List[DailyChallengeWithReto], [
+            {"id": i, "user_id": 7, "reto_id": i, "challenge_date": date(2026, 10, 18),
+             "is_completed": i % 2 == 0, "progress_value": 0.5, "completed_at": now if i % 2 == 0 else None,
+             "created_at": now, "reto_nombre": f"Reto {i}",
+             "reto_descripcion": "Llama a un amigo con el que no hablas hace tiempo", "reto_tipo": 1}
+            for i in range(items)
+        ]),
+        "LogroWithDetails": (List[LogroWithDetails], [
+            {"id": i, "id_reto_usuario": i,
+             "reto_usuario": {"id": i, "progreso_reto": 100.0},
+             "reto": {"id": i, "nombre_reto": f"Reto {i}", "descripcion_reto": "Sal a caminar sin el móvil", "tipo": 1},
+             "usuario": {"id": 7, "nombre": "Ana", "correo": "ana@example.com"}}
+            for i in range(items)
+        ]),
+        "ProgressRecord": (List[ProgressRecord], [
+            {"id": i, "user_id": 7, "habit_id": i % 5, "challenge_id": None,
+             "date": now - timedelta(days=i), "value": 1.0, "notes": "Hecho por la mañana",
+             "created_at": now - timedelta(days=i)}
+            for i in range(items)
+        ]),
+    }
+
+def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    for name, (annotation, rows) in payloads(args.items).items():
+        field = create_response_field(name=f"Response_{name}", type_=annotation)
+
+        def serialize():
+            return asyncio.run(serialize_response(field=field, response_content=rows))
+        content = serialize()
+        assert JSONResponse(content).body == FastJSONResponse(content).body
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            # asyncio.run tiene coste propio; se mide aparte y se descuenta
+            asyncio.run(asyncio.sleep(0))
+        loop_us = (time.perf_counter() - start) / args.repeat * 1e6
+        serialize_us = timed(serialize, args.repeat) - loop_us
+        stdlib_us = timed(lambda: JSONResponse(content), args.repeat)
+        orjson_us = timed(lambda: FastJSONResponse(content), args.repeat)
+
+        print(f"{name} x{args.items} ({len(FastJSONResponse(content).body)} bytes)")
+        print(f"  render json estándar: {stdlib_us:8.1f} µs   render orjson: {orjson_us:8.1f} µs   "
+              f"({stdlib_us / orjson_us:.1f}x)")
+        print(f"  respuesta completa:   {serialize_us + stdlib_us:8.1f} µs   -> {serialize_us + orjson_us:8.1f} µs")
+
+if __name__ == "__main__":
+    main()
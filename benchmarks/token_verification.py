@@ -0,0 +1,60 @@
+"""
+Benchmark de verificación de tokens: jwt.decode en cada petición vs caché LRU
+
+Verifica el mismo conjunto de tokens (el cliente móvil reutiliza su token de
+acceso durante 30 minutos) y compara las verificaciones por segundo.
+
+Uso:
+    python benchmarks/token_verification.py [--verifications 100000] [--tokens 100]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+
+from app.core.config import settings
+from app.core.security import create_access_token, token_cache, verify_token
+
+def verify_uncached(credentials: HTTPAuthorizationCredentials) -> dict:
+    """Camino anterior: decodificar y verificar la firma siempre"""
+    payload = jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    return {"user_id": payload.get("sub")}
+
+def run(verify, credentials: list, verifications: int) -> float:
+    started = time.perf_counter()
+    for i in range(verifications):
+        verify(credentials[i % len(credentials)])
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--verifications", type=int, default=100000)
+    parser.add_argument("--tokens", type=int, default=100)
+    args = parser.parse_args()
+
+    credentials = [
+        HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token({"sub": str(i)}))
+        for i in range(args.tokens)
+    ]
+
+    token_cache.clear()
+    results = {
+        "jwt.decode": run(verify_uncached, credentials, args.verifications),
+        "caché LRU": run(verify_token, credentials, args.verifications)
+    }
+
+    print(f"{args.verifications} verificaciones, {args.tokens} tokens distintos")
+    for name, elapsed in results.items():
+        print(f"  {name:<12} {elapsed:7.3f}s  {args.verifications / elapsed:12.0f} verif/s  "
+              f"{elapsed / args.verifications * 1e6:7.2f} µs/verif")
+    print(f"  aceleración   {results['jwt.decode'] / results['caché LRU']:.1f}x")
+    print(f"  caché: {token_cache.metrics()}")
+
+if __name__ == "__main__":
+    main()
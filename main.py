@@ -9,9 +9,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import uvicorn
 
-from app.database import init_db
-from app.routers import auth, users, habits, challenges, progress, retos, criterios, logros, daily_challenges, category_stats
+from app.database import SessionLocal, init_db, get_pool_status
+from app.routers import auth, users, habits, challenges, progress, retos, criterios, logros, daily_challenges, category_stats, sync
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.idempotency import IdempotencyMiddleware, idempotency_store
+from app.core.principal_cache import principal_cache
+from app.core.responses import FastJSONResponse
+from app.core.security import password_hasher, token_cache
+from app.services.catalog_cache import catalog_cache
+from app.services.notification_dispatcher import notification_dispatcher
 from app.services.scheduler import daily_challenge_scheduler
 
 # Security scheme
@@ -21,20 +28,30 @@ security = HTTPBearer()
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
-    # Start the daily challenge scheduler
+    # Cargar el catálogo (retos, criterios, plantillas) antes de servir peticiones
+    with SessionLocal() as db:
+        catalog_cache.load(db)
+    # Start the daily challenge scheduler and the notification outbox dispatcher
     daily_challenge_scheduler.start()
+    notification_dispatcher.start()
     yield
     # Shutdown
+    await notification_dispatcher.shutdown()
     daily_challenge_scheduler.shutdown()
+    password_hasher.shutdown()
 
 # Create FastAPI app
 app = FastAPI(
     title="UpDaily API",
     description="Backend API for UpDaily - Daily Habits and Challenges Tracker",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
     lifespan=lifespan
 )
 
+# Replay of retried POST requests carrying an Idempotency-Key (inside CORS and compression)
+app.add_middleware(IdempotencyMiddleware)
+
 # CORS middleware configuration
 app.add_middleware(
     CORSMiddleware,
@@ -46,6 +63,15 @@ app.add_middleware(
     max_age=600,  # Cache preflight requests for 10 minutes
 )
 
+# Response compression negotiated through Accept-Encoding
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    cache_max_entries=settings.COMPRESSION_CACHE_MAX_ENTRIES
+)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["Users"])
@@ -58,6 +84,7 @@ app.include_router(progress.router, prefix="/api/v1/progress", tags=["Progress"]
 app.include_router(retos.router, prefix="/api/v1/retos", tags=["Retos"])
 app.include_router(criterios.router, prefix="/api/v1/criterios", tags=["Criterios"])
 app.include_router(logros.router, prefix="/api/v1/logros", tags=["Logros"])
+app.include_router(sync.router, prefix="/api/v1/sync", tags=["Sync"])
 
 @app.get("/")
 async def root():
@@ -71,6 +98,35 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/db")
+async def database_health_check():
+    """Connection pool occupancy and checkout wait-time counters"""
+    return {"status": "healthy", "pool": get_pool_status()}
+
+@app.get("/health/password-hashing")
+async def password_hashing_health_check():
+    """Bcrypt worker pool concurrency and queue-depth counters"""
+    return {"status": "healthy", "hasher": password_hasher.metrics()}
+
+@app.get("/health/auth-cache")
+async def auth_cache_health_check():
+    """Hit/miss counters of the decoded-token and verified-principal caches"""
+    return {
+        "status": "healthy",
+        "tokens": token_cache.metrics(),
+        "principals": principal_cache.metrics()
+    }
+
+@app.get("/health/idempotency")
+async def idempotency_health_check():
+    """Replay hit rate and purge counters of the Idempotency-Key store"""
+    return {"status": "healthy", "idempotency": idempotency_store.metrics()}
+
+@app.get("/health/notifications")
+async def notifications_health_check():
+    """Throughput, coalescing and failure counters of the notification outbox dispatcher"""
+    return {"status": "healthy", "dispatcher": notification_dispatcher.metrics()}
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
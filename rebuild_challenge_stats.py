@@ -0,0 +1,27 @@
+"""
+Script para recalcular la tabla user_challenge_stats desde el historial de retos diarios
+"""
+
+import sys
+from app.database import SessionLocal
+from app.crud import challenge_stats as challenge_stats_crud
+
+def rebuild_challenge_stats(user_id=None):
+    """Recalcular las estadísticas de uno o de todos los usuarios"""
+    db = SessionLocal()
+    try:
+        if user_id is not None:
+            challenge_stats_crud.rebuild_user_challenge_stats(db, user_id)
+            db.commit()
+            print(f"✅ Estadísticas recalculadas para el usuario {user_id}")
+        else:
+            total_users = challenge_stats_crud.rebuild_all_user_challenge_stats(db)
+            print(f"✅ Estadísticas recalculadas para {total_users} usuarios")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error recalculando estadísticas: {str(e)}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    rebuild_challenge_stats(int(sys.argv[1]) if len(sys.argv) > 1 else None)
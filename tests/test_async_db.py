@@ -0,0 +1,75 @@
+"""
+Tests for the async database layer on the hot endpoints
+"""
+
+import asyncio
+from datetime import date
+
+import pytest
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.security import create_access_token, get_password_hash
+from app.database import get_async_db, get_db
+from app.models.database import Base, DailyChallenge, Reto, RetoCategoria, User
+from main import app
+
+
+@pytest.fixture
+def async_client(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db", poolclass=NullPool)
+    AsyncTestingSessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncTestingSessionLocal() as db:
+            user = User(nombre="user", correo="user@updaily.com", clave=get_password_hash("secreta"))
+            reto = Reto(nombre_reto="Leer", categoria=RetoCategoria.INTELECTUAL)
+            db.add_all([user, reto])
+            await db.flush()
+            db.add(DailyChallenge(user_id=user.id, reto_id=reto.id, challenge_date=date.today()))
+            await db.commit()
+            return user.id
+
+    user_id = asyncio.run(setup())
+
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    try:
+        yield TestClient(app), user_id
+    finally:
+        app.dependency_overrides.clear()
+        asyncio.run(engine.dispose())
+
+
+def test_login_uses_async_session(async_client):
+    client, _ = async_client
+    response = client.post("/api/v1/auth/login", json={"correo": "user@updaily.com", "clave": "secreta"})
+    assert response.status_code == 200
+    assert "access_token" in response.json()
+
+
+def test_today_challenges_use_async_session(async_client):
+    client, user_id = async_client
+    token = create_access_token({"sub": str(user_id)})
+    response = client.get("/api/v1/daily-challenges/hoy", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert [c["reto_nombre"] for c in response.json()] == ["Leer"]
+
+
+def test_async_routes_do_not_use_the_sync_session():
+    # Las rutas con Session síncrona son def (threadpool); register la delega con run_in_threadpool.
+    # Las dependencias síncronas como get_current_user ya corren en el threadpool
+    offenders = [
+        route.path for route in app.routes
+        if isinstance(route, APIRoute) and asyncio.iscoroutinefunction(route.endpoint)
+        and any(dependency.call is get_db for dependency in route.dependant.dependencies)
+        and route.path != "/api/v1/auth/register"
+    ]
+    assert offenders == []
@@ -0,0 +1,82 @@
+"""
+Tests for the in-memory catalog snapshot
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.crud import reto as reto_crud
+from app.database import get_db
+from app.models.database import DailyChallengeTemplate, Reto, RetoCategoria
+from app.schemas.reto import RetoCreate
+from app.services.catalog_cache import catalog_cache
+from main import app
+
+
+@pytest.fixture
+def client(db):
+    db.add_all([
+        Reto(nombre_reto="Correr", categoria=RetoCategoria.FISICA, tipo=1),
+        Reto(nombre_reto="Leer", categoria=RetoCategoria.INTELECTUAL, tipo=1),
+        DailyChallengeTemplate(nombre="Meditar", tipo=1, categoria=RetoCategoria.INTELECTUAL, dificultad=2),
+        DailyChallengeTemplate(nombre="Saltar", tipo=1, categoria=RetoCategoria.FISICA, is_active=False),
+    ])
+    db.commit()
+    app.dependency_overrides[get_db] = lambda: db
+    catalog_cache.clear()
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+        catalog_cache.clear()
+
+
+def test_catalog_is_served_from_snapshot_until_a_write(client, db):
+    selects = []
+    engine = db.get_bind()
+    listener = lambda conn, cursor, statement, *args: selects.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        first = client.get("/api/v1/retos/")
+        loaded = len(selects)
+        second = client.get("/api/v1/retos/?skip=1&limit=1")
+        single = client.get("/api/v1/retos/1")
+        templates = client.get("/api/v1/daily-challenges/plantillas?categoria=INTELECTUAL")
+        assert len(selects) == loaded
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert [r["nombre_reto"] for r in first.json()] == ["Correr", "Leer"]
+    assert first.json()[0] == {"nombre_reto": "Correr", "descripcion_reto": None, "tipo": 1,
+                               "categoria": "FISICA", "id": 1}
+    assert [r["nombre_reto"] for r in second.json()] == ["Leer"]
+    assert single.json()["nombre_reto"] == "Correr"
+    assert [t["nombre"] for t in templates.json()] == ["Meditar"]
+
+    version = catalog_cache.version
+    reto_crud.create_reto(db, RetoCreate(nombre_reto="Llamar", categoria=RetoCategoria.SOCIAL))
+    assert catalog_cache.version == version + 1
+    assert [r["nombre_reto"] for r in json.loads(client.get("/api/v1/retos/").content)] == ["Correr", "Leer", "Llamar"]
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/retos/", "/api/v1/criterios/", "/api/v1/daily-challenges/plantillas"
+])
+def test_catalog_conditional_requests(client, db, path):
+    response = client.get(path)
+    etag = response.headers["etag"]
+    assert response.status_code == 200
+    assert "max-age" in response.headers["cache-control"]
+
+    not_modified = client.get(path, headers={"If-None-Match": f'"other", W/{etag}'})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+    reto_crud.create_reto(db, RetoCreate(nombre_reto="Llamar", categoria=RetoCategoria.SOCIAL))
+    changed = client.get(path, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
@@ -0,0 +1,54 @@
+"""
+Tests for the set-based category statistics
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.models.database import Reto, RetoCategoria, RetoUsuario, User
+from app.services import category_stats_service
+
+
+def test_all_category_stats_in_two_queries(db):
+    today = datetime.utcnow().date()
+    user = User(nombre="user", correo="user@updaily.com", clave="x")
+    db.add(user)
+    db.flush()
+
+    # Racha física de 3 días que termina hoy, con un hueco antes
+    for offset, progreso in [(5, 100.0), (2, 100.0), (1, 100.0), (0, 100.0), (0, 40.0)]:
+        reto = Reto(nombre_reto=f"Físico {offset}", categoria=RetoCategoria.FISICA,
+                    fecha_asignacion=today - timedelta(days=offset), activo=offset == 0)
+        db.add(reto)
+        db.flush()
+        db.add(RetoUsuario(id_usuario=user.id, id_reto=reto.id, progreso_reto=progreso))
+    # Reto social activo hoy sin inscripción del usuario
+    db.add(Reto(nombre_reto="Social", categoria=RetoCategoria.SOCIAL, fecha_asignacion=today, activo=True))
+    db.commit()
+    user_id = user.id
+
+    selects = []
+    engine = db.get_bind()
+    listener = lambda conn, cursor, statement, *args: selects.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        stats = {s["categoria"]: s for s in category_stats_service.get_all_category_stats(db, user_id)}
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert len(selects) == 2
+    fisica = stats["FISICA"]
+    assert fisica["total_completados"] == 4
+    assert fisica["porcentaje_completado"] == 80.0
+    assert fisica["mejor_racha"] == 3
+    assert fisica["racha_actual"] == 3
+    assert sorted(r["progreso"] for r in fisica["retos_actuales"]) == [40.0, 100.0]
+
+    social = stats["SOCIAL"]
+    assert social["total_completados"] == 0
+    assert social["retos_actuales"] == [{"id": social["retos_actuales"][0]["id"], "nombre": "Social",
+                                         "descripcion": None, "progreso": 0.0}]
+    assert stats["INTELECTUAL"]["porcentaje_completado"] == 0.0
+
+    assert category_stats_service.get_physical_stats(db, user_id) == fisica
@@ -0,0 +1,42 @@
+"""
+Tests for the bulk daily challenge generation
+"""
+
+from datetime import date
+
+from app.models.database import DailyChallenge, DailyChallengeTemplate, RetoCategoria, User
+from app.services.challenge_generation import CHALLENGES_PER_USER, generate_daily_challenges_bulk
+
+
+def _seed(db, users=3, templates=8):
+    db.add_all([User(nombre=f"user{i}", correo=f"user{i}@updaily.com") for i in range(users)])
+    db.add_all([
+        DailyChallengeTemplate(
+            nombre=f"Plantilla {i}",
+            tipo=1,
+            categoria=list(RetoCategoria)[i % 3],
+            is_active=True
+        )
+        for i in range(templates)
+    ])
+    db.commit()
+
+
+def test_generates_challenges_for_every_user(db):
+    _seed(db)
+    report = generate_daily_challenges_bulk(db, date(2025, 1, 1), chunk_size=2)
+
+    assert report["users_processed"] == 3
+    assert report["challenges_created"] == 3 * CHALLENGES_PER_USER
+    assert report["retos_created"] == 8
+    assert db.query(DailyChallenge).count() == 3 * CHALLENGES_PER_USER
+
+
+def test_generation_is_idempotent(db):
+    _seed(db)
+    challenge_date = date(2025, 1, 1)
+    generate_daily_challenges_bulk(db, challenge_date)
+    report = generate_daily_challenges_bulk(db, challenge_date)
+
+    assert report["challenges_created"] == 0
+    assert db.query(DailyChallenge).count() == 3 * CHALLENGES_PER_USER
@@ -0,0 +1,83 @@
+"""
+Tests for the materialized daily challenge statistics
+"""
+
+from datetime import date, timedelta
+
+from app.crud import challenge_stats as challenge_stats_crud
+from app.crud import daily_challenge as daily_challenge_crud
+from app.models.database import Reto, RetoCategoria, User
+from app.schemas.daily_challenge import DailyChallengeCreate, DailyChallengeUpdate
+
+
+def _seed(db, days=3, per_day=2):
+    user = User(nombre="user", correo="user@updaily.com")
+    reto = Reto(nombre_reto="Reto", categoria=RetoCategoria.SOCIAL)
+    db.add_all([user, reto])
+    db.commit()
+    # Inicializar el agregado antes de crear retos para ejercitar el camino incremental
+    challenge_stats_crud.get_user_challenge_stats(db, user.id)
+
+    today = date.today()
+    challenges = []
+    for offset in reversed(range(days)):
+        for _ in range(per_day):
+            challenges.append(daily_challenge_crud.create_daily_challenge(db, DailyChallengeCreate(
+                user_id=user.id, reto_id=reto.id, challenge_date=today - timedelta(days=offset)
+            )))
+    return user, challenges
+
+
+def _complete(db, challenge):
+    daily_challenge_crud.update_daily_challenge(
+        db, challenge.id, DailyChallengeUpdate(is_completed=True, progress_value=1.0)
+    )
+
+
+def test_incremental_stats_match_rebuild(db):
+    user, challenges = _seed(db)
+    for challenge in challenges:
+        _complete(db, challenge)
+
+    stats = challenge_stats_crud.get_user_challenge_stats(db, user.id)
+    assert stats["total_challenges"] == 6
+    assert stats["completed_challenges"] == 6
+    assert stats["current_streak"] == 3
+    assert stats["longest_streak"] == 3
+
+    challenge_stats_crud.rebuild_user_challenge_stats(db, user.id)
+    db.commit()
+    assert challenge_stats_crud.get_user_challenge_stats(db, user.id) == stats
+
+
+def test_uncompleting_a_day_breaks_the_streak(db):
+    user, challenges = _seed(db)
+    for challenge in challenges:
+        _complete(db, challenge)
+
+    daily_challenge_crud.update_daily_challenge(
+        db, challenges[2].id, DailyChallengeUpdate(is_completed=False)
+    )
+    stats = challenge_stats_crud.get_user_challenge_stats(db, user.id)
+    assert stats["completed_challenges"] == 5
+    assert stats["current_streak"] == 1
+    assert stats["longest_streak"] == 1
+
+
+def test_new_challenge_reopens_a_completed_day(db):
+    user, challenges = _seed(db, days=2, per_day=1)
+    for challenge in challenges:
+        _complete(db, challenge)
+    assert challenge_stats_crud.get_user_challenge_stats(db, user.id)["current_streak"] == 2
+
+    daily_challenge_crud.create_daily_challenge(db, DailyChallengeCreate(
+        user_id=user.id, reto_id=challenges[0].reto_id, challenge_date=date.today()
+    ))
+    stats = challenge_stats_crud.get_user_challenge_stats(db, user.id)
+    assert stats["total_challenges"] == 3
+    assert stats["current_streak"] == 1
+    assert stats["longest_streak"] == 1
+
+    challenge_stats_crud.rebuild_user_challenge_stats(db, user.id)
+    db.commit()
+    assert challenge_stats_crud.get_user_challenge_stats(db, user.id) == stats
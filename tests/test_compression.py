@@ -0,0 +1,95 @@
+"""
+Tests for the response compression middleware
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, brotli, choose_encoding
+from app.database import get_db
+from app.models.database import Reto, RetoCategoria
+from app.services.catalog_cache import catalog_cache
+from main import app as main_app
+
+BODY = "reto " * 1000
+
+
+def make_client(**options):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, **options)
+
+    @app.get("/text")
+    def text():
+        return PlainTextResponse(BODY)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("ok")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([BODY.encode(), BODY.encode()]), media_type="text/plain")
+
+    @app.get("/png")
+    def png():
+        return PlainTextResponse(BODY, media_type="image/png")
+
+    return TestClient(app)
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, br", ["br", "gzip"]) == "br"
+    assert choose_encoding("gzip;q=1, br;q=0.5", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("br;q=0", ["br", "gzip"]) is None
+    assert choose_encoding("*", ["gzip"]) == "gzip"
+    assert choose_encoding(None, ["gzip"]) is None
+
+
+def test_negotiated_gzip_and_passthrough_cases():
+    client = make_client(minimum_size=500)
+    response = client.get("/text", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert response.text == BODY
+
+    assert "content-encoding" not in client.get("/text", headers={"Accept-Encoding": "identity"}).headers
+    for path in ["/small", "/stream", "/png"]:
+        assert "content-encoding" not in client.get(path, headers={"Accept-Encoding": "gzip"}).headers
+
+
+@pytest.mark.skipif(brotli is None, reason="brotli not installed")
+def test_brotli_is_preferred_when_available():
+    response = make_client().get("/text", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.text == BODY
+
+
+def test_catalog_bodies_are_compressed_once_and_revalidated(db):
+    db.add_all(Reto(nombre_reto=f"Reto número {i}", categoria=RetoCategoria.FISICA) for i in range(60))
+    db.commit()
+    main_app.dependency_overrides[get_db] = lambda: db
+    catalog_cache.clear()
+    try:
+        client = TestClient(main_app)
+        headers = {"Accept-Encoding": "gzip"}
+        first = client.get("/api/v1/retos/", headers=headers)
+        assert first.headers["content-encoding"] == "gzip"
+        etag = first.headers["etag"]
+        assert etag.endswith('-gzip"')
+
+        middleware = main_app.middleware_stack
+        while not isinstance(middleware, CompressionMiddleware):
+            middleware = middleware.app
+        hits = middleware.cache_hits
+        second = client.get("/api/v1/retos/", headers=headers)
+        assert second.content == first.content
+        assert middleware.cache_hits == hits + 1
+
+        not_modified = client.get("/api/v1/retos/", headers={**headers, "If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == etag
+    finally:
+        main_app.dependency_overrides.clear()
+        catalog_cache.clear()
@@ -0,0 +1,113 @@
+"""
+Tests for the daily challenge endpoints
+"""
+
+import asyncio
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.security import create_access_token
+from app.database import get_async_db, get_db
+from app.models.database import Base, DailyChallenge, Reto, RetoCategoria, User
+from main import app
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Client whose sync and async sessions share one SQLite file with a day of challenges"""
+    path = f"{tmp_path}/test.db"
+    engine = create_engine(f"sqlite:///{path}", poolclass=NullPool)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(bind=engine)
+    AsyncTestingSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    with TestingSessionLocal() as db:
+        user = User(nombre="user", correo="user@updaily.com", clave="x")
+        retos = [Reto(nombre_reto=f"Reto {i}", categoria=RetoCategoria.FISICA, tipo=1) for i in range(6)]
+        db.add_all([user, *retos])
+        db.flush()
+        db.add_all(DailyChallenge(user_id=user.id, reto_id=reto.id, challenge_date=date.today()) for reto in retos)
+        db.commit()
+        user_id = user.id
+
+    def override_get_db():
+        with TestingSessionLocal() as db:
+            yield db
+
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+
+    statements = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.lstrip().split(None, 1)[0].upper())
+
+    for target in (engine, async_engine.sync_engine):
+        event.listen(target, "before_cursor_execute", record_statement)
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+    try:
+        yield TestClient(app), headers, statements
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+        asyncio.run(async_engine.dispose())
+
+
+@pytest.mark.parametrize("path", ["/api/v1/daily-challenges/mis-retos", "/api/v1/daily-challenges/hoy"])
+def test_challenges_with_reto_use_a_single_select(client, path):
+    client, headers, statements = client
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body) == 6
+    assert {c["reto_nombre"] for c in body} == {f"Reto {i}" for i in range(6)}
+    assert all(c["reto_tipo"] == 1 for c in body)
+    assert statements.count("SELECT") == 1
+
+
+def test_bulk_completion_costs_a_fixed_number_of_queries(client):
+    client, headers, statements = client
+    # Crear el agregado de estadísticas para ejercitar el camino incremental
+    assert client.get("/api/v1/daily-challenges/estadisticas", headers=headers).json()["total_challenges"] == 6
+    ids = [c["id"] for c in client.get("/api/v1/daily-challenges/hoy", headers=headers).json()]
+
+    statements.clear()
+    response = client.post("/api/v1/daily-challenges/completar", headers=headers, json={
+        "completions": [{"id": challenge_id, "progress_value": 1.0} for challenge_id in ids]
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert sorted(c["id"] for c in body["challenges"]) == sorted(ids)
+    assert all(c["is_completed"] and c["completed_at"] for c in body["challenges"])
+    assert body["stats"]["completed_challenges"] == 6
+    assert body["stats"]["current_streak"] == 1
+    # Incluye el INSERT de la notificación en el outbox, en la misma transacción
+    assert len(statements) <= 10, statements
+
+    again = client.post("/api/v1/daily-challenges/completar", headers=headers,
+                        json={"completions": [{"id": ids[0]}]})
+    assert again.status_code == 400
+
+
+@pytest.mark.parametrize("completions, status_code", [
+    ([{"id": 999}], 404),
+    ([{"id": 1}, {"id": 1}], 400),
+    ([{"id": 1, "progress_value": 2.0}], 422),
+    ([], 422),
+])
+def test_bulk_completion_rejects_invalid_batches(client, completions, status_code):
+    client, headers, _ = client
+    response = client.post("/api/v1/daily-challenges/completar", headers=headers,
+                           json={"completions": completions})
+    assert response.status_code == status_code
@@ -0,0 +1,185 @@
+"""
+Tests for Idempotency-Key replay of POST requests
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.idempotency import REPLAYED_HEADER, idempotency_store
+from app.core.security import create_access_token
+from app.database import get_db
+from app.models.database import Base, IdempotencyKey, ProgressRecord, User
+from main import app
+
+PROGRESS = {"date": "2026-10-18T08:00:00", "value": 1.0, "notes": "caminar"}
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Client whose routes and idempotency store share one SQLite file"""
+    engine = create_engine(f"sqlite:///{tmp_path}/test.db", poolclass=NullPool)
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(bind=engine)
+
+    with TestingSessionLocal() as db:
+        user = User(nombre="user", correo="user@updaily.com", clave="x")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+
+    def override_get_db():
+        with TestingSessionLocal() as db:
+            yield db
+
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    app.dependency_overrides[get_db] = override_get_db
+    previous_factory, idempotency_store.session_factory = idempotency_store.session_factory, TestingSessionLocal
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+    try:
+        yield TestClient(app), headers, TestingSessionLocal, statements
+    finally:
+        app.dependency_overrides.clear()
+        idempotency_store.session_factory = previous_factory
+        engine.dispose()
+
+
+def test_retry_replays_stored_response_without_touching_business_tables(client):
+    client, headers, Session, statements = client
+    headers = {**headers, "Idempotency-Key": "progress-1"}
+    hits = idempotency_store.metrics()["hits"]
+
+    first = client.post("/api/v1/progress/", headers=headers, json=PROGRESS)
+    assert first.status_code == 201
+    assert REPLAYED_HEADER not in first.headers
+
+    statements.clear()
+    retry = client.post("/api/v1/progress/", headers=headers, json=PROGRESS)
+    assert retry.status_code == 201
+    assert retry.headers[REPLAYED_HEADER] == "true"
+    assert retry.json() == first.json()
+    assert statements and all("idempotency_keys" in statement for statement in statements)
+    assert idempotency_store.metrics()["hits"] == hits + 1
+
+    with Session() as db:
+        assert db.query(ProgressRecord).count() == 1
+
+
+def test_key_reused_with_another_body_is_rejected(client):
+    client, headers, Session, _ = client
+    headers = {**headers, "Idempotency-Key": "progress-2"}
+    assert client.post("/api/v1/progress/", headers=headers, json=PROGRESS).status_code == 201
+    response = client.post("/api/v1/progress/", headers=headers, json={**PROGRESS, "value": 0.5})
+    assert response.status_code == 422
+    with Session() as db:
+        assert db.query(ProgressRecord).count() == 1
+
+
+def test_pending_key_conflicts_and_failures_release_the_key(client):
+    client, headers, Session, _ = client
+    now = datetime.utcnow()
+    with Session() as db:
+        db.add(IdempotencyKey(user_id=db.query(User.id).scalar(), key="pending", request_hash="x",
+                              created_at=now, expires_at=now + timedelta(days=1)))
+        db.commit()
+    assert client.post("/api/v1/progress/", json=PROGRESS,
+                       headers={**headers, "Idempotency-Key": "pending"}).status_code == 409
+
+    # Una respuesta de error no se guarda: el mismo reintento vuelve a ejecutarse
+    invalid = {**headers, "Idempotency-Key": "invalid"}
+    assert client.post("/api/v1/progress/", headers=invalid, json={"value": 1.0}).status_code == 422
+    assert client.post("/api/v1/progress/", headers=invalid, json={"value": 1.0}).status_code == 422
+    with Session() as db:
+        assert db.query(IdempotencyKey).filter(IdempotencyKey.key == "invalid").count() == 0
+
+
+def test_abandoned_key_is_reclaimed_by_a_single_retry(client):
+    client, headers, Session, _ = client
+    old = datetime.utcnow() - timedelta(seconds=idempotency_store.lock_seconds + 1)
+    with Session() as db:
+        user_id = db.query(User.id).scalar()
+        db.add(IdempotencyKey(user_id=user_id, key="abandoned", request_hash="otro cuerpo",
+                              created_at=old, expires_at=old + timedelta(days=1)))
+        db.commit()
+
+    # Dos reintentos leen la fila abandonada; el segundo reclama justo antes del UPDATE del primero
+    engine = Session.kw["bind"]
+    outcomes, raced = [], []
+
+    def concurrent_retry(conn, cursor, statement, *args):
+        if statement.startswith("UPDATE idempotency_keys") and not raced:
+            raced.append(True)
+            outcomes.append(idempotency_store.begin(user_id, "abandoned", "h")[0])
+
+    event.listen(engine, "before_cursor_execute", concurrent_retry)
+    try:
+        outcomes.append(idempotency_store.begin(user_id, "abandoned", "h")[0])
+    finally:
+        event.remove(engine, "before_cursor_execute", concurrent_retry)
+    assert outcomes == ["new", "in_progress"]
+
+    # Con otro cuerpo, una clave abandonada se reclama en lugar de dar 422
+    with Session() as db:
+        db.query(IdempotencyKey).update({"created_at": old})
+        db.commit()
+    response = client.post("/api/v1/progress/", json=PROGRESS, headers={**headers, "Idempotency-Key": "abandoned"})
+    assert response.status_code == 201
+
+
+def test_stale_request_cannot_touch_the_claim_that_replaced_it(client):
+    _, _, Session, _ = client
+    # Reclamación de una petición que lleva más de lock_seconds sin terminar
+    old = (datetime.utcnow() - timedelta(seconds=idempotency_store.lock_seconds + 1)).replace(microsecond=0)
+    with Session() as db:
+        db.add(IdempotencyKey(user_id=1, key="reclaimed", request_hash="h",
+                              created_at=old, expires_at=old + timedelta(days=1)))
+        db.commit()
+    stale_claim = IdempotencyKey(user_id=1, key="reclaimed", request_hash="h", created_at=old)
+    outcome, claim = idempotency_store.begin(1, "reclaimed", "h")
+    assert outcome == "new"
+
+    # La petición original termina tarde: ni su fallo ni su respuesta afectan a la nueva reclamación
+    idempotency_store.release(stale_claim)
+    idempotency_store.complete(stale_claim, 201, "application/json", b"viejo")
+    with Session() as db:
+        record = db.query(IdempotencyKey).one()
+        assert record.status_code is None
+
+    idempotency_store.complete(claim, 201, "application/json", b"nuevo")
+    assert idempotency_store.begin(1, "reclaimed", "h")[1].response_body == b"nuevo"
+
+
+def test_oversized_success_keeps_the_key(client, monkeypatch):
+    client, headers, Session, _ = client
+    monkeypatch.setattr(idempotency_store, "max_body_bytes", 10)
+    headers = {**headers, "Idempotency-Key": "large"}
+    assert client.post("/api/v1/progress/", headers=headers, json=PROGRESS).status_code == 201
+
+    retry = client.post("/api/v1/progress/", headers=headers, json=PROGRESS)
+    assert retry.status_code == 409
+    assert "201" in retry.json()["detail"]
+    with Session() as db:
+        assert db.query(ProgressRecord).count() == 1
+
+
+def test_cleanup_removes_expired_keys(client):
+    _, _, Session, _ = client
+    now = datetime.utcnow()
+    with Session() as db:
+        db.add_all([
+            IdempotencyKey(user_id=1, key="old", request_hash="x", status_code=201,
+                           created_at=now - timedelta(days=2), expires_at=now - timedelta(days=1)),
+            IdempotencyKey(user_id=1, key="new", request_hash="x", status_code=201,
+                           created_at=now, expires_at=now + timedelta(days=1)),
+        ])
+        db.commit()
+    assert idempotency_store.cleanup() == 1
+    with Session() as db:
+        assert [k.key for k in db.query(IdempotencyKey)] == ["new"]
@@ -0,0 +1,109 @@
+"""
+EXPLAIN-based checks that the hot CRUD queries use the composite indexes
+"""
+
+import os
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.dates import on_day
+from app.crud import daily_challenge as daily_challenge_crud
+from app.crud import progress as progress_crud
+from app.crud import reto as reto_crud
+from app.models.database import Base, DailyChallenge
+from app.services import progress_stats_service, reto_service
+
+
+@pytest.fixture(params=["sqlite", "mysql"])
+def explain_db(request):
+    """Session on SQLite, and on MySQL when TEST_MYSQL_URL points to a scratch database"""
+    if request.param == "mysql":
+        url = os.getenv("TEST_MYSQL_URL")
+        if not url:
+            pytest.skip("TEST_MYSQL_URL not set")
+        engine = create_engine(url)
+    else:
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        if request.param == "mysql":
+            Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+@contextmanager
+def captured_selects(db):
+    statements = []
+    engine = db.get_bind()
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def used_indexes(db, statement, parameters):
+    connection = db.connection()
+    if connection.dialect.name == "mysql":
+        rows = connection.exec_driver_sql("EXPLAIN " + statement, parameters).mappings().all()
+        return {row["key"] for row in rows if row["key"]}
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    return {row[-1] for row in rows}
+
+
+def assert_uses_index(db, index_names, call):
+    """``index_names`` is one index name, or a tuple of equally valid ones"""
+    if isinstance(index_names, str):
+        index_names = (index_names,)
+    with captured_selects(db) as statements:
+        call()
+    assert statements
+    plans = set()
+    for statement, parameters in statements:
+        plans |= used_indexes(db, statement, parameters)
+    assert any(index_name in plan for plan in plans for index_name in index_names), plans
+
+
+@pytest.mark.parametrize("index_names, call", [
+    ("ix_daily_challenges_user_date",
+     lambda db: daily_challenge_crud.get_user_daily_challenges(db, 1, date.today())),
+    ("ix_daily_challenges_user_date",
+     lambda db: daily_challenge_crud.get_today_challenges(db, 1)),
+    ("ix_daily_challenges_user_created",
+     lambda db: db.query(DailyChallenge).filter(
+         DailyChallenge.user_id == 1, on_day(DailyChallenge.created_at, date.today())
+     ).all()),
+    ("ix_daily_challenges_user_completed",
+     lambda db: progress_stats_service._get_streak_runs(db, 1)),
+    # Filtra solo por id_usuario y ambos índices (id_usuario, ...) cuestan lo mismo sin ANALYZE.
+    # SQLite se queda con el creado en último lugar, y create_all emite los índices de una tabla
+    # en el orden de un set, que cambia con PYTHONHASHSEED: cualquiera de los dos es correcto
+    (("ix_reto_usuario_usuario_reto", "ix_reto_usuario_usuario_updated"),
+     lambda db: reto_crud.get_retos_usuario(db, 1)),
+    ("ix_progress_records_user_habit_date",
+     lambda db: progress_crud.get_habit_progress(db, 1, 1, date(2026, 1, 1), date.today())),
+    ("ix_progress_records_user_date",
+     lambda db: progress_crud.get_user_stats(db, 1)),
+    ("ix_progress_records_user_date",
+     lambda db: progress_crud.get_user_progress_records(db, 1, limit=20, after=(datetime(2026, 1, 1), 500))),
+    ("ix_daily_challenges_user_date",
+     lambda db: daily_challenge_crud.get_user_daily_challenges(db, 1, limit=20, after=(date(2026, 1, 1), 500))),
+    ("ix_reto_categoria_activo_fecha",
+     lambda db: reto_service.get_daily_challenges(db)),
+])
+def test_hot_queries_use_composite_indexes(explain_db, index_names, call):
+    assert_uses_index(explain_db, index_names, lambda: call(explain_db))
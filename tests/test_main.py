@@ -23,3 +23,12 @@ def test_docs():
     """Test that docs are accessible"""
     response = client.get("/docs")
     assert response.status_code == 200
+
+def test_database_health():
+    """Test that the pool telemetry endpoint is exposed"""
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    pool = response.json()["pool"]
+    assert "checkouts" in pool
+    assert "wait_time_max_ms" in pool
+    assert "async_pool" in pool
@@ -0,0 +1,154 @@
+"""
+Tests for the notification outbox and its dispatcher
+"""
+
+import asyncio
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.core.security import create_access_token
+from app.database import get_db
+from app.models.database import DailyChallenge, NotificationOutbox, Reto, RetoCategoria, User
+from app.services.notification_dispatcher import NotificationDispatcher, NotificationSender
+from app.services.notifications import CHALLENGES_COMPLETED, DAILY_CHALLENGES, REMINDER, STREAK
+from main import app
+
+
+class RecordingSender(NotificationSender):
+    def __init__(self, fail_users=()):
+        self.sent = []
+        self.fail_users = set(fail_users)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send(self, notification):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if notification.user_id in self.fail_users:
+                raise ConnectionError("push gateway unavailable")
+            self.sent.append(notification)
+        finally:
+            self.in_flight -= 1
+
+
+def queue(db, user_id, kind, payload):
+    db.add(NotificationOutbox(user_id=user_id, kind=kind, payload=json.dumps(payload),
+                              next_attempt_at=datetime.utcnow() - timedelta(seconds=1)))
+
+
+@pytest.fixture
+def dispatcher(db):
+    def make(sender, **options):
+        return NotificationDispatcher(sender=sender, session_factory=sessionmaker(bind=db.get_bind()), **options)
+    return make
+
+
+def test_completion_is_queued_in_the_same_transaction(db):
+    user = User(nombre="Ana", correo="ana@example.com")
+    reto = Reto(nombre_reto="Caminar", categoria=RetoCategoria.FISICA)
+    db.add_all([user, reto])
+    db.flush()
+    challenge = DailyChallenge(user_id=user.id, reto_id=reto.id, challenge_date=date.today())
+    db.add(challenge)
+    db.commit()
+    app.dependency_overrides[get_db] = lambda: db
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+    try:
+        response = TestClient(app).post(f"/api/v1/daily-challenges/completar/{challenge.id}", headers=headers)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    rows = db.query(NotificationOutbox).all()
+    assert [(row.user_id, row.kind, row.status) for row in rows] == [(user.id, CHALLENGES_COMPLETED, "pending")]
+    assert json.loads(rows[0].payload) == {"challenges": ["Caminar"]}
+
+
+def test_batch_is_coalesced_per_user(db, dispatcher):
+    queue(db, 1, CHALLENGES_COMPLETED, {"challenges": ["Caminar"]})
+    queue(db, 1, CHALLENGES_COMPLETED, {"challenges": ["Leer"]})
+    queue(db, 1, STREAK, {"days": 3})
+    queue(db, 1, DAILY_CHALLENGES, {"count": 6})
+    queue(db, 1, DAILY_CHALLENGES, {"count": 6})
+    queue(db, 2, REMINDER, {"count": 2})
+    db.commit()
+
+    sender = RecordingSender()
+    notifications = dispatcher(sender)
+    assert asyncio.run(notifications.dispatch_once()) == 6
+
+    texts = {(n.user_id, n.kind): n.text for n in sender.sent}
+    assert len(sender.sent) == 3
+    assert "2 retos" in texts[(1, CHALLENGES_COMPLETED)] and "3 días" in texts[(1, CHALLENGES_COMPLETED)]
+    assert "6 nuevos retos" in texts[(1, DAILY_CHALLENGES)]
+    assert "2 retos de hoy" in texts[(2, REMINDER)]
+    db.expire_all()
+    assert {row.status for row in db.query(NotificationOutbox)} == {"sent"}
+    metrics = notifications.metrics()
+    assert metrics["rows_sent"] == 6 and metrics["messages_sent"] == 3 and metrics["rows_coalesced"] == 3
+    assert asyncio.run(notifications.dispatch_once()) == 0
+
+
+def test_failed_deliveries_back_off_then_die(db, dispatcher):
+    queue(db, 1, REMINDER, {"count": 1})
+    queue(db, 2, REMINDER, {"count": 1})
+    db.commit()
+
+    notifications = dispatcher(RecordingSender(fail_users={2}), max_attempts=2, backoff_seconds=60)
+    asyncio.run(notifications.dispatch_once())
+    db.expire_all()
+    rows = {row.user_id: row for row in db.query(NotificationOutbox)}
+    assert rows[1].status == "sent"
+    assert rows[2].status == "pending" and rows[2].attempts == 1
+    assert rows[2].last_error == "push gateway unavailable"
+    assert rows[2].next_attempt_at > datetime.utcnow() + timedelta(seconds=20)
+
+    # Aún en espera: el lote siguiente no la reintenta
+    assert asyncio.run(notifications.dispatch_once()) == 0
+    rows[2].next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    asyncio.run(notifications.dispatch_once())
+    db.expire_all()
+    assert db.get(NotificationOutbox, rows[2].id).status == "dead"
+    assert notifications.metrics()["rows_dead"] == 1
+
+
+def test_concurrency_is_bounded(db, dispatcher):
+    for user_id in range(1, 11):
+        queue(db, user_id, REMINDER, {"count": 1})
+    db.commit()
+
+    sender = RecordingSender()
+    asyncio.run(dispatcher(sender, concurrency=3).dispatch_once())
+    assert len(sender.sent) == 10
+    assert sender.max_in_flight == 3
+
+
+def test_standalone_streak_is_only_sent_at_milestones(db, dispatcher):
+    queue(db, 1, STREAK, {"days": 4})
+    queue(db, 2, STREAK, {"days": 7})
+    queue(db, 3, CHALLENGES_COMPLETED, {"challenges": ["Caminar"], "streak": 4})
+    db.commit()
+
+    sender = RecordingSender()
+    assert asyncio.run(dispatcher(sender).dispatch_once()) == 3
+    texts = {n.user_id: n.text for n in sender.sent}
+    assert set(texts) == {2, 3}
+    assert "7 días" in texts[2] and "imparable" in texts[2]
+    assert "Caminar" in texts[3] and "4 días" in texts[3]
+    db.expire_all()
+    assert {row.status for row in db.query(NotificationOutbox)} == {"sent"}
+
+
+def test_sender_without_send_fails_on_construction():
+    class IncompleteSender(NotificationSender):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteSender()
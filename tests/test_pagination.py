@@ -0,0 +1,82 @@
+"""
+Tests for keyset (cursor) pagination
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.security import create_access_token
+from app.crud import progress as progress_crud
+from app.database import get_db
+from app.models.database import ProgressRecord, Reto, RetoCategoria, User
+from app.services.catalog_cache import catalog_cache
+from main import app
+
+
+@pytest.fixture
+def client(db):
+    db.add(User(id=1, nombre="Ana", correo="ana@example.com"))
+    start = datetime(2026, 10, 1, 8, 0)
+    # Fechas repetidas: el id desempata dentro de la misma fecha
+    db.add_all(
+        ProgressRecord(user_id=1, date=start + timedelta(days=i // 3), value=float(i))
+        for i in range(25)
+    )
+    db.add_all(Reto(nombre_reto=f"Reto {i}", categoria=RetoCategoria.FISICA) for i in range(7))
+    db.commit()
+    app.dependency_overrides[get_db] = lambda: db
+    catalog_cache.clear()
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+        catalog_cache.clear()
+
+
+def walk(client, path, headers=None):
+    """Follow X-Next-Cursor until the last page"""
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 4} if cursor is None else {"limit": 4, "cursor": cursor}
+        response = client.get(path, params=params, headers=headers)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return pages
+
+
+def test_cursor_pages_cover_every_record_in_order(client, db):
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1'})}"}
+    pages = walk(client, "/api/v1/progress/", headers)
+    ids = [record["id"] for page in pages for record in page]
+
+    expected = [record.id for record in progress_crud.get_user_progress_records(db, 1, limit=100)]
+    assert ids == expected
+    assert len(set(ids)) == 25
+    assert [len(page) for page in pages] == [4, 4, 4, 4, 4, 4, 1]
+
+    # skip/limit sigue funcionando y coincide con el orden del cursor
+    offset_page = client.get("/api/v1/progress/", params={"skip": 4, "limit": 4}, headers=headers).json()
+    assert [record["id"] for record in offset_page] == ids[4:8]
+
+
+def test_catalog_cursor_pagination(client):
+    pages = walk(client, "/api/v1/retos/")
+    assert [r["nombre_reto"] for page in pages for r in page] == [f"Reto {i}" for i in range(7)]
+
+
+@pytest.mark.parametrize("path, cursor", [
+    ("/api/v1/progress/", "no-es-un-cursor"),
+    ("/api/v1/progress/", "WzFd"),  # [1]: falta la fecha
+    ("/api/v1/progress/", "WyJ4IiwxXQ"),  # ["x",1]: fecha inválida
+    ("/api/v1/retos/", "WyJ4Il0"),  # ["x"]: id no entero
+])
+def test_invalid_cursor_is_rejected(client, path, cursor):
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1'})}"}
+    response = client.get(path, params={"cursor": cursor}, headers=headers)
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
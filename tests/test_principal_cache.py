@@ -0,0 +1,57 @@
+"""
+Tests for the verified principal cache used by the auth dependencies
+"""
+
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core.principal_cache import PrincipalCache, principal_cache
+from app.core.security import create_access_token
+from app.crud import user as user_crud
+from app.database import get_db
+from app.models.database import User
+from app.schemas.user import UserUpdate
+from main import app
+
+
+def test_principal_cache_ttl_and_lru():
+    cache = PrincipalCache(ttl_seconds=60, max_entries=2)
+    cache.set("1", "token-a", "a")
+    cache.set("2", "token-b", "b")
+    assert cache.get("1", "token-a") == "a"
+    cache.set("3", "token-c", "c")
+    # "2" es la entrada menos usada recientemente
+    assert cache.get("2", "token-b") is None
+    assert cache.get("1", "other-token") is None
+    cache.invalidate("1")
+    assert cache.get("1", "token-a") is None
+
+    expiring = PrincipalCache(ttl_seconds=0.01, max_entries=10)
+    expiring.set("1", "token-a", "a")
+    time.sleep(0.02)
+    assert expiring.get("1", "token-a") is None
+
+
+def test_me_skips_user_lookup_until_invalidated(db, monkeypatch):
+    user = User(nombre="user", correo="user@updaily.com", clave="x")
+    db.add(user)
+    db.commit()
+
+    lookups = []
+    get_user = user_crud.get_user
+    monkeypatch.setattr(user_crud, "get_user", lambda *a, **kw: lookups.append(1) or get_user(*a, **kw))
+    app.dependency_overrides[get_db] = lambda: db
+    principal_cache.clear()
+    try:
+        client = TestClient(app)
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+        assert client.get("/api/v1/users/me", headers=headers).json()["nombre"] == "user"
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+        assert len(lookups) == 1
+
+        user_crud.update_user(db, user.id, UserUpdate(nombre="renamed"))
+        assert client.get("/api/v1/users/me", headers=headers).json()["nombre"] == "renamed"
+    finally:
+        app.dependency_overrides.clear()
+        principal_cache.clear()
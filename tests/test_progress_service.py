@@ -0,0 +1,32 @@
+"""
+Tests for the set-based progress_service queries
+"""
+
+from datetime import datetime
+
+from app.models.database import Reto, RetoCategoria, RetoUsuario, User
+from app.services import progress_service
+
+
+def test_active_challenges_and_stats(db):
+    today = datetime.utcnow().date()
+    user = User(nombre="user", correo="user@updaily.com", clave="x")
+    social = Reto(nombre_reto="Social", categoria=RetoCategoria.SOCIAL, fecha_asignacion=today, activo=True)
+    fisica = Reto(nombre_reto="Física", categoria=RetoCategoria.FISICA, fecha_asignacion=today, activo=True)
+    old = Reto(nombre_reto="Antiguo", categoria=RetoCategoria.FISICA, fecha_asignacion=today, activo=False)
+    db.add_all([user, social, fisica, old])
+    db.flush()
+    db.add_all([
+        RetoUsuario(id_usuario=user.id, id_reto=social.id, progreso_reto=100.0),
+        RetoUsuario(id_usuario=user.id, id_reto=old.id, progreso_reto=100.0),
+        RetoUsuario(id_usuario=user.id, id_reto=fisica.id, progreso_reto=30.0),
+    ])
+    db.commit()
+
+    active = progress_service.get_user_active_challenges(db, user.id)
+    assert [(a["reto"].nombre_reto, a["progreso"]) for a in active] == [("Social", 100.0), ("Física", 30.0)]
+
+    stats = progress_service.get_user_challenge_stats(db, user.id)
+    assert stats["total_completed"] == 2
+    assert stats["by_category"] == {"SOCIAL": 1, "FISICA": 1, "INTELECTUAL": 0}
+    assert round(stats["completion_rate"], 2) == 66.67
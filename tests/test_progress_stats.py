@@ -0,0 +1,79 @@
+"""
+Tests for the SQL aggregated /progress/stats engine
+"""
+
+import random
+from datetime import date, datetime, time, timedelta
+
+from app.models.database import DailyChallenge, Reto, RetoCategoria, User
+from app.services.progress_stats_service import get_progress_stats
+
+
+def _legacy_progress_stats(db, user_id):
+    """Reference implementation: the previous row-by-row Python computation"""
+    today = date.today()
+    rows = db.query(DailyChallenge).filter(DailyChallenge.user_id == user_id)
+    completed = rows.filter(DailyChallenge.is_completed == True)
+    completed_list = completed.order_by(DailyChallenge.completed_at).all()
+
+    longest_streak, temp_streak, last_date = 0, 0, None
+    for challenge in completed_list:
+        if not challenge.completed_at:
+            continue
+        current_date = challenge.completed_at.date()
+        if last_date is None:
+            temp_streak = 1
+        elif (current_date - last_date).days == 1:
+            temp_streak += 1
+        elif (current_date - last_date).days > 1:
+            longest_streak = max(longest_streak, temp_streak)
+            temp_streak = 1
+        last_date = current_date
+    longest_streak = max(longest_streak, temp_streak)
+    current_streak = temp_streak if last_date and (today - last_date).days <= 1 else 0
+
+    total_time, completed_count = 0, 0
+    for challenge in completed_list:
+        if challenge.completed_at and challenge.created_at:
+            total_time += (challenge.completed_at - challenge.created_at).total_seconds() / 3600
+            completed_count += 1
+
+    return {
+        "total_habits": rows.count(),
+        "completed_today": completed.filter(DailyChallenge.completed_at >= today).count(),
+        "current_streak": current_streak,
+        "longest_streak": longest_streak,
+        "completion_rate": round(total_time / completed_count if completed_count else 0.0, 2),
+        "total_challenges": rows.count(),
+        "completed_challenges": completed.count()
+    }
+
+
+def test_matches_legacy_computation(db):
+    rng = random.Random(7)
+    user = User(nombre="user", correo="user@updaily.com")
+    reto = Reto(nombre_reto="Reto", categoria=RetoCategoria.FISICA)
+    db.add_all([user, reto])
+    db.commit()
+
+    today = date.today()
+    for offset in range(40):
+        day = today - timedelta(days=offset)
+        for _ in range(rng.randint(0, 3)):
+            created_at = datetime.combine(day, time(6, 0))
+            done = rng.random() < 0.7
+            db.add(DailyChallenge(
+                user_id=user.id,
+                reto_id=reto.id,
+                challenge_date=day,
+                created_at=created_at,
+                is_completed=done,
+                completed_at=created_at + timedelta(minutes=rng.randint(1, 900)) if done else None
+            ))
+    db.commit()
+
+    assert get_progress_stats(db, user.id) == _legacy_progress_stats(db, user.id)
+
+
+def test_user_without_challenges(db):
+    assert get_progress_stats(db, 999) is None
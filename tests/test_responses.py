@@ -0,0 +1,57 @@
+"""
+Tests for the orjson-backed default response class
+"""
+
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.core.responses import FastJSONResponse, dumps
+from app.models.database import ChallengeStatus, HabitType, RetoCategoria
+from app.schemas.daily_challenge import DailyChallengeWithReto
+from main import app as main_app
+
+CHALLENGE = DailyChallengeWithReto(
+    id=1, user_id=7, reto_id=3, challenge_date=date(2026, 10, 18), is_completed=True,
+    progress_value=0.5, completed_at=datetime(2026, 10, 18, 9, 30, 15, 120000),
+    created_at=datetime(2026, 10, 18, 8, 0), reto_nombre="Llamar a un amigo", reto_tipo=1
+)
+
+
+def test_dumps_matches_default_json_response():
+    content = {
+        "categoria": RetoCategoria.SOCIAL,
+        "status": ChallengeStatus.COMPLETED,
+        "habit_type": HabitType.DAILY,
+        "dia": date(2026, 10, 18),
+        "momento": datetime(2026, 10, 18, 9, 30, 15, 120000),
+        "hora": time(7, 45),
+        "nombre": "Caminar 20 minutos por el parque",
+        "retos": [CHALLENGE]
+    }
+    assert dumps(content) == JSONResponse(jsonable_encoder(content)).body
+    assert dumps([CHALLENGE]) == JSONResponse(jsonable_encoder([CHALLENGE])).body
+    assert dumps({"total": Decimal("3"), "media": Decimal("2.5")}) == b'{"total":3,"media":2.5}'
+
+
+def test_fast_json_response_is_the_app_default():
+    assert main_app.router.default_response_class is FastJSONResponse
+
+    app = FastAPI(default_response_class=FastJSONResponse)
+
+    @app.get("/retos", response_model=List[DailyChallengeWithReto])
+    def retos():
+        return [CHALLENGE]
+
+    @app.get("/stats")
+    def stats():
+        return {"categoria": RetoCategoria.FISICA, "dia": date(2026, 10, 18)}
+
+    client = TestClient(app)
+    assert client.get("/retos").json()[0]["challenge_date"] == "2026-10-18"
+    assert client.get("/stats").json() == {"categoria": "FISICA", "dia": "2026-10-18"}
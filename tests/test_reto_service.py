@@ -0,0 +1,38 @@
+"""
+Tests for the set-based reto rotation
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.models.database import Reto, RetoCategoria
+from app.services import reto_service
+
+
+def test_rotation_uses_set_based_updates(db):
+    today = datetime.utcnow().date()
+    yesterday = today - timedelta(days=1)
+    for categoria in RetoCategoria:
+        db.add(Reto(nombre_reto=f"{categoria.value} activo", categoria=categoria,
+                    fecha_asignacion=yesterday, activo=True))
+        db.add_all(Reto(nombre_reto=f"{categoria.value} {i}", categoria=categoria,
+                        fecha_asignacion=yesterday, activo=False) for i in range(20))
+    db.commit()
+
+    statements = []
+    engine = db.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement.split()[0].upper())
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        reto_service.rotate_challenges(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert statements == ["UPDATE", "SELECT", "UPDATE"]
+    active = db.query(Reto).filter(Reto.activo == True).all()
+    assert sorted(r.categoria.value for r in active) == sorted(c.value for c in RetoCategoria)
+    assert all(r.fecha_asignacion == today for r in active)
+
+    daily = reto_service.get_daily_challenges(db)
+    assert {r.id for r in daily} == {r.id for r in active}
@@ -0,0 +1,89 @@
+"""
+Tests for password hashing and token utilities
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.security import PasswordHasher, get_password_hash
+
+
+def test_password_hasher_bounds_concurrency():
+    hasher = PasswordHasher(workers=1)
+    hashed = get_password_hash("secreta")
+
+    async def storm():
+        return await asyncio.gather(*(hasher.verify("secreta", hashed) for _ in range(3)))
+
+    try:
+        assert asyncio.run(storm()) == [True, True, True]
+        metrics = hasher.metrics()
+        assert metrics["completed"] == 3
+        assert metrics["max_queue_depth"] >= 2
+        assert metrics["in_flight"] == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_outdated_hash_is_rehashed_after_login(tmp_path, monkeypatch):
+    from passlib.context import CryptContext
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.core.security import password_hasher, password_needs_rehash
+    from app.crud import user as user_crud
+    from app.models.database import Base, User
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    monkeypatch.setattr(user_crud, "get_async_sessionmaker", lambda: session_factory)
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secreta")
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with session_factory() as db:
+            user = User(nombre="user", correo="user@updaily.com", clave=old_hash)
+            db.add(user)
+            await db.commit()
+        assert password_needs_rehash(old_hash)
+        completed = password_hasher.metrics()["completed"]
+        async with session_factory() as db:
+            assert await user_crud.authenticate_user_async(db, "user@updaily.com", "secreta")
+        await asyncio.gather(*user_crud._background_tasks)
+        # Una sola verificación bcrypt: el hash nuevo viaja a la tarea en segundo plano
+        assert password_hasher.metrics()["completed"] == completed + 1
+        async with session_factory() as db:
+            stored = (await db.get(User, user.id)).clave
+        # Si la clave cambió mientras tanto, el hash viejo no la pisa
+        assert not await user_crud.store_rehashed_password(user.id, "otro", old_hash, session_factory)
+        await engine.dispose()
+        return stored
+
+    stored = asyncio.run(scenario())
+    assert stored != old_hash
+    assert not password_needs_rehash(stored)
+
+
+def test_token_cache_reuses_payload_until_exp():
+    from datetime import timedelta
+
+    from fastapi import HTTPException
+    from fastapi.security import HTTPAuthorizationCredentials
+
+    from app.core.security import create_access_token, token_cache, verify_token
+
+    token_cache.clear()
+    token = create_access_token({"sub": "7"})
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    hits = token_cache.hits
+    assert verify_token(credentials) == {"user_id": "7"}
+    assert verify_token(credentials) == {"user_id": "7"}
+    assert token_cache.hits == hits + 1
+
+    # Un token caducado nunca se sirve desde la caché
+    expired = create_access_token({"sub": "7"}, expires_delta=timedelta(seconds=-1))
+    token_cache.set(expired, {"sub": "7", "exp": 0})
+    with pytest.raises(HTTPException):
+        verify_token(HTTPAuthorizationCredentials(scheme="Bearer", credentials=expired))
+    token_cache.clear()
@@ -0,0 +1,160 @@
+"""
+Tests for the offline progress sync endpoint
+"""
+
+import base64
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, update
+
+from app.core.security import create_access_token
+from app.database import get_db
+from app.models.database import (
+    Challenge, ChallengeStatus, CriterioReto, DailyChallenge, Habit, Reto, RetoCategoria, RetoUsuario, User
+)
+from main import app
+
+
+@pytest.fixture
+def client(db):
+    user, other = User(nombre="Ana", correo="ana@example.com"), User(nombre="Luis", correo="luis@example.com")
+    reto = Reto(nombre_reto="Caminar", categoria=RetoCategoria.FISICA)
+    db.add_all([user, other, reto])
+    db.flush()
+    reto_usuario = RetoUsuario(id_usuario=user.id, id_reto=reto.id)
+    db.add(reto_usuario)
+    db.flush()
+    start = datetime.utcnow() - timedelta(hours=2)
+    db.add_all([
+        DailyChallenge(id=1, user_id=user.id, reto_id=reto.id, challenge_date=date.today(), version_at=start),
+        # Modificado en el servidor después de los eventos encolados
+        DailyChallenge(id=2, user_id=user.id, reto_id=reto.id, challenge_date=date.today(),
+                       version_at=datetime.utcnow()),
+        Challenge(id=1, user_id=user.id, title="Leer", target_value=10.0, created_at=start, version_at=start),
+        Challenge(id=2, user_id=other.id, title="Ajeno", target_value=10.0, created_at=start, version_at=start),
+        CriterioReto(id=1, id_reto=reto.id, id_reto_usuario=reto_usuario.id, completado=b'\x00'),
+    ])
+    db.commit()
+    app.dependency_overrides[get_db] = lambda: db
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+    try:
+        yield TestClient(app), headers, start
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_batch_is_applied_last_writer_wins(client, db):
+    client, headers, start = client
+    at = lambda minutes: (start + timedelta(minutes=minutes)).isoformat() + "Z"
+    events = [
+        {"type": "daily_challenge_progress", "entity_id": 1, "value": 50, "client_timestamp": at(10)},
+        {"type": "daily_challenge_progress", "entity_id": 1, "value": 30, "client_timestamp": at(5)},
+        {"type": "daily_challenge_progress", "entity_id": 1, "value": 100, "client_timestamp": at(20)},
+        {"type": "daily_challenge_progress", "entity_id": 1, "value": 40, "client_timestamp": at(30)},
+        {"type": "daily_challenge_progress", "entity_id": 2, "value": 80, "client_timestamp": at(30)},
+        {"type": "challenge_progress", "entity_id": 1, "progress_value": 10, "client_timestamp": at(40)},
+        {"type": "challenge_progress", "entity_id": 2, "progress_value": 10, "client_timestamp": at(40)},
+        {"type": "criterio_completed", "entity_id": 1, "client_timestamp": at(50)},
+    ]
+
+    statements = []
+    engine = db.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = client.post("/api/v1/sync/progress", headers=headers, json={"events": events})
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [r["status"] for r in body["results"]] == [
+        "applied", "stale", "applied", "rejected", "stale", "applied", "not_found", "applied"
+    ]
+    daily = {c["id"]: c for c in body["daily_challenges"]}
+    assert daily[1]["is_completed"] and daily[1]["progress_value"] == 100
+    assert daily[1]["completed_at"].startswith(at(20)[:16])
+    assert daily[2]["progress_value"] == 0
+    assert [c["id"] for c in body["challenges"]] == [1]
+    assert body["challenges"][0]["status"] == ChallengeStatus.COMPLETED.value
+    assert body["criterios_reto"][0]["completado"] == "\x01"
+    assert body["stats"]["completed_challenges"] == 1
+    # Lecturas por tipo, un UPDATE por fila tocada, el agregado (aquí se construye) y el outbox:
+    # no una petición por evento
+    assert len(statements) <= 17, statements
+
+
+def test_future_client_timestamps_are_clamped(client, db):
+    client, headers, _ = client
+    future = (datetime.utcnow() + timedelta(days=1)).isoformat()
+    events = [{"type": "challenge_progress", "entity_id": 1, "progress_value": 3, "client_timestamp": future}]
+    assert client.post("/api/v1/sync/progress", headers=headers, json={"events": events}).status_code == 200
+
+    now = datetime.utcnow().isoformat()
+    events = [{"type": "challenge_progress", "entity_id": 1, "progress_value": 4, "client_timestamp": now}]
+    body = client.post("/api/v1/sync/progress", headers=headers, json={"events": events}).json()
+    assert body["results"][0]["status"] == "applied"
+    assert body["challenges"][0]["current_value"] == 4
+
+
+def test_later_batches_compare_event_times(client, db):
+    client, headers, start = client
+    at = lambda minutes: (start + timedelta(minutes=minutes)).isoformat() + "Z"
+    sync = lambda minutes, value: client.post("/api/v1/sync/progress", headers=headers, json={"events": [
+        {"type": "challenge_progress", "entity_id": 1, "progress_value": value, "client_timestamp": at(minutes)}
+    ]}).json()["results"][0]["status"]
+
+    assert sync(10, 2) == "applied"
+    challenge = db.get(Challenge, 1)
+    db.refresh(challenge)
+    assert challenge.version_at.replace(tzinfo=None) == start + timedelta(minutes=10)
+    # Otro dispositivo encoló un evento posterior al aplicado, aunque anterior a su llegada
+    assert sync(15, 3) == "applied"
+    assert sync(12, 4) == "stale"
+    db.refresh(challenge)
+    assert challenge.current_value == 3
+
+
+def test_unknown_event_type_is_rejected(client):
+    client, headers, _ = client
+    events = [{"type": "borrar_todo", "entity_id": 1, "client_timestamp": datetime.utcnow().isoformat()}]
+    assert client.post("/api/v1/sync/progress", headers=headers, json={"events": events}).status_code == 422
+
+
+def test_changes_return_only_rows_written_since_the_token(client, db):
+    client, headers, start = client
+    db.add(Habit(id=1, user_id=1, name="Meditar"))
+    db.commit()
+    full = client.get("/api/v1/sync/changes", headers=headers).json()
+    assert [h["id"] for h in full["habits"]] == [1]
+    assert [c["id"] for c in full["challenges"]] == [1]
+    assert sorted(c["id"] for c in full["daily_challenges"]) == [1, 2]
+    assert [r["id"] for r in full["retos_usuario"]] == [1]
+
+    # Todo lo anterior queda fuera de la ventana de solapamiento
+    for model in (Habit, Challenge, DailyChallenge, RetoUsuario):
+        db.execute(update(model).values(updated_at=start))
+    db.commit()
+    token = client.get("/api/v1/sync/changes", headers=headers).json()["next_token"]
+    idle = client.get("/api/v1/sync/changes", headers=headers, params={"since": token})
+    assert idle.status_code == 200
+    assert list(idle.json()) == ["next_token"]
+    assert len(idle.content) < 80
+
+    db.get(Challenge, 1).title = "Leer más"
+    db.get(Habit, 1).is_active = False
+    db.delete(db.get(DailyChallenge, 1))
+    db.commit()
+    changes = client.get("/api/v1/sync/changes", headers=headers, params={"since": token}).json()
+    assert [c["title"] for c in changes["challenges"]] == ["Leer más"]
+    assert changes["deleted"] == {"habits": [1], "daily_challenges": [1]}
+    assert "daily_challenges" not in changes and "habits" not in changes
+
+
+def test_changes_reject_foreign_and_expired_tokens(client):
+    client, headers, _ = client
+    assert client.get("/api/v1/sync/changes", headers=headers, params={"since": "nope"}).status_code == 400
+    old = base64.urlsafe_b64encode(f'["{(datetime.utcnow() - timedelta(days=90)).isoformat()}"]'.encode()).decode()
+    assert client.get("/api/v1/sync/changes", headers=headers, params={"since": old}).status_code == 410